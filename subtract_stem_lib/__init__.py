@@ -1,27 +1,88 @@
+from importlib import import_module
 import numpy as np
 
 from .timestamp import Timestamp
 from .buffer import (
     Buffer, buffer_from_constructor, buffer_from_array_args, buffer_from_array
 )
+from .shared_buffer import shared_buffer_from_array_args, attach_shared_buffer
 from .hone_in import hone_in
 from .divide import (
     UnsafeDivider, GenerateIsSafes, InterpolateMissing,
-    SafeDivider, safe_divide, Ataabtrnfatbaa, ataabtrnfatbaa
+    SafeDivider, safe_divide, safe_divide_batch,
+    Ataabtrnfatbaa, ataabtrnfatbaa, ataabtrnfatbaa_batch
+)
+from .audio_stream import AudioStream, AudioStreamWriter
+from .fft_backends import (
+    FftBackend, NumpyFftBackend, ScipyFftBackend, PyfftwFftBackend,
+    fft_backend_from_name, get_default_fft_backend, set_default_fft_backend
+)
+from .audio_grains import (
+    set_hann_window_cache_size, get_hann_window_cache_info,
+    clear_hann_window_cache,
+    AudioToGrains, AudioToHannGrains, AddGrainsToAudio,
+    AudioToGrainBlocks, AudioToHannGrainBlocks, AddGrainBlocksToAudio,
+    AudioStreamToGrains, AddGrainsToAudioStreamWriter
 )
-from .io import load_audio, save_audio
-from .audio_grains import AudioToGrains, AudioToHannGrains, AddGrainsToAudio
 from .transforms import (
-    GrainsToSpectraBuffer, SpectraBufferOldestToComplexGrains
+    GrainsToSpectraBuffer, SpectraBufferOldestToComplexGrains,
+    SpectraBufferOldestToRealGrains,
+    GrainBlocksToSpectraBlocks, SpectraBlocksToGrainBlocks
+)
+from .fractional_delay import (
+    get_fractional_delay_phase_ramp, ApplyPhaseRampToSpectraBufferNewest
 )
+from .eq_bands import EqBands
 from .eq_profiles import (
     SpectraBuffersToEqProfile, SpectraBuffersToEqProfiles,
+    SpectraBuffersToExponentialEqProfiles, spectra_to_eq_profiles,
     ApplyEqProfilesToSpectraBufferOldest
 )
+from .pad_lens import plan_pad_lens
 from .audio_pair_to_eq_profile import AudioPairToEqProfile
 from .find_delay_stem import FindDelayStemSamples, FindDelayStemSeconds
 
 
+# Loading and saving audio is only needed by some jobs, so those attributes
+# are imported on first access (PEP 562) rather than with the package.
+_MODULE_NAMES_FOR_LAZY_ATTRS = {
+    "load_audio": "io",
+    "save_audio": "io",
+    "AudioCache": "audio_cache"
+}
+
+# Everything imported from the package's modules above, and the lazy
+# attributes so that 'from subtract_stem_lib import *' still includes them.
+# This leaves out the submodules and the likes of 'np' and 'import_module'.
+__all__ = [
+    *(
+        name for name, val in globals().items()
+        if not name.startswith("_")
+        and getattr(val, "__module__", "").startswith(f"{__name__}.")
+    ),
+    *_MODULE_NAMES_FOR_LAZY_ATTRS
+]
+
+
+def __getattr__(name):
+    if name not in _MODULE_NAMES_FOR_LAZY_ATTRS:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        )
+
+    val = getattr(
+        import_module(f".{_MODULE_NAMES_FOR_LAZY_ATTRS[name]}", __name__),
+        name
+    )
+    globals()[name] = val
+
+    return val
+
+
+def __dir__():
+    return sorted({*globals(), *_MODULE_NAMES_FOR_LAZY_ATTRS})
+
+
 # There's no thread-safe way of doing this so I'm just putting it here to make
 # it obvious.
 np.seterr(all="raise", divide="ignore", invalid="ignore")
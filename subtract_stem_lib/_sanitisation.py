@@ -6,13 +6,22 @@ from ._sanitisation_base import Sanitisers
 
 
 def _make_sanitise_array(*, dimensions=None, dtype=None, allow_empty=False):
+    if type(dimensions) is tuple:
+        dimensions_str = " or ".join(f"{n}-D" for n in dimensions)
+    elif dimensions is not None:
+        dimensions_str = f"{dimensions}-D"
+        dimensions = dimensions,
+
     def sanitise_array(val, name):
-        if type(val) is not np.ndarray:
-            raise TypeError(f"{name!r} should be a numpy.ndarray")
+        # memory-mapped audio is allowed wherever arrays are
+        if type(val) is not np.ndarray and type(val) is not np.memmap:
+            raise TypeError(
+                f"{name!r} should be a numpy.ndarray or a numpy.memmap"
+            )
 
         if dimensions is not None:
-            if len(val.shape) != dimensions:
-                raise ValueError(f"{name!r} should be {dimensions}-D")
+            if len(val.shape) not in dimensions:
+                raise ValueError(f"{name!r} should be {dimensions_str}")
 
         if dtype is not None:
             if val.dtype is not np.dtype(dtype):
@@ -29,16 +38,35 @@ def _make_sanitise_array(*, dimensions=None, dtype=None, allow_empty=False):
 
 sanitise_array = _make_sanitise_array()
 sanitise_array_1d = _make_sanitise_array(dimensions=1)
-sanitise_array_1d_bool = sanitise_is_safe \
-    = _make_sanitise_array(dimensions=1, dtype=bool)
+sanitise_array_1d_bool = _make_sanitise_array(dimensions=1, dtype=bool)
 sanitise_array_1d_float = _make_sanitise_array(dimensions=1, dtype=np.float32)
-sanitise_audio = sanitise_array_1d_float
-sanitise_grain = sanitise_array_1d_float
-sanitise_mix_audio = sanitise_array_1d_float
-sanitise_stem_audio = sanitise_array_1d_float
 sanitise_window = sanitise_array_1d_float
-sanitise_array_1d_complex = sanitise_eq_profile = sanitise_spectrum \
+# mono, or multi-channel of shape (channels, samples)
+sanitise_audio = sanitise_mix_audio = sanitise_stem_audio = sanitise_grain \
+    = _make_sanitise_array(dimensions=(1, 2), dtype=np.float32)
+sanitise_array_1d_complex = sanitise_spectrum \
     = _make_sanitise_array(dimensions=1, dtype=np.complex64)
+sanitise_array_1d_or_2d = _make_sanitise_array(dimensions=(1, 2))
+sanitise_array_1d_or_2d_bool = sanitise_is_safe \
+    = _make_sanitise_array(dimensions=(1, 2), dtype=bool)
+sanitise_array_1d_or_2d_complex = sanitise_eq_profile \
+    = _make_sanitise_array(dimensions=(1, 2), dtype=np.complex64)
+sanitise_array_2d_bool = _make_sanitise_array(dimensions=2, dtype=bool)
+sanitise_array_2d_float \
+    = _make_sanitise_array(dimensions=2, dtype=np.float32)
+sanitise_array_2d_complex \
+    = _make_sanitise_array(dimensions=2, dtype=np.complex64)
+sanitise_array_3d_float \
+    = _make_sanitise_array(dimensions=3, dtype=np.float32)
+sanitise_array_3d_complex \
+    = _make_sanitise_array(dimensions=3, dtype=np.complex64)
+# (num_of_grains, grain_len), or (num_of_grains, channels, grain_len)
+sanitise_grain_block \
+    = _make_sanitise_array(dimensions=(2, 3), dtype=np.float32)
+sanitise_spectra_block \
+    = _make_sanitise_array(dimensions=(2, 3), dtype=np.complex64)
+sanitise_stem_spectra = sanitise_mix_spectra \
+    = _make_sanitise_array(dimensions=(2, 3), dtype=np.complex64)
 
 
 def _sanitise_bool(val, name):
@@ -52,6 +80,10 @@ sanitise_error_if_not_mono = _sanitise_bool
 sanitise_highest_wins = _sanitise_bool
 sanitise_subtract = _sanitise_bool
 sanitise_ret_reciprocal_eq = _sanitise_bool
+sanitise_half_spectrum = _sanitise_bool
+sanitise_mmap = _sanitise_bool
+sanitise_mirrored = _sanitise_bool
+sanitise_vectorised = _sanitise_bool
 
 
 def _sanitise_callable(val, name):
@@ -87,10 +119,15 @@ def _make_sanitise_float(*, allow_convert=False, range_=None):
     return sanitise_float
 
 
-sanitise_first_val = _make_sanitise_float(allow_convert=True)
-sanitise_val_add = _make_sanitise_float(allow_convert=True, range_="!=0")
+sanitise_first_val = sanitise_first_guess \
+    = _make_sanitise_float(allow_convert=True)
+sanitise_val_add = sanitise_first_guess_add \
+    = _make_sanitise_float(allow_convert=True, range_="!=0")
 sanitise_max_abs_eq_profile = sanitise_max_abs_result = sanitise_min_diff \
+    = sanitise_min_guess_diff \
     = _make_sanitise_float(allow_convert=True, range_=">=0")
+sanitise_time_constant \
+    = _make_sanitise_float(allow_convert=True, range_=">0")
 
 
 def _make_sanitise_fraction(*, range_=None):
@@ -133,14 +170,23 @@ def _make_sanitise_int(*, allow_convert=False, range_=None):
     return sanitise_int
 
 
-sanitise_start_i = _make_sanitise_int()
-sanitise_lookbehind = _make_sanitise_int(range_=">=0")
+sanitise_start_i = sanitise_axis = _make_sanitise_int()
+sanitise_lookbehind = sanitise_lookahead = sanitise_pad_len \
+    = sanitise_left_pad_len = sanitise_right_pad_len = sanitise_min_pad_len \
+    = sanitise_hann_window_cache_size = sanitise_max_size_bytes \
+    = _make_sanitise_int(range_=">=0")
 _sanitise_int_ge_1 = _make_sanitise_int(range_=">=1")
 sanitise_interval_len = _sanitise_int_ge_1
+sanitise_overlap = _sanitise_int_ge_1
 sanitise_num_of_items = _sanitise_int_ge_1
+sanitise_num_of_grains_per_block = _sanitise_int_ge_1
 sanitise_num_of_iterations = _sanitise_int_ge_1
 sanitise_num_of_iterations_per_guess = _sanitise_int_ge_1
-sanitise_grain_len = _make_sanitise_int(range_=">=2")
+sanitise_channels = _sanitise_int_ge_1
+sanitise_audio_len = _sanitise_int_ge_1
+sanitise_block_len = _sanitise_int_ge_1
+sanitise_grain_len = sanitise_inner_grain_len = sanitise_num_of_bands \
+    = _make_sanitise_int(range_=">=2")
 
 
 def sanitise_s(val, name):
@@ -159,6 +205,55 @@ def sanitise_path(val, name):
         raise TypeError(f"{name!r} should be a pathlib.Path or a str")
 
 
+def sanitise_fractional_delay_mode(val, name):
+    sanitise_s(val, name)
+
+    if val not in {"window", "phase_ramp"}:
+        raise ValueError(f"{name!r} should be 'window' or 'phase_ramp'")
+
+    return val
+
+
+def sanitise_safe_divide_engine(val, name):
+    sanitise_s(val, name)
+
+    engines = "auto", "chained", "numba", "numexpr", "numpy"
+
+    if val not in engines:
+        raise ValueError(f"{name!r} should be one of {engines}")
+
+    return val
+
+
+def sanitise_rotation_mode(val, name):
+    sanitise_s(val, name)
+
+    if val not in {"fused", "power"}:
+        raise ValueError(f"{name!r} should be 'fused' or 'power'")
+
+    return val
+
+
+def sanitise_spacing(val, name):
+    sanitise_s(val, name)
+
+    if val not in {"linear", "octave", "erb"}:
+        raise ValueError(f"{name!r} should be 'linear', 'octave' or 'erb'")
+
+    return val
+
+
+def sanitise_representation(val, name):
+    sanitise_s(val, name)
+
+    if val not in {"complex", "magnitude_and_phase"}:
+        raise ValueError(
+            f"{name!r} should be 'complex' or 'magnitude_and_phase'"
+        )
+
+    return val
+
+
 def sanitise_reference_point(val, name):
     sanitise_s(val, name)
 
@@ -226,4 +321,5 @@ def sanitise_quasi_buffer_data(val, name):
 
 
 _sanitisers = Sanitisers.from_current_module()
-sanitise = _sanitisers.sanitise
+sanitise = sanitise_arg = sanitise_arg_or_args = _sanitisers.sanitise
+sanitise_args = _sanitisers.sanitise_args
@@ -53,7 +53,7 @@ class Sanitisers:
 
         return sanitiser(val, name)
 
-    def _handle_multiple(self, names, sanitiser_names, *, vals):
+    def _handle_multiple(self, names, sanitiser_names, *, vals, f_locals):
         names = self._parse_names(names, var_name="name_or_names")
 
         if ',' in sanitiser_names:
@@ -88,8 +88,6 @@ class Sanitisers:
         else:
             raise TypeError("if provided, 'vals' should be a tuple or list")
 
-        f_locals = inspect.stack()[1].frame.f_locals
-
         return tuple(
             self._sanitise_arg(
                 name, sanitiser_name, val=val, f_locals=f_locals
@@ -98,7 +96,7 @@ class Sanitisers:
             in zip(names, sanitiser_names, vals)
         )
 
-    def _handle_single(self, name, sanitiser_name, *, val):
+    def _handle_single(self, name, sanitiser_name, *, val, f_locals):
         name = name.strip()
 
         if not name:
@@ -112,8 +110,6 @@ class Sanitisers:
                 "valid name"
             )
 
-        f_locals = inspect.stack()[1].frame.f_locals
-
         return self._sanitise_arg(
             name, sanitiser_name, val=val, f_locals=f_locals
         ) 
@@ -163,10 +159,14 @@ class Sanitisers:
                 "if provided, 'sanitiser_name_or_names' should be a str"
             )
 
+        # the locals of whatever called this, for names without values
+        f_locals = inspect.currentframe().f_back.f_locals
+
         if ',' in name_or_names:
             if val is _UNIQUE_NONE:
                 return self._handle_multiple(
-                    name_or_names, sanitiser_name_or_names, vals=vals
+                    name_or_names, sanitiser_name_or_names,
+                    vals=vals, f_locals=f_locals
                 )
             else:
                 raise TypeError(
@@ -176,10 +176,27 @@ class Sanitisers:
         else:
             if vals is _UNIQUE_NONE:
                 return self._handle_single(
-                    name_or_names, sanitiser_name_or_names, val=val
+                    name_or_names, sanitiser_name_or_names,
+                    val=val, f_locals=f_locals
                 )
             else:
                 raise TypeError(
                     "if only one name is provided, 'val' may be provided, "
                     "but 'vals' should not"
                 )
+
+    # each of 'names' is of a local of whatever called this, and is sanitised
+    # by the sanitiser of the same name
+    def sanitise_args(self, *names):
+        f_locals = inspect.currentframe().f_back.f_locals
+
+        for name in names:
+            if type(name) is not str:
+                raise TypeError("'names' should all be strs")
+
+        return tuple(
+            self._sanitise_arg(
+                name, name, val=_UNIQUE_NONE, f_locals=f_locals
+            )
+            for name in names
+        )
@@ -0,0 +1,45 @@
+import numpy as np
+
+from ._sanitisation import sanitise as san
+
+
+# If 'eq_profile_shape' is given, 'coefficients' may be None, in which case
+# they're created.
+def sanitise_eq_band_coefficients(
+    coefficients, *, name, eq_bands, eq_profile_shape=None
+):
+    if eq_profile_shape is not None:
+        shape = eq_bands.get_coefficients_shape(eq_profile_shape)
+
+        if coefficients is None:
+            return np.empty(shape, dtype=eq_bands.coefficients_dtype)
+
+    coefficients = san(name, "array", val=coefficients)
+
+    if coefficients.dtype != eq_bands.coefficients_dtype:
+        raise TypeError(
+            f"{name!r} should have dtype {eq_bands.coefficients_dtype} for "
+            f"representation={eq_bands.representation!r}"
+        )
+
+    if eq_profile_shape is None:
+        eq_bands.get_eq_profile_shape(coefficients.shape)
+    elif coefficients.shape != shape:
+        raise ValueError(
+            f"if provided, {name!r} should have shape {shape}"
+        )
+
+    return coefficients
+
+
+def sanitise_eq_bands(eq_bands, *, name="eq_bands"):
+    # imported here, as eq_bands imports this module
+    from .eq_bands import EqBands
+
+    if eq_bands is None or isinstance(eq_bands, EqBands):
+        return eq_bands
+    else:
+        raise TypeError(
+            f"if provided, {name!r} should be a subtract_stem_lib.EqBands "
+            "instance"
+        )
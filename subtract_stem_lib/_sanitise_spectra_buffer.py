@@ -3,6 +3,39 @@ import numpy as np
 from .buffer import Buffer, buffer_from_array_args, buffer_from_array
 
 
+# A half spectrum holds only the non-negative frequency bins of a real grain.
+def get_spectrum_shape(grain_shape, *, half_spectrum):
+    if half_spectrum:
+        return (*grain_shape[:-1], grain_shape[-1] // 2 + 1)
+    else:
+        return grain_shape
+
+
+def sanitise_grain_len_for_spectrum_len(
+    grain_len, spectrum_len, *, half_spectrum
+):
+    if grain_len is None:
+        if half_spectrum:
+            raise TypeError(
+                "'grain_len' should be provided for half spectra, as both an "
+                "even and an odd 'grain_len' give the same spectrum length"
+            )
+
+        return spectrum_len
+
+    if type(grain_len) is not int:
+        raise TypeError("if provided, 'grain_len' should be an int")
+
+    if get_spectrum_shape((grain_len,), half_spectrum=half_spectrum) \
+            != (spectrum_len,):
+        raise ValueError(
+            f"'grain_len' ({grain_len}) does not match the spectrum length "
+            f"({spectrum_len})"
+        )
+
+    return grain_len
+
+
 def sanitise_spectra_buffer(
     spectra_buffer, *, name,
     reference_shape=None, reference_name_quoted=None
@@ -26,10 +59,11 @@ def sanitise_spectra_buffer(
         raise TypeError(f"{name!r} arrays should have dtype numpy.complex64")
 
     if reference_shape is None:
-        if len(spectra_buffer.newest.shape) != 1:
-            raise ValueError(f"{name!r} arrays should be 1-D")
+        # 2-D arrays are multi-channel, of shape (channels, spectrum_len)
+        if len(spectra_buffer.newest.shape) not in (1, 2):
+            raise ValueError(f"{name!r} arrays should be 1-D or 2-D")
 
-        if len(spectra_buffer.newest) == 0:
+        if 0 in spectra_buffer.newest.shape:
             raise ValueError(f"{name!r} should not be empty")
     else:
         if spectra_buffer.newest.shape != reference_shape:
@@ -51,10 +85,15 @@ def sanitise_stem_mix_spectra_buffers(
         mix_spectra_buffer, name="mix_spectra_buffer"
     )
 
-    if len(stem_spectra_buffer.newest) != len(mix_spectra_buffer.newest):
+    # a mono stem can be shared between the channels of a multi-channel mix
+    stem_shape = stem_spectra_buffer.newest.shape
+    mix_shape = mix_spectra_buffer.newest.shape
+
+    if stem_shape != mix_shape and stem_shape != mix_shape[-1:]:
         raise ValueError(
             "'stem_spectra_buffer' arrays and 'mix_spectra_buffer' arrays "
-            "should have the same shape"
+            "should have the same shape, or the same length if only the "
+            "'mix_spectra_buffer' arrays are multi-channel"
         )
 
     return stem_spectra_buffer, mix_spectra_buffer
\ No newline at end of file
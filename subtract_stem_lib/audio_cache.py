@@ -0,0 +1,113 @@
+import os
+from hashlib import sha256
+from fractions import Fraction
+import numpy as np
+
+from .defaults import AUDIO_CACHE_MAX_SIZE_BYTES
+from ._sanitisation import sanitise as san
+
+
+# An on-disk cache of decoded (and possibly resampled) audio, stored as .npy
+# files so that hits can be memory-mapped. Entries are keyed by the source
+# file's resolved path, size and mtime, and by the requested sample rate.
+# A hit touches its entry's mtime, and the least recently touched entries are
+# deleted whenever the cache grows past 'max_size_bytes'.
+class AudioCache:
+    __slots__ = ["dir_path", "max_size_bytes"]
+
+    def __init__(
+        self, dir_path, *, max_size_bytes=AUDIO_CACHE_MAX_SIZE_BYTES
+    ):
+        self.dir_path = san("dir_path", "path")
+        self.max_size_bytes = san("max_size_bytes")
+
+        self.dir_path.mkdir(parents=True, exist_ok=True)
+
+    def _get_key(self, path, sample_rate):
+        stat = path.stat()
+
+        return sha256(
+            "\0".join([
+                str(path.resolve()), str(stat.st_size), str(stat.st_mtime_ns),
+                str(sample_rate)
+            ]).encode()
+        ).hexdigest()
+
+    # the sample rate of the decoded audio is kept in the entry's name
+    def _get_entry_path(self, key, sample_rate):
+        return self.dir_path / (
+            f"{key}_{sample_rate.numerator}_{sample_rate.denominator}.npy"
+        )
+
+    def _find_entry_path(self, key):
+        for entry_path in self.dir_path.glob(f"{key}_*.npy"):
+            return entry_path
+
+        return None
+
+    def get(self, path, *, sample_rate=None):
+        path = san("path")
+        entry_path = self._find_entry_path(self._get_key(path, sample_rate))
+
+        if entry_path is None:
+            return None
+
+        try:
+            audio = np.load(entry_path, mmap_mode="r")
+            os.utime(entry_path)
+        except FileNotFoundError:  # evicted by another process
+            return None
+
+        _, numerator, denominator = entry_path.stem.rsplit("_", 2)
+
+        return audio, Fraction(int(numerator), int(denominator))
+
+    def put(self, path, audio, *, sample_rate=None, decoded_sample_rate):
+        path = san("path")
+        decoded_sample_rate = san("decoded_sample_rate", "sample_rate")
+
+        entry_path = self._get_entry_path(
+            self._get_key(path, sample_rate), decoded_sample_rate
+        )
+        tmp_path = entry_path.with_name(f"{entry_path.stem}.{os.getpid()}.tmp")
+
+        # written under another name first so that readers never see a
+        # partial entry
+        with open(tmp_path, "wb") as f:
+            np.save(f, audio)
+
+        os.replace(tmp_path, entry_path)
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+
+        for entry_path in self.dir_path.glob("*.npy"):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size_bytes:
+                break
+
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+
+            total_size -= size
+
+    def clear(self):
+        for entry_path in self.dir_path.glob("*.npy"):
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
@@ -1,13 +1,15 @@
+from collections import OrderedDict
 from itertools import chain
 from math import tau
 from fractions import Fraction
 import numpy as np
 
-from .defaults import INNER_GRAIN_LEN
+from .defaults import INNER_GRAIN_LEN, INTERVAL_LEN, HANN_WINDOW_CACHE_SIZE
 from ._sanitisation import sanitise_arg as san, sanitise_args
+from .audio_stream import AudioStream, AudioStreamWriter
 
 
-def sanitise_pad_lens(self, pad_len, left_pad_len, right_pad_len):
+def sanitise_pad_lens(pad_len, left_pad_len, right_pad_len):
     if pad_len is None:
         yield 0 if left_pad_len is None else san("left_pad_len")
         yield 0 if right_pad_len is None else san("right_pad_len")
@@ -22,6 +24,70 @@ def sanitise_pad_lens(self, pad_len, left_pad_len, right_pad_len):
         yield pad_len
 
 
+# Least-recently-used cache of read-only Hann windows, shared by all
+# InnerGrainInfo instances.
+class _HannWindowCache:
+    __slots__ = ["_windows", "max_size", "hits", "misses"]
+
+    def __init__(self, *, max_size):
+        self._windows = OrderedDict()
+        self.max_size = max_size
+        self.hits = self.misses = 0
+
+    def get(self, key, get_window):
+        windows = self._windows
+
+        if key in windows:
+            self.hits += 1
+            windows.move_to_end(key)
+
+            return windows[key]
+
+        self.misses += 1
+
+        window = get_window()
+        window.setflags(write=False)
+
+        if self.max_size > 0:
+            windows[key] = window
+
+            while len(windows) > self.max_size:
+                windows.popitem(last=False)
+
+        return window
+
+    def resize(self, max_size):
+        self.max_size = max_size
+
+        while len(self._windows) > max_size:
+            self._windows.popitem(last=False)
+
+    def clear(self):
+        self._windows.clear()
+        self.hits = self.misses = 0
+
+    def get_info(self):
+        return {
+            "hits": self.hits, "misses": self.misses,
+            "size": len(self._windows), "max_size": self.max_size
+        }
+
+
+_hann_window_cache = _HannWindowCache(max_size=HANN_WINDOW_CACHE_SIZE)
+
+
+def set_hann_window_cache_size(max_size):
+    _hann_window_cache.resize(san("max_size", "hann_window_cache_size"))
+
+
+def get_hann_window_cache_info():
+    return _hann_window_cache.get_info()
+
+
+def clear_hann_window_cache():
+    _hann_window_cache.clear()
+
+
 class InnerGrainInfo:
     __slots__ = ["inner_grain_len", "interval_len", "overlap"]
 
@@ -31,6 +97,7 @@ class InnerGrainInfo:
         self.inner_grain_len, self.interval_len, self.overlap \
             = self._sanitise_args(inner_grain_len, interval_len, overlap)
 
+    @staticmethod
     def _strip_none(inner_grain_len, interval_len, overlap):
         if inner_grain_len is None:
             if None in (interval_len, overlap):
@@ -80,7 +147,7 @@ class InnerGrainInfo:
 
         return inner_grain_len, interval_len, overlap
 
-    def _get_hann_window_arrays(self):
+    def _get_hann_window_arrays(self, left_pad_len, right_pad_len):
         window_len = left_pad_len + self.inner_grain_len + right_pad_len
         window = np.empty(window_len, dtype=np.float32)
 
@@ -90,9 +157,9 @@ class InnerGrainInfo:
 
         return window, inner_window
 
-    def _set_unscaled_inner_window(self, arr):
+    def _set_unscaled_inner_window(self, arr, delay_audio_samples):
         # arr = phase
-        np.arange(self.inner_grain_len, out=arr)
+        arr[:] = np.arange(self.inner_grain_len, dtype=arr.dtype)
         arr += float(delay_audio_samples)
         arr *= tau / self.inner_grain_len
 
@@ -127,9 +194,23 @@ class InnerGrainInfo:
             = sanitise_pad_lens(pad_len, left_pad_len, right_pad_len)
         delay_audio_samples = san("delay_audio_samples")
 
-        window, inner_window = self._get_hann_window_arrays()
+        return _hann_window_cache.get(
+            (
+                self.inner_grain_len, self.interval_len, self.overlap,
+                left_pad_len, right_pad_len, delay_audio_samples
+            ),
+            lambda: self._get_uncached_hann_window(
+                left_pad_len, right_pad_len, delay_audio_samples
+            )
+        )
+
+    def _get_uncached_hann_window(
+        self, left_pad_len, right_pad_len, delay_audio_samples
+    ):
+        window, inner_window \
+            = self._get_hann_window_arrays(left_pad_len, right_pad_len)
 
-        self._set_unscaled_inner_window(inner_window)
+        self._set_unscaled_inner_window(inner_window, delay_audio_samples)
         scale = self._get_scale(inner_window)
         self._apply_scale(inner_window, scale)
 
@@ -271,7 +352,7 @@ class AudioToGrains:
             start_i=start_i,
             interval_len=interval_len,
             num_of_iterations=num_of_iterations,
-            audio_len=len(audio),
+            audio_len=audio.shape[-1],
             grain_len=len(window)
         )
 
@@ -283,14 +364,21 @@ class AudioToGrains:
         else:
             return chain(*subiterators)
 
+    # multi-channel audio of shape (channels, samples) gives grains of shape
+    # (channels, grain_len)
     def _sanitise_out(self, out):
+        shape = *self.audio.shape[:-1], len(self.window)
+
         if out is None:
-            out = np.empty(self.window.shape, dtype=np.float32)
+            out = np.empty(shape, dtype=np.float32)
         else:
-            out = san("out", "array_1d_float")
+            out = san("out", f"array_{len(shape)}d_float")
 
-            if out.shape != self.window.shape:
-                raise ValueError("'out' should have same shape as 'window'")
+            if out.shape != shape:
+                raise ValueError(
+                    "'out' should have the shape of 'window' with any "
+                    "channel dimension of 'audio' in front"
+                )
 
         return out
 
@@ -309,7 +397,7 @@ class AudioToGrains:
         )
 
         if grain_range.start == 0:
-            view_to_zero = self.out[:-stop_indices.start]
+            view_to_zero = self.out[..., :-stop_indices.start]
 
             def get_iterator(
                 fill_view_to_zero=view_to_zero.fill,
@@ -321,9 +409,9 @@ class AudioToGrains:
 
                 for stop_i in stop_indices:
                     multiply(
-                        audio[:stop_i],
+                        audio[..., :stop_i],
                         window[-stop_i:],
-                        out=out[-stop_i:]
+                        out=out[..., -stop_i:]
                     )
 
                     yield
@@ -335,9 +423,9 @@ class AudioToGrains:
             ):
                 for stop_i in stop_indices:
                     multiply(
-                        audio[:stop_i],
+                        audio[..., :stop_i],
                         window[-stop_i:],
-                        out=out[-stop_i:]
+                        out=out[..., -stop_i:]
                     )
 
                     yield
@@ -359,7 +447,7 @@ class AudioToGrains:
         ):
             for start_i in start_indices:
                 multiply(
-                    audio[start_i:start_i + grain_len],
+                    audio[..., start_i:start_i + grain_len],
                     window,
                     out=out
                 )
@@ -376,15 +464,15 @@ class AudioToGrains:
             stop_i = start_i + len(self.window)
 
             before_len = -start_i
-            after_len = stop_i - len(self.audio)
+            after_len = stop_i - self.audio.shape[-1]
 
-            self.out[:before_len] = 0
+            self.out[..., :before_len] = 0
             np.multiply(
                 self.audio,
                 self.window[before_len:-after_len],
-                out=self.out[before_len:-after_len]
+                out=self.out[..., before_len:-after_len]
             )
-            self.out[-after_len:] = 0
+            self.out[..., -after_len:] = 0
 
             yield
 
@@ -401,15 +489,15 @@ class AudioToGrains:
             out=self.out,
             interval_len=self.interval_len,
             prev_full_len=len(self.window),
-            curr_full_len=len(self.audio) - start_indices[0]
+            curr_full_len=self.audio.shape[-1] - start_indices[0]
         ):
             for start_i in start_indices:
                 multiply(
-                    audio[start_i:],
+                    audio[..., start_i:],
                     window[:curr_full_len],
-                    out=out[:curr_full_len]
+                    out=out[..., :curr_full_len]
                 )
-                out[curr_full_len:prev_full_len] = 0
+                out[..., curr_full_len:prev_full_len] = 0
 
                 yield
 
@@ -428,6 +516,282 @@ class AudioToGrains:
             yield bound_method(grain_range)
 
 
+# Like AudioToGrains, but reads from an AudioStream. Only one grain's worth of
+# audio is resident at a time; the overlap with the previous grain is kept and
+# the rest is read from the stream, so memory use doesn't depend on the length
+# of the audio.
+class AudioStreamToGrains:
+    __slots__ = [
+        "_grain_ranges", "_span", "_span_start_i",
+        "audio_stream",
+        "start_i", "interval_len", "num_of_iterations",
+        "window", "out"
+    ]
+
+    def __init__(
+        self, audio_stream, *,
+        start_i, interval_len, num_of_iterations,
+        window,
+        out=None
+    ):
+        if not isinstance(audio_stream, AudioStream):
+            raise TypeError(
+                "'audio_stream' should be a subtract_stem_lib.AudioStream"
+            )
+
+        self.audio_stream = audio_stream
+        (
+            self.start_i, self.interval_len, self.num_of_iterations,
+            self.window
+        ) = sanitise_args(
+            "start_i", "interval_len", "num_of_iterations", "window"
+        )
+        self.out = self._sanitise_out(out)
+
+        self._grain_ranges = _GrainRanges(
+            start_i=start_i,
+            interval_len=interval_len,
+            num_of_iterations=num_of_iterations,
+            audio_len=len(audio_stream),
+            grain_len=len(window)
+        )
+
+        self._span = np.empty(self.out.shape, dtype=np.float32)
+        self._span_start_i = None
+
+    def __iter__(self):
+        return chain(*self._get_subiterators())
+
+    # a multi-channel stream gives grains of shape (channels, grain_len)
+    def _sanitise_out(self, out):
+        shape = *self.audio_stream.shape[:-1], len(self.window)
+
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        else:
+            out = san("out", f"array_{len(shape)}d_float")
+
+            if out.shape != shape:
+                raise ValueError(
+                    "'out' should have the shape of 'window' with any "
+                    "channel dimension of 'audio_stream' in front"
+                )
+
+        return out
+
+    def _read_span(self, start_i):
+        span = self._span
+        span_len = span.shape[-1]
+        span_start_i = self._span_start_i
+
+        if span_start_i is not None \
+                and span_start_i <= start_i < span_start_i + span_len:
+            kept_len = span_start_i + span_len - start_i
+            span[..., :kept_len] = span[..., span_len - kept_len:]
+        else:
+            kept_len = 0
+
+        self.audio_stream.read(start_i + kept_len, out=span[..., kept_len:])
+        self._span_start_i = start_i
+
+    def _get_before_iterator(self, grain_range):
+        def get_iterator(fill_out=self.out.fill, grain_range=grain_range):
+            fill_out(0)
+
+            for i in grain_range:
+                yield
+
+        return get_iterator()
+
+    # the stream zero-fills anything outside the audio, so entering, island
+    # and exiting grains need no special handling
+    def _get_reading_iterator(self, grain_range):
+        def get_iterator(
+            start_indices
+                =self._grain_ranges.get_start_indices_from_grain_range(
+                    grain_range
+                ),
+            read_span=self._read_span,
+            multiply=np.multiply,
+            span=self._span, window=self.window, out=self.out
+        ):
+            for start_i in start_indices:
+                read_span(start_i)
+                multiply(span, window, out=out)
+
+                yield
+
+        return get_iterator()
+
+    _get_entering_iterator = _get_island_iterator = _get_full_iterator \
+        = _get_exiting_iterator = _get_reading_iterator
+    _get_after_iterator = _get_before_iterator
+
+    def _get_subiterators(self):
+        for name, grain_range in self._grain_ranges:
+            bound_method = getattr(self, f"_get_{name}_iterator")
+
+            yield bound_method(grain_range)
+
+
+# Fills 'out' with 'num_of_grains_per_block' grains per iteration, one per
+# row; rows past the last grain of a short final block are zeroed. For
+# multi-channel audio, each row is of shape (channels, grain_len).
+class AudioToGrainBlocks:
+    __slots__ = [
+        "_grain_ranges",
+        "audio",
+        "start_i", "interval_len", "num_of_iterations",
+        "window", "num_of_grains_per_block",
+        "out"
+    ]
+
+    def __init__(
+        self, audio, *,
+        start_i, interval_len, num_of_iterations,
+        window,
+        num_of_grains_per_block=None,
+        out=None
+    ):
+        (
+            self.audio,
+            self.start_i, self.interval_len, self.num_of_iterations,
+            self.window
+        ) = sanitise_args(
+            "audio",
+            "start_i", "interval_len", "num_of_iterations",
+            "window"
+        )
+
+        if num_of_grains_per_block is None:
+            self.num_of_grains_per_block = self.num_of_iterations
+        else:
+            self.num_of_grains_per_block = san("num_of_grains_per_block")
+
+        self.out = self._sanitise_out(out)
+
+        self._grain_ranges = _GrainRanges(
+            start_i=start_i,
+            interval_len=interval_len,
+            num_of_iterations=num_of_iterations,
+            audio_len=audio.shape[-1],
+            grain_len=len(window)
+        )
+
+    def __iter__(self):
+        def get_iterator(
+            block_starts=range(
+                0, self.num_of_iterations, self.num_of_grains_per_block
+            ),
+            num_of_grains_per_block=self.num_of_grains_per_block,
+            num_of_iterations=self.num_of_iterations,
+            fill_block=self._fill_block
+        ):
+            for block_start in block_starts:
+                fill_block(
+                    range(
+                        block_start,
+                        min(
+                            block_start + num_of_grains_per_block,
+                            num_of_iterations
+                        )
+                    )
+                )
+
+                yield
+
+        return get_iterator()
+
+    def _sanitise_out(self, out):
+        shape = (
+            self.num_of_grains_per_block,
+            *self.audio.shape[:-1], len(self.window)
+        )
+
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        else:
+            out = san("out", f"array_{len(shape)}d_float")
+
+            if out.shape != shape:
+                raise ValueError(
+                    "'out' should have shape (num_of_grains_per_block, "
+                    "len(window)), with any channel dimension of 'audio' "
+                    "in the middle"
+                )
+
+        return out
+
+    # a (num_of_grains, *channels, grain_len) view of the grains in 'audio'
+    def _get_frames(self, audio, *, start_i, num_of_grains):
+        span_len = (num_of_grains - 1) * self.interval_len + len(self.window)
+
+        return np.moveaxis(
+            np.lib.stride_tricks.sliding_window_view(
+                audio[..., start_i:start_i + span_len], len(self.window),
+                axis=-1
+            )[..., ::self.interval_len, :],
+            -2, 0
+        )
+
+    def _fill_zero_rows(self, rows, grain_range):
+        rows.fill(0)
+
+    def _fill_full_rows(self, rows, grain_range):
+        frames = self._get_frames(
+            self.audio,
+            start_i=self._grain_ranges.get_grain_start_i(grain_range.start),
+            num_of_grains=len(grain_range)
+        )
+
+        np.multiply(frames, self.window, out=rows)
+
+    # only the grains overlapping an end of 'audio' are copied and padded
+    def _fill_edge_rows(self, rows, grain_range):
+        span_start_i = self._grain_ranges.get_grain_start_i(grain_range.start)
+        span_stop_i = self._grain_ranges.get_grain_stop_i(grain_range.stop - 1)
+
+        padded = np.zeros(
+            (*self.audio.shape[:-1], span_stop_i - span_start_i),
+            dtype=np.float32
+        )
+
+        audio_start_i = max(span_start_i, 0)
+        audio_stop_i = min(span_stop_i, self.audio.shape[-1])
+        padded[
+            ..., audio_start_i - span_start_i:audio_stop_i - span_start_i
+        ] = self.audio[..., audio_start_i:audio_stop_i]
+
+        frames = self._get_frames(
+            padded, start_i=0, num_of_grains=len(grain_range)
+        )
+
+        np.multiply(frames, self.window, out=rows)
+
+    _fill_before_rows = _fill_after_rows = _fill_zero_rows
+    _fill_entering_rows = _fill_island_rows = _fill_exiting_rows \
+        = _fill_edge_rows
+
+    def _fill_block(self, block_range):
+        for name, grain_range in self._grain_ranges:
+            sub_range = range(
+                max(grain_range.start, block_range.start),
+                min(grain_range.stop, block_range.stop)
+            )
+
+            if sub_range.start >= sub_range.stop:
+                continue
+
+            rows = self.out[
+                sub_range.start - block_range.start
+                :sub_range.stop - block_range.start
+            ]
+
+            getattr(self, f"_fill_{name}_rows")(rows, sub_range)
+
+        self.out[len(block_range):].fill(0)
+
+
 class AudioToHannGrains:
     __slots__ = [
         "_inner_grain_info",
@@ -470,46 +834,128 @@ class AudioToHannGrains:
             self.delay_audio_samples - self._delay_audio_samples_remainder
         )
 
+        self.audio = audio
         self.out = self._sanitise_out(out)
 
-        self._audio_to_grains = AudioToGrains(
+        self._audio_to_grains = self._get_audio_to_grains(
             audio,
             start_i=start_i - delay_audio_samples_whole,
-            interval_len=self.interval_len,
-            num_of_iterations=num_of_iterations,
-            window=self._get_window(),
-            out=self.out[self.left_pad_len:len(self.out) - self.right_pad_len]
+            num_of_iterations=num_of_iterations
         )
-        self.audio = audio
         self.num_of_iterations = num_of_iterations
 
     def __iter__(self):
         return iter(self._audio_to_grains)
 
     def _sanitise_out(self, out):
+        shape = *self.audio.shape[:-1], self.grain_len
+
         if out is None:
-            out = np.empty(self.grain_len, dtype=np.float32)
+            out = np.empty(shape, dtype=np.float32)
         else:
-            out = san("out", "array_1d_float")
+            out = san("out", f"array_{len(shape)}d_float")
 
-            if len(out) != self.grain_len:
+            if out.shape != shape:
                 raise ValueError(
                     "if provided, 'out' should be of size (inner_grain_len + "
                     "pad_len * 2) or (left_pad_len + padded_grain_len + "
-                    "right_pad_len)"
+                    "right_pad_len), with any channel dimension of 'audio' "
+                    "in front"
                 )
 
-        out[:self.left_pad_len] = 0
-        out[self.grain_len - self.right_pad_len:] = 0
+        out[..., :self.left_pad_len] = 0
+        out[..., self.grain_len - self.right_pad_len:] = 0
 
         return out
 
+    # the padding in 'out' is zeroed once, so only the inner window is needed
     def _get_window(self):
         return self._inner_grain_info.get_hann_window(
-            left_pad_len=self.left_pad_len, right_pad_len=self.right_pad_len,
             delay_audio_samples=self._delay_audio_samples_remainder
         )
 
+    def _get_audio_to_grains(self, audio, *, start_i, num_of_iterations):
+        if isinstance(audio, AudioStream):
+            audio_to_grains_class = AudioStreamToGrains
+        else:
+            audio_to_grains_class = AudioToGrains
+
+        return audio_to_grains_class(
+            audio,
+            start_i=start_i,
+            interval_len=self.interval_len,
+            num_of_iterations=num_of_iterations,
+            window=self._get_window(),
+            out=self.out[
+                ..., self.left_pad_len:self.grain_len - self.right_pad_len
+            ]
+        )
+
+
+class AudioToHannGrainBlocks(AudioToHannGrains):
+    __slots__ = ["num_of_grains_per_block"]
+
+    def __init__(
+        self, audio, *,
+        start_i, num_of_iterations,
+        inner_grain_len=None, interval_len=None, overlap=None,
+        pad_len=None, left_pad_len=None, right_pad_len=None,
+        delay_audio_samples=Fraction(0),
+        num_of_grains_per_block=None,
+        out=None
+    ):
+        if num_of_grains_per_block is None:
+            self.num_of_grains_per_block = san("num_of_iterations")
+        else:
+            self.num_of_grains_per_block = san("num_of_grains_per_block")
+
+        super().__init__(
+            audio,
+            start_i=start_i, num_of_iterations=num_of_iterations,
+            inner_grain_len=inner_grain_len,
+            interval_len=interval_len, overlap=overlap,
+            pad_len=pad_len,
+            left_pad_len=left_pad_len, right_pad_len=right_pad_len,
+            delay_audio_samples=delay_audio_samples,
+            out=out
+        )
+
+    def _sanitise_out(self, out):
+        shape = (
+            self.num_of_grains_per_block,
+            *self.audio.shape[:-1], self.grain_len
+        )
+
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        else:
+            out = san("out", f"array_{len(shape)}d_float")
+
+            if out.shape != shape:
+                raise ValueError(
+                    "if provided, 'out' should have shape "
+                    "(num_of_grains_per_block, grain_len), with any channel "
+                    "dimension of 'audio' in the middle"
+                )
+
+        out[..., :self.left_pad_len] = 0
+        out[..., self.grain_len - self.right_pad_len:] = 0
+
+        return out
+
+    def _get_audio_to_grains(self, audio, *, start_i, num_of_iterations):
+        return AudioToGrainBlocks(
+            audio,
+            start_i=start_i,
+            interval_len=self.interval_len,
+            num_of_iterations=num_of_iterations,
+            window=self._get_window(),
+            num_of_grains_per_block=self.num_of_grains_per_block,
+            out=self.out[
+                ..., self.left_pad_len:self.grain_len - self.right_pad_len
+            ]
+        )
+
 
 class AddGrainsToAudio:
     __slots__ = [
@@ -538,12 +984,19 @@ class AddGrainsToAudio:
             "audio"
         )
 
+        # a mono grain is added to every channel of multi-channel audio
+        if self.grain.shape[:-1] not in ((), self.audio.shape[:-1]):
+            raise ValueError(
+                "'grain' should be 1-D or have the same number of channels "
+                "as 'audio'"
+            )
+
         self._grain_ranges = _GrainRanges(
             start_i=start_i,
             interval_len=interval_len,
             num_of_iterations=num_of_iterations,
-            audio_len=len(audio),
-            grain_len=len(grain)
+            audio_len=audio.shape[-1],
+            grain_len=grain.shape[-1]
         )
 
     def __iter__(self):
@@ -572,7 +1025,7 @@ class AddGrainsToAudio:
                 grain=self.grain, audio=self.audio
             ):
                 for stop_i in stop_indices:
-                    audio[:stop_i] -= grain[-stop_i:]
+                    audio[..., :stop_i] -= grain[..., -stop_i:]
 
                     yield
         else:
@@ -581,7 +1034,7 @@ class AddGrainsToAudio:
                 grain=self.grain, audio=self.audio
             ):
                 for stop_i in stop_indices:
-                    audio[:stop_i] += grain[-stop_i:]
+                    audio[..., :stop_i] += grain[..., -stop_i:]
 
                     yield
 
@@ -595,19 +1048,21 @@ class AddGrainsToAudio:
         if self.subtract:
             def get_iterator(
                 start_indices=start_indices,
-                grain=self.grain, audio=self.audio, grain_len=len(self.grain)
+                grain=self.grain, audio=self.audio,
+                grain_len=self.grain.shape[-1]
             ):
                 for start_i in start_indices:
-                    audio[start_i:start_i + grain_len] -= grain
+                    audio[..., start_i:start_i + grain_len] -= grain
 
                     yield
         else:
             def get_iterator(
                 start_indices=start_indices,
-                grain=self.grain, audio=self.audio, grain_len=len(self.grain)
+                grain=self.grain, audio=self.audio,
+                grain_len=self.grain.shape[-1]
             ):
                 for start_i in start_indices:
-                    audio[start_i:start_i + grain_len] += grain
+                    audio[..., start_i:start_i + grain_len] += grain
 
                     yield
 
@@ -619,9 +1074,9 @@ class AddGrainsToAudio:
             grain_range
         ):
             grain_start_i = -start_i
-            grain_stop_i = grain_start_i + len(self.audio)
+            grain_stop_i = grain_start_i + self.audio.shape[-1]
 
-            grain_island = self.grain[grain_start_i:grain_stop_i]
+            grain_island = self.grain[..., grain_start_i:grain_stop_i]
 
             if self.subtract:
                 self.audio -= grain_island
@@ -638,19 +1093,21 @@ class AddGrainsToAudio:
         if self.subtract:
             def get_iterator(
                 start_indices=start_indices,
-                grain=self.grain, audio=self.audio, audio_len=len(self.audio)
+                grain=self.grain, audio=self.audio,
+                audio_len=self.audio.shape[-1]
             ):
                 for start_i in start_indices:
-                    audio[start_i:] -= grain[:audio_len - start_i]
+                    audio[..., start_i:] -= grain[..., :audio_len - start_i]
 
                     yield
         else:
             def get_iterator(
                 start_indices=start_indices,
-                grain=self.grain, audio=self.audio, audio_len=len(self.audio)
+                grain=self.grain, audio=self.audio,
+                audio_len=self.audio.shape[-1]
             ):
                 for start_i in start_indices:
-                    audio[start_i:] += grain[:audio_len - start_i]
+                    audio[..., start_i:] += grain[..., :audio_len - start_i]
 
                     yield
 
@@ -663,3 +1120,304 @@ class AddGrainsToAudio:
             bound_method = getattr(self, f"_get_{name}_iterator")
 
             yield bound_method(grain_range)
+
+
+# Like AddGrainsToAudio, but the result is written to 'audio_stream_writer'
+# as it becomes final instead of being kept in memory. Everything before a
+# grain's start is final once it's added, so only one grain's length of
+# the result is ever held, in '_accumulator'. The grains are added to (or
+# subtracted from) 'audio' if it's provided, or to silence of 'audio_len'
+# otherwise, and the rest of the result is written with the last grain.
+class AddGrainsToAudioStreamWriter:
+    __slots__ = [
+        "_accumulator", "_chunk", "_written_len",
+        "grain",
+        "start_i", "interval_len", "num_of_iterations",
+        "subtract",
+        "audio", "audio_len",
+        "audio_stream_writer"
+    ]
+
+    def __init__(
+        self, grain, *,
+        start_i, interval_len, num_of_iterations,
+        subtract=False,
+        audio=None, audio_len=None,
+        audio_stream_writer
+    ):
+        (
+            self.grain,
+            self.start_i, self.interval_len, self.num_of_iterations,
+            self.subtract
+        ) = sanitise_args(
+            "grain",
+            "start_i", "interval_len", "num_of_iterations",
+            "subtract"
+        )
+
+        if audio is None:
+            if audio_len is None:
+                raise TypeError(
+                    "either 'audio' or 'audio_len' should be provided"
+                )
+
+            self.audio = None
+            self.audio_len = san("audio_len")
+            channels_shape = self.grain.shape[:-1]
+        else:
+            if audio_len is not None:
+                raise TypeError(
+                    "if 'audio' is provided, 'audio_len' should not be"
+                )
+
+            self.audio \
+                = audio if isinstance(audio, AudioStream) else san("audio")
+            self.audio_len = self.audio.shape[-1]
+            channels_shape = self.audio.shape[:-1]
+
+            if self.grain.shape[:-1] not in ((), channels_shape):
+                raise ValueError(
+                    "'grain' should be 1-D or have the same number of "
+                    "channels as 'audio'"
+                )
+
+        if not isinstance(audio_stream_writer, AudioStreamWriter):
+            raise TypeError(
+                "'audio_stream_writer' should be a "
+                "subtract_stem_lib.AudioStreamWriter"
+            )
+
+        if channels_shape != (
+            () if audio_stream_writer.channels == 1
+            else (audio_stream_writer.channels,)
+        ):
+            raise ValueError(
+                "'audio_stream_writer' should have the same number of "
+                "channels as the result"
+            )
+
+        self.audio_stream_writer = audio_stream_writer
+
+        self._accumulator = np.zeros(
+            (*channels_shape, self.grain.shape[-1]), dtype=np.float32
+        )
+        self._chunk = np.empty_like(self._accumulator)
+        self._written_len = 0
+
+    def __iter__(self):
+        def get_iterator(
+            start_indices=range(
+                self.start_i,
+                self.start_i + self.num_of_iterations * self.interval_len,
+                self.interval_len
+            ),
+            add_grain=self._add_grain,
+            flush=self._flush,
+            audio_len=self.audio_len
+        ):
+            for start_i in start_indices[:-1]:
+                add_grain(start_i)
+
+                yield
+
+            add_grain(start_indices[-1])
+            flush(audio_len)
+
+            yield
+
+        return get_iterator()
+
+    def _read_audio(self, start_i, *, out):
+        if self.audio is None:
+            out.fill(0)
+        elif isinstance(self.audio, AudioStream):
+            self.audio.read(start_i, out=out)
+        else:
+            out[...] = self.audio[..., start_i:start_i + out.shape[-1]]
+
+    # writes the result up to 'stop_i', moving '_accumulator' along with it
+    def _flush(self, stop_i):
+        accumulator, chunk = self._accumulator, self._chunk
+        grain_len = accumulator.shape[-1]
+        stop_i = min(stop_i, self.audio_len)
+
+        while self._written_len < stop_i:
+            chunk_len = min(stop_i - self._written_len, grain_len)
+            chunk_view = chunk[..., :chunk_len]
+
+            self._read_audio(self._written_len, out=chunk_view)
+
+            if self.subtract:
+                np.subtract(
+                    chunk_view, accumulator[..., :chunk_len], out=chunk_view
+                )
+            else:
+                np.add(
+                    chunk_view, accumulator[..., :chunk_len], out=chunk_view
+                )
+
+            self.audio_stream_writer.write(chunk_view)
+
+            accumulator[..., :grain_len - chunk_len] \
+                = accumulator[..., chunk_len:]
+            accumulator[..., grain_len - chunk_len:] = 0
+            self._written_len += chunk_len
+
+    def _add_grain(self, start_i):
+        self._flush(start_i)
+
+        accumulator, grain = self._accumulator, self.grain
+        grain_len = grain.shape[-1]
+        offset = start_i - self._written_len  # only < 0 before the audio
+
+        if 0 <= offset < grain_len:
+            accumulator[..., offset:] += grain[..., :grain_len - offset]
+        elif -grain_len < offset < 0:
+            accumulator[..., :grain_len + offset] += grain[..., -offset:]
+
+
+# Overlap-adds 'num_of_grains_per_block' grains per iteration. The block is
+# cut into column slices of 'interval_len', and slice j of every grain lands
+# on row j onwards of a (num_of_grains + j, interval_len) view of the span,
+# so each block costs ceil(grain_len / interval_len) vectorised additions.
+# For multi-channel audio, 'grain_block' is of shape
+# (num_of_grains_per_block, channels, grain_len).
+class AddGrainBlocksToAudio:
+    __slots__ = [
+        "_grain_ranges", "_num_of_segments",
+        "grain_block",
+        "start_i", "interval_len", "num_of_iterations",
+        "subtract",
+        "audio",
+        "intermediate",
+        "num_of_grains_per_block", "grain_len"
+    ]
+
+    def __init__(
+        self, grain_block, *,
+        start_i, interval_len, num_of_iterations,
+        subtract=False,
+        audio,
+        intermediate=None  # numpy.float32
+    ):
+        (
+            self.grain_block,
+            self.start_i, self.interval_len, self.num_of_iterations,
+            self.subtract,
+            self.audio
+        ) = sanitise_args(
+            "grain_block",
+            "start_i", "interval_len", "num_of_iterations",
+            "subtract",
+            "audio"
+        )
+
+        if grain_block.shape[1:-1] != audio.shape[:-1]:
+            raise ValueError(
+                "'grain_block' should be of shape (num_of_grains_per_block, "
+                "grain_len), with any channel dimension of 'audio' in the "
+                "middle"
+            )
+
+        self.num_of_grains_per_block = len(grain_block)
+        self.grain_len = grain_block.shape[-1]
+
+        self._num_of_segments = -(-self.grain_len // self.interval_len)
+        self.intermediate = self._sanitise_intermediate(intermediate)
+
+        self._grain_ranges = _GrainRanges(
+            start_i=start_i,
+            interval_len=interval_len,
+            num_of_iterations=num_of_iterations,
+            audio_len=audio.shape[-1],
+            grain_len=self.grain_len
+        )
+
+    def __iter__(self):
+        def get_iterator(
+            block_starts=range(
+                0, self.num_of_iterations, self.num_of_grains_per_block
+            ),
+            num_of_grains_per_block=self.num_of_grains_per_block,
+            num_of_iterations=self.num_of_iterations,
+            add_block=self._add_block
+        ):
+            for block_start in block_starts:
+                add_block(
+                    range(
+                        block_start,
+                        min(
+                            block_start + num_of_grains_per_block,
+                            num_of_iterations
+                        )
+                    )
+                )
+
+                yield
+
+        return get_iterator()
+
+    def _sanitise_intermediate(self, intermediate):
+        intermediate_len = (
+            (self.num_of_grains_per_block + self._num_of_segments - 1)
+            * self.interval_len
+        )
+
+        shape = *self.audio.shape[:-1], intermediate_len
+
+        if intermediate is None:
+            intermediate = np.empty(shape, dtype=np.float32)
+        else:
+            intermediate = san("intermediate", f"array_{len(shape)}d_float")
+
+            if intermediate.shape != shape:
+                raise ValueError(
+                    "if provided, 'intermediate' should be of size "
+                    "(num_of_grains_per_block + ceil(grain_len / "
+                    "interval_len) - 1) * interval_len, with any channel "
+                    "dimension of 'audio' in front"
+                )
+
+        return intermediate
+
+    def _add_block(self, block_range):
+        interval_len, grain_len = self.interval_len, self.grain_len
+        num_of_grains = len(block_range)
+
+        span_start_i = self._grain_ranges.get_grain_start_i(block_range.start)
+        num_of_span_rows = num_of_grains + self._num_of_segments - 1
+        span = self.intermediate[..., :num_of_span_rows * interval_len]
+        span.fill(0)
+        span_rows = self.intermediate.reshape(
+            *self.intermediate.shape[:-1], -1, interval_len
+        )[..., :num_of_span_rows, :]
+        # the grains along the second last axis, like 'span_rows'
+        grain_rows = np.moveaxis(self.grain_block[:num_of_grains], 0, -2)
+
+        for segment_i in range(self._num_of_segments):
+            segment_start_i = segment_i * interval_len
+            segment_len = min(interval_len, grain_len - segment_start_i)
+
+            span_rows[
+                ..., segment_i:segment_i + num_of_grains, :segment_len
+            ] += grain_rows[
+                ..., segment_start_i:segment_start_i + segment_len
+            ]
+
+        audio_start_i = max(span_start_i, 0)
+        audio_stop_i = min(
+            span_start_i + span.shape[-1], self.audio.shape[-1]
+        )
+
+        if audio_start_i >= audio_stop_i:
+            return
+
+        audio_view = self.audio[..., audio_start_i:audio_stop_i]
+        span_view = span[
+            ..., audio_start_i - span_start_i:audio_stop_i - span_start_i
+        ]
+
+        if self.subtract:
+            audio_view -= span_view
+        else:
+            audio_view += span_view
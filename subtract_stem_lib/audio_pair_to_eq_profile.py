@@ -3,25 +3,34 @@ from fractions import Fraction
 from .defaults import INNER_GRAIN_LEN, MAX_ABS_RESULT
 from ._sanitisation import sanitise_arg as san, sanitise_args
 from ._sanitise_unique_arrays_of_shape import sanitise_unique_arrays_of_shape
+from ._sanitise_spectra_buffer import get_spectrum_shape
 from ._sanitise_hann_inner_grain_len_interval_len import (
     sanitise_hann_inner_grain_len_interval_len
 )
+from .fft_backends import sanitise_fft_backend
+from .pad_lens import sanitise_pad_lens_or_auto
 from .audio_grains import AudioToHannGrains
 from .transforms import GrainsToSpectraBuffer
+from .fractional_delay import (
+    split_delay_samples, ApplyPhaseRampToSpectraBufferNewest
+)
 from .eq_profiles import SpectraBuffersToEqProfile
 
 
 class AudioPairToEqProfile:
     __slots__ = [
         "_stem_audio_to_grains", "_stem_grains_to_spectra_buffer",
+        "_apply_phase_ramp_to_stem_spectra_buffer",
         "_mix_audio_to_grains", "_mix_grains_to_spectra_buffer",
         "_spectra_buffers_to_eq_profile",
         "stem_audio", "mix_audio",
         "start_i", "interval_len", "num_of_iterations",
-        "inner_grain_len",
-        "delay_stem_samples", "max_abs_result", "ret_reciprocal_eq",
+        "inner_grain_len", "left_pad_len", "right_pad_len", "grain_len",
+        "half_spectrum", "fft_backend",
+        "delay_stem_samples", "fractional_delay_mode",
+        "max_abs_result", "ret_reciprocal_eq",
         "intermediate_a", "intermediate_b", "intermediate_c",
-        "intermediate_d",
+        "intermediate_d", "intermediate_e",
         "out",
         "calculate_eq_profile"
     ]
@@ -30,64 +39,119 @@ class AudioPairToEqProfile:
         self, stem_audio, mix_audio, *,
         start_i, interval_len, num_of_iterations,
         inner_grain_len=INNER_GRAIN_LEN,
-        delay_stem_samples=Fraction(0),
+        pad_len=None, left_pad_len=None, right_pad_len=None,
+        half_spectrum=False, fft_backend=None,
+        delay_stem_samples=Fraction(0), fractional_delay_mode="window",
         max_abs_result=MAX_ABS_RESULT,
         ret_reciprocal_eq=False,
-        intermediate_a=None,  # numpy.float32 of size grain_len???NEED TO UPDATE THIS BIT
-        intermediate_b=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_c=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_d=None,  # bool of size grain_len
+        # with multi-channel audio, 'channels' is that of 'mix_audio'; a mono
+        # 'stem_audio' is shared between the mix channels
+        intermediate_a=None,  # numpy.float32 of shape (channels, grain_len)
+        intermediate_b=None,  # numpy.complex64 of the stem's spectrum shape
+        intermediate_c=None,  # numpy.complex64, (channels, spectrum_len)
+        intermediate_d=None,  # bool of shape (channels, spectrum_len)
+        intermediate_e=None,  # numpy.float32, (channels, spectrum_len)
         out=None
     ):
-        self.stem_audio, self.mix_audio, self.delay_stem_samples \
-            = sanitise_args("stem_audio", "mix_audio", "delay_stem_samples")
+        (
+            self.stem_audio, self.mix_audio, self.half_spectrum,
+            self.delay_stem_samples, self.fractional_delay_mode
+        ) = sanitise_args(
+            "stem_audio", "mix_audio", "half_spectrum", "delay_stem_samples",
+            "fractional_delay_mode"
+        )
+
+        if self.stem_audio.shape[:-1] not in ((), self.mix_audio.shape[:-1]):
+            raise ValueError(
+                "'stem_audio' should be mono or have the same number of "
+                "channels as 'mix_audio'"
+            )
+
+        self.fft_backend = sanitise_fft_backend(fft_backend)
         self.inner_grain_len, self.interval_len \
             = sanitise_hann_inner_grain_len_interval_len(
                   inner_grain_len, interval_len
               )
+        self.left_pad_len, self.right_pad_len = sanitise_pad_lens_or_auto(
+            pad_len, left_pad_len, right_pad_len,
+            inner_grain_len=self.inner_grain_len,
+            half_spectrum=self.half_spectrum, fft_backend=self.fft_backend
+        )
+        self.grain_len \
+            = self.left_pad_len + self.inner_grain_len + self.right_pad_len
 
         (
             self.intermediate_a, self.intermediate_b, self.intermediate_c,
-            self.intermediate_d,
-            self.out
+            self.intermediate_d, self.intermediate_e, self.out
         ) = self._sanitise_intermediates_and_out(
             intermediate_a, intermediate_b, intermediate_c, intermediate_d,
-            out
+            intermediate_e, out
         )
 
+        # the stem grain only needs the first row of a multi-channel grain
+        stem_grain = self.intermediate_a[
+            (0,) * (self.mix_audio.ndim - self.stem_audio.ndim)
+        ]
+
+        # in "phase_ramp" mode, the stem is framed with the nearest whole
+        # delay and the rest is applied to its spectra
+        if self.fractional_delay_mode == "window":
+            grain_delay_stem_samples = self.delay_stem_samples
+        else:
+            grain_delay_stem_samples, spectrum_delay_stem_samples \
+                = split_delay_samples(self.delay_stem_samples)
+
         self._stem_audio_to_grains = AudioToHannGrains(
             stem_audio,
-            start_i=start_i, interval_len=interval_len,
-            num_of_iterations=num_of_iterations,
-            grain_len=grain_len,
-            delay_audio_samples=delay_stem_samples,
-            out=self.intermediate_a
+            start_i=start_i, num_of_iterations=num_of_iterations,
+            inner_grain_len=self.inner_grain_len,
+            interval_len=self.interval_len,
+            left_pad_len=self.left_pad_len, right_pad_len=self.right_pad_len,
+            delay_audio_samples=grain_delay_stem_samples,
+            out=stem_grain
         )
-
         self.start_i, self.num_of_iterations = (
             self._stem_audio_to_grains.start_i,
             self._stem_audio_to_grains.num_of_iterations
         )
 
         self._stem_grains_to_spectra_buffer = GrainsToSpectraBuffer(
-            self.intermediate_a, out=self.intermediate_b
+            stem_grain,
+            half_spectrum=self.half_spectrum, fft_backend=self.fft_backend,
+            out=self.intermediate_b
         )
+        if self.fractional_delay_mode == "window":
+            self._apply_phase_ramp_to_stem_spectra_buffer = None
+        else:
+            self._apply_phase_ramp_to_stem_spectra_buffer \
+                = ApplyPhaseRampToSpectraBufferNewest.from_delay_samples(
+                      self.intermediate_b,
+                      grain_len=self.grain_len,
+                      delay_samples=spectrum_delay_stem_samples,
+                      half_spectrum=self.half_spectrum
+                  )
         self._mix_audio_to_grains = AudioToHannGrains(
             mix_audio,
-            start_i=start_i, interval_len=interval_len,
-            num_of_iterations=num_of_iterations,
-            grain_len=grain_len,
+            start_i=start_i, num_of_iterations=num_of_iterations,
+            inner_grain_len=self.inner_grain_len,
+            interval_len=self.interval_len,
+            left_pad_len=self.left_pad_len, right_pad_len=self.right_pad_len,
             out=self.intermediate_a
         )
         self._mix_grains_to_spectra_buffer = GrainsToSpectraBuffer(
-            self.intermediate_a, out=self.intermediate_c
+            self.intermediate_a,
+            half_spectrum=self.half_spectrum, fft_backend=self.fft_backend,
+            out=self.intermediate_c
         )
 
+        # The EQ stage's float intermediate can't be the start of the grain,
+        # even though the grain isn't needed by then. AudioToHannGrains only
+        # zeroes the grain's padding once, so it has to stay zeroed.
         self._spectra_buffers_to_eq_profile = SpectraBuffersToEqProfile(
             self.intermediate_b, self.intermediate_c,
             max_abs_result=max_abs_result,
             ret_reciprocal_eq=ret_reciprocal_eq,
-            intermediate_a=self.intermediate_a,
+            intermediate_a=self.intermediate_e,
             intermediate_b=self.intermediate_d,
             out=self.out
         )
@@ -101,17 +165,10 @@ class AudioPairToEqProfile:
             self._spectra_buffers_to_eq_profile.calculate_eq_profile
         )
 
-
     def __iter__(self):
         def get_iterator(
             num_of_iterations_range=range(self.num_of_iterations),
-            iter_=zip(
-                self._stem_audio_to_grains,
-                self._stem_grains_to_spectra_buffer,
-                self._mix_audio_to_grains,
-                self._mix_grains_to_spectra_buffer,
-                self._spectra_buffers_to_eq_profile
-            )
+            iter_=zip(*self._get_stages())
         ):
             for _ in num_of_iterations_range:
                 next(iter_)
@@ -120,18 +177,46 @@ class AudioPairToEqProfile:
 
         return get_iterator()
 
+    def _get_stages(self):
+        yield self._stem_audio_to_grains
+        yield self._stem_grains_to_spectra_buffer
+
+        if self._apply_phase_ramp_to_stem_spectra_buffer is not None:
+            yield self._apply_phase_ramp_to_stem_spectra_buffer
+
+        yield self._mix_audio_to_grains
+        yield self._mix_grains_to_spectra_buffer
+        yield self._spectra_buffers_to_eq_profile
+
     def _sanitise_intermediates_and_out(
         self,
-        intermediate_a, intermediate_b, intermediate_c, intermediate_d, out
+        intermediate_a, intermediate_b, intermediate_c, intermediate_d,
+        intermediate_e, out
     ):
-        return sanitise_unique_arrays_of_shape(
+        mix_grain_shape = *self.mix_audio.shape[:-1], self.grain_len
+        stem_grain_shape = *self.stem_audio.shape[:-1], self.grain_len
+
+        yield from sanitise_unique_arrays_of_shape(
+            array_infos=[(intermediate_a, "intermediate_a", "float")],
+            reference_shape=mix_grain_shape,
+            reference_name="the grains of 'mix_audio'"
+        )
+        yield from sanitise_unique_arrays_of_shape(
+            array_infos=[(intermediate_b, "intermediate_b", "complex")],
+            reference_shape=get_spectrum_shape(
+                stem_grain_shape, half_spectrum=self.half_spectrum
+            ),
+            reference_name="the spectra of 'stem_audio'"
+        )
+        yield from sanitise_unique_arrays_of_shape(
             array_infos=[
-                (intermediate_a, "intermediate_a", "float"),
-                (intermediate_b, "intermediate_b", "complex"),
                 (intermediate_c, "intermediate_c", "complex"),
                 (intermediate_d, "intermediate_d", "bool"),
+                (intermediate_e, "intermediate_e", "float"),
                 (out, "out", "complex")
             ],
-            reference_shape=(self.grain_len,),
-            reference_name="'grain_len'"
+            reference_shape=get_spectrum_shape(
+                mix_grain_shape, half_spectrum=self.half_spectrum
+            ),
+            reference_name="the spectra of 'mix_audio'"
         )
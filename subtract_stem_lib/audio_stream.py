@@ -0,0 +1,148 @@
+import numpy as np
+
+from ._sanitisation import sanitise as san
+
+
+# An audio file that is read on demand instead of being decoded into memory
+# all at once. Unlike load_audio(), it can't resample. Like load_audio(), mono
+# audio is 1-D, and otherwise it's of shape (channels, samples).
+class AudioStream:
+    __slots__ = [
+        "_sound_file", "_frames",
+        "path", "sample_rate", "channels", "audio_len"
+    ]
+
+    def __init__(self, path, *, sample_rate=None, error_if_not_mono=True):
+        self.path, error_if_not_mono = san("path, error_if_not_mono")
+
+        import soundfile
+
+        self._sound_file = soundfile.SoundFile(self.path)
+
+        if error_if_not_mono and self._sound_file.channels != 1:
+            self.close()
+            raise ValueError(f"audio at {path} is not mono")
+
+        if self._sound_file.frames == 0:
+            self.close()
+            raise ValueError(f"audio at {path} is empty")
+
+        self.sample_rate = san("sample_rate", val=self._sound_file.samplerate)
+
+        if sample_rate is not None \
+                and san("sample_rate") != self.sample_rate:
+            self.close()
+            raise ValueError(
+                f"audio at {path} has a sample rate of {self.sample_rate}, "
+                "and an AudioStream can't resample"
+            )
+
+        self.channels = self._sound_file.channels
+        self.audio_len = self._sound_file.frames
+
+        # soundfile reads multi-channel audio as (frames, channels), so it's
+        # read into this and then transposed into 'out'
+        self._frames = None
+
+    def __len__(self):
+        return self.audio_len
+
+    @property
+    def shape(self):
+        if self.channels == 1:
+            return self.audio_len,
+        else:
+            return self.channels, self.audio_len
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Fills 'out', of shape (..., out_len) like the stream's, with
+    # audio[..., start_i:start_i + out_len], treating anything outside the
+    # audio as silence. Sequential reads don't need a seek.
+    def read(self, start_i, *, out):
+        sound_file = self._sound_file
+        out_len = out.shape[-1]
+
+        stop_i = start_i + out_len
+        before_len = min(max(-start_i, 0), out_len)
+        after_len = min(max(stop_i - self.audio_len, 0), out_len - before_len)
+        read_len = out_len - before_len - after_len
+
+        out[..., :before_len] = 0
+        out[..., out_len - after_len:] = 0
+
+        if read_len:
+            read_start_i = start_i + before_len
+            read_out = out[..., before_len:before_len + read_len]
+
+            if sound_file.tell() != read_start_i:
+                sound_file.seek(read_start_i)
+
+            if self.channels == 1:
+                sound_file.read(read_len, dtype="float32", out=read_out)
+            else:
+                read_out[...] = sound_file.read(
+                    read_len, dtype="float32", out=self._get_frames(read_len)
+                ).T
+
+    def _get_frames(self, frames_len):
+        if self._frames is None or len(self._frames) < frames_len:
+            self._frames = np.empty(
+                (frames_len, self.channels), dtype=np.float32
+            )
+
+        return self._frames[:frames_len]
+
+    def close(self):
+        self._sound_file.close()
+
+
+# An audio file that is written incrementally, for output that shouldn't be
+# kept in memory in full. Like save_audio(), it writes 32-bit float samples.
+class AudioStreamWriter:
+    __slots__ = ["_sound_file", "path", "sample_rate", "channels"]
+
+    def __init__(self, path, *, sample_rate, channels=1):
+        self.path, self.sample_rate, self.channels \
+            = san("path, sample_rate, channels")
+
+        import soundfile
+
+        self._sound_file = soundfile.SoundFile(
+            self.path,
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            subtype="FLOAT"
+        )
+
+    def __len__(self):
+        return self._sound_file.frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # 'audio' is 1-D for mono, or of shape (channels, samples) otherwise
+    def write(self, audio):
+        channels_shape = () if self.channels == 1 else (self.channels,)
+
+        if audio.shape[:-1] != channels_shape:
+            raise ValueError(
+                "'audio' should be 1-D for a mono AudioStreamWriter, or of "
+                "shape (channels, samples) otherwise"
+            )
+
+        self._sound_file.write(audio.T)
+
+    def flush(self):
+        self._sound_file.flush()
+
+    def close(self):
+        self._sound_file.close()
@@ -46,6 +46,87 @@ class RealBuffer(Buffer):
 
         return data[curr_i]
 
+    # 'items' is of shape (num_of_new_items, *item_shape), oldest first
+    def push_many(self, items):
+        for item in items[-self.num_of_items:]:
+            self.increment_and_get_newest()[...] = item
+
+    def window(self):
+        raise TypeError(
+            "window() needs a buffer made with 'mirrored=True', as the items "
+            "of this one aren't in a single array"
+        )
+
+
+# A RealBuffer whose items are the first half of a (num_of_items * 2,
+# *item_shape) array, with the second half mirroring the first, so that the
+# items in time order are always a single slice of '_mirror'. Only the
+# newest and the oldest items can be written in place, and the window only
+# reads mirrors of items before the oldest. So each item is copied to its
+# mirror once it stops being the newest, and window() copies the newest, and
+# the oldest if its mirror is read.
+class MirroredRealBuffer(RealBuffer):
+    __slots__ = ["_mirror"]
+
+    def __init__(self, *, _data):
+        super().__init__(_data=_data)
+
+        self._mirror = np.empty(
+            (self.num_of_items * 2, *self._data[0].shape),
+            dtype=self._data[0].dtype
+        )
+        self._mirror[:self.num_of_items] = self._data
+        self._data = list(self._mirror[:self.num_of_items])
+
+    def increment_and_get_newest(self):
+        mirror = self._mirror
+        num_of_items = self.num_of_items
+        prev_i = self._curr_i
+        curr_i = (prev_i + 1) % num_of_items
+
+        mirror[prev_i + num_of_items] = mirror[prev_i]
+        self._curr_i = curr_i
+
+        return mirror[curr_i]
+
+    def push_many(self, items):
+        mirror = self._mirror
+        num_of_items = self.num_of_items
+        curr_i = self._curr_i
+
+        mirror[curr_i + num_of_items] = mirror[curr_i]
+
+        items = items[-num_of_items:]
+        start_i = (curr_i + 1) % num_of_items
+        stop_i = start_i + len(items)
+        first_half_len = min(stop_i, num_of_items) - start_i
+
+        # 'stop_i' may be in the second half, in which case the items past
+        # the end of the first half are copied to its start
+        mirror[start_i:stop_i] = items
+        mirror_start_i = start_i + num_of_items
+        mirror[mirror_start_i:mirror_start_i + first_half_len] \
+            = items[:first_half_len]
+        mirror[:len(items) - first_half_len] = items[first_half_len:]
+
+        self._curr_i = (stop_i - 1) % num_of_items
+
+    # A view of shape (num_of_items, *item_shape) of the items, oldest
+    # first. It reflects the newest and oldest items as they were when this
+    # was called.
+    def window(self):
+        mirror = self._mirror
+        num_of_items = self.num_of_items
+        curr_i = self._curr_i
+
+        mirror[curr_i + num_of_items] = mirror[curr_i]
+
+        # the oldest is at the start of the second half
+        if curr_i == num_of_items - 1:
+            mirror[num_of_items] = mirror[0]
+
+        return mirror[curr_i + 1:curr_i + 1 + num_of_items]
+
 
 class QuasiBuffer(Buffer):
     __slots__ = [
@@ -62,48 +143,68 @@ class QuasiBuffer(Buffer):
     def increment_and_get_newest(self):
         return self.newest
 
+    def push_many(self, items):
+        self.newest[...] = items[-1]
 
-def _buffer_from_data(data):
-    san("data", "buffer_data")
-
-    if len(data) == 1:
-        return QuasiBuffer(_data=data[0])
-    else:
-        return RealBuffer(_data=data)
+    def window(self):
+        return self.newest[np.newaxis]
 
 
-def buffer_from_constructor(
-    constructor, *, num_of_items=None, lookbehind=None
-):
-    san("constructor")
-
+def sanitise_num_of_items_or_lookbehind(num_of_items, lookbehind):
     if num_of_items is None:
         if lookbehind is None:
             raise TypeError(
                 "one of 'num_of_items' or 'lookbehind' should be provided"
             )
         else:
-            num_of_items = san("lookbehind") + 1
+            return san("lookbehind") + 1
     else:
         if lookbehind is None:
-            san("num_of_items")
+            return san("num_of_items")
         else:
             raise TypeError(
                 "only one of 'num_of_items' or 'lookbehind' should be "
                 "provided"
             )
 
-    return _buffer_from_data([constructor() for _ in range(num_of_items)])
+
+def _buffer_from_data(data, *, mirrored=False):
+    san("data", "buffer_data")
+
+    if len(data) == 1:
+        return QuasiBuffer(_data=data[0])
+    elif mirrored:
+        return MirroredRealBuffer(_data=data)
+    else:
+        return RealBuffer(_data=data)
+
+
+# With 'mirrored', the buffer keeps a second copy of its items so that
+# window() can return them in time order without copying; see
+# MirroredRealBuffer.
+def buffer_from_constructor(
+    constructor, *, num_of_items=None, lookbehind=None, mirrored=False
+):
+    san("constructor")
+    mirrored = san("mirrored")
+    num_of_items = sanitise_num_of_items_or_lookbehind(
+        num_of_items, lookbehind
+    )
+
+    return _buffer_from_data(
+        [constructor() for _ in range(num_of_items)], mirrored=mirrored
+    )
 
 
 def buffer_from_array_args(
-    shape, *, dtype, num_of_items=None, lookbehind=None
+    shape, *, dtype, num_of_items=None, lookbehind=None, mirrored=False
 ):
     def constructor():
         return np.empty(shape, dtype=dtype)
 
     return buffer_from_constructor(
-        constructor, num_of_items=num_of_items, lookbehind=lookbehind
+        constructor,
+        num_of_items=num_of_items, lookbehind=lookbehind, mirrored=mirrored
     )
 
 
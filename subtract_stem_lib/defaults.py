@@ -2,6 +2,11 @@ INNER_GRAIN_LEN = 1350
 INTERVAL_LEN = 675
 OVERLAP = 2
 MAX_ABS_RESULT = 1000.0
+SAFE_DIVIDE_BLOCK_LEN = 4096
+EQ_PROFILES_BLOCK_LEN = 256
+EQ_NUM_OF_BANDS = 48
+HANN_WINDOW_CACHE_SIZE = 64
+AUDIO_CACHE_MAX_SIZE_BYTES = 16 * 1024 ** 3
 FIND_DELAY_STEM_SECONDS_VAL_ADD = 0.0001
 FIND_DELAY_STEM_SECONDS_MIN_DIFF = 0.000001
 FIND_DELAY_STEM_SAMPLES_VAL_ADD = FIND_DELAY_STEM_SECONDS_VAL_ADD * 48000
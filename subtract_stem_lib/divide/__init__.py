@@ -1,5 +1,7 @@
 from .unsafe_divide import UnsafeDivider
 from .is_safe import GenerateIsSafes
 from .interpolate_missing import InterpolateMissing
-from .safe_divide_ import SafeDivider, safe_divide
-from .ataabtrnfatbaa_ import Ataabtrnfatbaa, ataabtrnfatbaa
+from .safe_divide_ import SafeDivider, safe_divide, safe_divide_batch
+from .ataabtrnfatbaa_ import (
+    Ataabtrnfatbaa, ataabtrnfatbaa, ataabtrnfatbaa_batch
+)
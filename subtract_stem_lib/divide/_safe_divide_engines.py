@@ -0,0 +1,149 @@
+"""Kernels that divide, find the unsafe results and count them in one pass.
+
+Each kernel is called with 2-D views (a 1-D array becomes a single row, and
+a 1-D 'a' or 'b' is broadcast against the rows of the other) as
+kernel(a, b, max_abs_result, out, is_safe, scratch), and returns the number
+of unsafe results. 'scratch' is numpy.float32 of the shape of 'out'.
+"""
+
+
+import numpy as np
+
+from ..defaults import SAFE_DIVIDE_BLOCK_LEN
+
+
+ENGINES = "numba", "numexpr", "numpy"
+
+_kernels_for_engines = {}
+
+
+# numba and numexpr are optional and slow to import, so they're only
+# imported once they're needed
+def _make_numba_kernel():
+    import numba
+
+    # numba's own complex division raises on division by 0, so this is
+    # numpy's algorithm, which gives inf or nan and the same rounding
+    @numba.njit(inline="always", error_model="numpy")
+    def divide(a, b):
+        a_real, a_imag = a.real, a.imag
+        b_real, b_imag = b.real, b.imag
+        one = np.float32(1)
+
+        if abs(b_real) >= abs(b_imag):
+            if b_real == 0 and b_imag == 0:
+                return a_real / abs(b_real), a_imag / abs(b_real)
+
+            ratio = b_imag / b_real
+            scale = one / (b_real + b_imag * ratio)
+
+            return (
+                (a_real + a_imag * ratio) * scale,
+                (a_imag - a_real * ratio) * scale
+            )
+        else:
+            ratio = b_real / b_imag
+            scale = one / (b_imag + b_real * ratio)
+
+            return (
+                (a_real * ratio + a_imag) * scale,
+                (a_imag * ratio - a_real) * scale
+            )
+
+    @numba.njit(nogil=True, cache=True, error_model="numpy")
+    def kernel(a, b, max_abs_result, out, is_safe, scratch):
+        num_of_unsafe = 0
+
+        for row_i in range(out.shape[0]):
+            for i in range(out.shape[1]):
+                quotient_real, quotient_imag \
+                    = divide(a[row_i, i], b[row_i, i])
+                out[row_i, i] = complex(quotient_real, quotient_imag)
+
+                scratch[row_i, i] = abs(out[row_i, i])
+                is_safe[row_i, i] = scratch[row_i, i] <= max_abs_result
+
+                if not is_safe[row_i, i]:
+                    num_of_unsafe += 1
+
+        return num_of_unsafe
+
+    return kernel
+
+
+def _make_numexpr_kernel():
+    import numexpr
+
+    # numexpr evaluates in cache-sized blocks itself, and only has
+    # complex128, hence the casting
+    def kernel(
+        a, b, max_abs_result, out, is_safe, scratch,
+        evaluate=numexpr.evaluate, count_nonzero=np.count_nonzero
+    ):
+        evaluate(
+            "a / b", local_dict={"a": a, "b": b},
+            out=out, casting="same_kind"
+        )
+        evaluate(
+            "real(out * conj(out)) <= max_abs_result_squared",
+            local_dict={
+                "out": out,
+                "max_abs_result_squared": max_abs_result ** 2
+            },
+            out=is_safe
+        )
+
+        return is_safe.size - count_nonzero(is_safe)
+
+    return kernel
+
+
+def _make_numpy_kernel():
+    # each block is divided, measured and compared while it's still in
+    # cache
+    def kernel(
+        a, b, max_abs_result, out, is_safe, scratch,
+        divide=np.divide, abs_=np.abs, less_equal=np.less_equal,
+        count_nonzero=np.count_nonzero,
+        block_len=SAFE_DIVIDE_BLOCK_LEN
+    ):
+        len_ = out.shape[1]
+
+        for row_i in range(out.shape[0]):
+            for start_i in range(0, len_, block_len):
+                block = row_i, slice(start_i, start_i + block_len)
+
+                divide(a[block], b[block], out=out[block])
+                abs_(out[block], out=scratch[block])
+                less_equal(scratch[block], max_abs_result, out=is_safe[block])
+
+        return is_safe.size - count_nonzero(is_safe)
+
+    return kernel
+
+
+_kernel_makers_for_engines = {
+    "numba": _make_numba_kernel,
+    "numexpr": _make_numexpr_kernel,
+    "numpy": _make_numpy_kernel
+}
+
+
+# "auto" is the first of ENGINES that can be imported
+def get_safe_divide_kernel(engine):
+    if engine == "auto":
+        for engine in ENGINES:
+            try:
+                return engine, get_safe_divide_kernel(engine)[1]
+            except ImportError:
+                continue
+
+    if engine not in _kernels_for_engines:
+        try:
+            _kernels_for_engines[engine] = _kernel_makers_for_engines[engine]()
+        except ImportError:
+            raise ImportError(
+                f"the {engine!r} safe divide engine requires {engine}"
+            )
+
+    return engine, _kernels_for_engines[engine]
@@ -5,7 +5,7 @@ from .._sanitisation import sanitise as san
 
 def sanitise_a_b_out(a, b, out):
     for name in "a", "b":
-        san(name, "array_1d")
+        san(name, "array_1d_or_2d")
 
     valid_dtypes = {np.dtype(np.float32), np.dtype(np.complex64)}
     if {np.dtype(np.float32), a.dtype, b.dtype} != valid_dtypes:
@@ -14,17 +14,26 @@ def sanitise_a_b_out(a, b, out):
             "the other may have dtype np.float32"
         )
 
-    if a.shape != b.shape:
-        raise ValueError("'a' and 'b' should have same shape")
+    # a 1-D array is broadcast against each channel of a multi-channel one
+    if a.shape == b.shape or b.shape == a.shape[-1:]:
+        shape = a.shape
+    elif a.shape == b.shape[-1:]:
+        shape = b.shape
+    else:
+        raise ValueError(
+            "'a' and 'b' should have same shape, or one should be 1-D and the "
+            "same length as the other's last axis"
+        )
 
     if out is None:
-        out = np.empty(a.shape, dtype=np.complex64)
+        out = np.empty(shape, dtype=np.complex64)
     else:
-        san("out", "array_1d_complex")
+        san("out", f"array_{len(shape)}d_complex")
 
-        if out.shape != a.shape:
+        if out.shape != shape:
             raise ValueError(
-                "'out' should have same shape as 'a' and 'b'"
+                "'out' should have the shape of 'a' and 'b' broadcast "
+                "together"
             )
 
     return a, b, out
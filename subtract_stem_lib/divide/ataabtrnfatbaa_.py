@@ -6,35 +6,90 @@ import numpy as np
 
 from .._sanitisation import sanitise_arg as san
 from .._sanitise_spectra_buffer import sanitise_spectra_buffer
+from .._sanitise_unique_arrays_of_shape import sanitise_unique_arrays_of_shape
 
 
 _ONE_ROTATED_CONJUGATED = (-1) ** (-1 / pi)
 
 
+def _rotate_fused(a, b, *, is_zero, intermediate, out_a, out_b):
+    np.abs(a, out=out_a)
+    np.equal(out_a, 0, out=is_zero)
+
+    np.divide(a.real, out_a, out=intermediate.real)
+    np.divide(a.imag, out_a, out=intermediate.imag)
+    np.negative(intermediate.imag, out=intermediate.imag)
+    np.copyto(intermediate, 1, where=is_zero)
+
+    np.multiply(b, intermediate, out=out_b)
+
+
+# The rotation is conj(a) / abs(a), or 1 where 'a' is 0. In "fused" mode
+# it's calculated directly from the parts of 'a' and abs(a); "power" mode
+# takes the angle of 'a' with arctan2 and raises e^-i to it, which is much
+# slower but was the original method.
 class Ataabtrnfatbaa:
     __slots__ = [
+        "_is_zero",
         "a", "b",
+        "rotation_mode",
         "intermediate",
         "out_a", "out_b"
     ]
 
     def __init__(
         self, a, b, *,
+        rotation_mode="fused",
         intermediate=None,  # numpy.complex64
         out_a=None, out_b=None
     ):
         self.a = sanitise_spectra_buffer(a, name="a")
         self.b = sanitise_spectra_buffer(b, name="b")
+        self.rotation_mode = san("rotation_mode")
 
-        if self.a.newest.shape != self.b.newest.shape:
+        # a 1-D 'a' rotates each channel of a multi-channel 'b'
+        a_shape, b_shape = self.a.newest.shape, self.b.newest.shape
+
+        if a_shape != b_shape and a_shape != b_shape[-1:]:
             raise ValueError(
-                "'a' arrays and 'b' arrays should have the same shape"
+                "'a' arrays and 'b' arrays should have the same shape, or "
+                "the same length if only 'b' arrays are 2-D"
             )
 
         self.out_a, self.out_b = self._sanitise_outs(out_a, out_b)
         self.intermediate = self._sanitise_intermediate(intermediate)
 
+        if self.rotation_mode == "fused":
+            self._is_zero = np.empty(a_shape, dtype=bool)
+        else:
+            self._is_zero = None
+
     def __iter__(self):
+        if self.rotation_mode == "fused":
+            return self._get_fused_iterator()
+        else:
+            return self._get_power_iterator()
+
+    def _get_fused_iterator(self):
+        def get_iterator(
+            rotate=_rotate_fused,
+            a=self.a, b=self.b,
+            is_zero=self._is_zero,
+            intermediate=self.intermediate,
+            out_a=self.out_a, out_b=self.out_b
+        ):
+            while True:
+                rotate(
+                    a.newest, b.newest,
+                    is_zero=is_zero, intermediate=intermediate,
+                    out_a=out_a, out_b=out_b
+                )
+
+                yield
+
+        return get_iterator()
+
+    def _get_power_iterator(self):
         def get_iterator(
             ONE_ROTATED_CONJUGATED=_ONE_ROTATED_CONJUGATED,
             arctan2=np.arctan2, power=np.power, multiply=np.multiply,
@@ -57,47 +112,98 @@ class Ataabtrnfatbaa:
         return get_iterator()
 
     def _sanitise_outs(self, out_a, out_b):
-        for arr, dtype, name, sanitiser_name in (
-            (out_a, np.float32, "out_a", "array_1d_float"),
-            (out_b, np.complex64, "out_b", "array_1d_complex")
+        for arr, dtype_name, name, shape in (
+            (out_a, "float", "out_a", self.a.newest.shape),
+            (out_b, "complex", "out_b", self.b.newest.shape)
         ):
             if arr is None:
-                arr = np.empty(self.a.newest.shape, dtype=dtype)
+                arr = np.empty(
+                    shape,
+                    dtype=np.float32 if dtype_name == "float" else np.complex64
+                )
             else:
-                san(name, sanitiser_name)
+                san(name, f"array_{len(shape)}d_{dtype_name}")
 
-                if arr.shape != self.a.newest.shape:
+                if arr.shape != shape:
                     raise ValueError(
                         f"if provided, {name!r} should have the same shape as "
-                        "'a' and 'b' arrays"
+                        f"'{name[-1]}' arrays"
                     )
 
             yield arr
 
     def _sanitise_intermediate(self, intermediate):
         if intermediate is None:
-            if self.out_b is self.b.newest:
+            if self.out_b is self.b.newest \
+                    or self.out_b.shape != self.a.newest.shape:
                 intermediate \
                     = np.empty(self.a.newest.shape, dtype=np.complex64)
             else:
                 intermediate = self.out_b
         else:
-            intermediate = san("intermediate", "array_1d_complex")
+            intermediate = san(
+                "intermediate", f"array_{self.a.newest.ndim}d_complex"
+            )
 
             if intermediate.shape != self.a.newest.shape:
                 raise ValueError(
                     "if provided, 'intermediate' should have the same shape "
-                    "as 'a' and 'b' arrays"
+                    "as 'a' arrays"
                 )
 
         return intermediate
 
 
-def ataabtrnfatbaa(a, b, *, intermediate=None, out_a=None, out_b=None):
+def ataabtrnfatbaa(
+    a, b, *,
+    rotation_mode="fused", intermediate=None, out_a=None, out_b=None
+):
     rotator = Ataabtrnfatbaa(
-        a, b, intermediate=intermediate, out_a=out_a, out_b=out_b
+        a, b,
+        rotation_mode=rotation_mode,
+        intermediate=intermediate, out_a=out_a, out_b=out_b
     )
 
     next(iter(rotator))
 
     return rotator.out_a, rotator.out_b
+
+
+# For offline use on whole (frames, bins) matrices, such as the output of a
+# batched STFT: the same as ataabtrnfatbaa() in "fused" mode, but for 1-D
+# or 2-D 'a' and 'b' of any shapes that broadcast together, and without
+# building an Ataabtrnfatbaa or its buffers.
+def ataabtrnfatbaa_batch(a, b, *, out_a=None, out_b=None):
+    for name in "a", "b":
+        san(name, "array_1d_or_2d_complex")
+
+    try:
+        shape = np.broadcast_shapes(a.shape, b.shape)
+    except ValueError:
+        raise ValueError("'a' and 'b' should broadcast together")
+
+    out_a, = sanitise_unique_arrays_of_shape(
+        array_infos=[(out_a, "out_a", "float")],
+        reference_shape=a.shape,
+        reference_name="'a'"
+    )
+    out_b, = sanitise_unique_arrays_of_shape(
+        array_infos=[(out_b, "out_b", "complex")],
+        reference_shape=shape,
+        reference_name="'a' and 'b' broadcast together"
+    )
+
+    # the rotation is only needed until it's applied, so it can be built in
+    # 'out_b' if that's the right shape and isn't also 'b'
+    if out_b.shape == a.shape and out_b is not b:
+        intermediate = out_b
+    else:
+        intermediate = np.empty(a.shape, dtype=np.complex64)
+
+    _rotate_fused(
+        a, b,
+        is_zero=np.empty(a.shape, dtype=bool), intermediate=intermediate,
+        out_a=out_a, out_b=out_b
+    )
+
+    return out_a, out_b
@@ -1,14 +1,35 @@
+import numpy as np
+
 from .._sanitisation import sanitise as san
 
 
+# Replaces each unsafe value of 'a' with a linear interpolation between the
+# nearest safe values either side of it, or with the nearest safe value if
+# there's only one side. With 'vectorised', all rows are done at once with
+# array operations instead of a Python loop over the bins, giving the same
+# result.
 class InterpolateMissing:
-    __slots__ = ["a", "is_safe", "out"]
+    __slots__ = [
+        "_indices", "_prev_safe_indices", "_next_safe_indices",
+        "a", "is_safe", "vectorised", "out"
+    ]
 
-    def __init__(self, a, *, is_safe, out=None):
-        self.a = san("a", "array_1d_complex")
+    def __init__(self, a, *, is_safe, vectorised=True, out=None):
+        self.a = san("a", "array_1d_or_2d_complex")
         self.is_safe = self._sanitise_is_safe(is_safe)
+        self.vectorised = san("vectorised")
         self.out = self._sanitise_out(out)
 
+        if self.vectorised:
+            self._indices = np.broadcast_to(
+                np.arange(self.a.shape[-1]), self.a.shape
+            )
+            self._prev_safe_indices = np.empty(self.a.shape, dtype=np.int64)
+            self._next_safe_indices = np.empty(self.a.shape, dtype=np.int64)
+        else:
+            self._indices = self._prev_safe_indices \
+                = self._next_safe_indices = None
+
     def __iter__(self):
         if self.out is self.a:
             def get_iterator(
@@ -48,7 +69,7 @@ class InterpolateMissing:
         if out is None:
             out = np.empty(self.a.shape, dtype=np.complex64)
         else:
-            out = san("out", "array_1d_complex")
+            out = san("out", f"array_{self.a.ndim}d_complex")
 
             if out.shape != self.a.shape:
                 raise ValueError(
@@ -57,11 +78,10 @@ class InterpolateMissing:
 
         return out
 
+    @staticmethod
     def _interpolate_segment(
-        self, *, last_present_before, first_present_after
+        out, *, last_present_before, first_present_after
     ):
-        out = self.out
-
         start_val = out[last_present_before]
         stop_val = out[first_present_after]
 
@@ -71,15 +91,24 @@ class InterpolateMissing:
         for i in range(1, divisions):
             out[last_present_before + i] = start_val + i * gradient
 
+    # each row of a 2-D 'a' is interpolated separately
     def _routine(self):
-        out = self.out
+        if self.vectorised:
+            self._vectorised_routine()
+        elif self.out.ndim == 1:
+            self._interpolate_row(self.out, self.is_safe)
+        else:
+            for out_row, is_safe_row in zip(self.out, self.is_safe):
+                if not is_safe_row.all():
+                    self._interpolate_row(out_row, is_safe_row)
 
-        if not self.is_safe.any():
+    def _interpolate_row(self, out, is_safe):
+        if not is_safe.any():
             out.fill(0)
 
             return
 
-        is_present_iter = enumerate(self.is_safe)
+        is_present_iter = enumerate(is_safe)
 
         if not next(is_present_iter)[1]:
             for i, pres in is_present_iter:
@@ -96,6 +125,7 @@ class InterpolateMissing:
                 for i, pres in is_present_iter:
                     if pres:
                         self._interpolate_segment(
+                            out,
                             last_present_before=first_missing - 1,
                             first_present_after=i
                         )
@@ -106,3 +136,54 @@ class InterpolateMissing:
 
         if first_missing is not None:
             out[first_missing:] = out[first_missing - 1]
+
+    def _vectorised_routine(self):
+        interpolate_missing_along_last_axis(
+            self.out, self.is_safe,
+            indices=self._indices,
+            prev_safe_indices=self._prev_safe_indices,
+            next_safe_indices=self._next_safe_indices
+        )
+
+
+# The same arithmetic as InterpolateMissing._interpolate_segment(), in
+# complex64, for every unsafe value of every row of 'out' at once. Unsafe
+# values only read safe ones, so they can all be written in place. 'indices'
+# is numpy.arange(out.shape[-1]) broadcast to the shape of 'out', and the
+# int64 arrays of that shape are for workspace.
+def interpolate_missing_along_last_axis(
+    out, is_safe, *, indices, prev_safe_indices, next_safe_indices
+):
+    len_ = out.shape[-1]
+
+    np.copyto(prev_safe_indices, -1)
+    np.copyto(prev_safe_indices, indices, where=is_safe)
+    np.maximum.accumulate(prev_safe_indices, axis=-1, out=prev_safe_indices)
+
+    np.copyto(next_safe_indices, len_)
+    np.copyto(next_safe_indices, indices, where=is_safe)
+    next_safe_indices[...] = np.minimum.accumulate(
+        next_safe_indices[..., ::-1], axis=-1
+    )[..., ::-1]
+
+    is_missing = ~is_safe
+    rows = out.reshape(-1, len_)
+    row_nums = np.nonzero(is_missing.reshape(-1, len_))[0]
+    missing_indices = indices[is_missing]
+    prev_i = prev_safe_indices[is_missing]
+    next_i = next_safe_indices[is_missing]
+
+    has_prev, has_next = prev_i >= 0, next_i < len_
+    prev_vals = rows[row_nums, np.where(has_prev, prev_i, 0)]
+    next_vals = rows[row_nums, np.where(has_next, next_i, 0)]
+
+    gradients = (next_vals - prev_vals) \
+        / (next_i - prev_i).astype(np.float32)
+    vals = prev_vals \
+        + (missing_indices - prev_i).astype(np.float32) * gradients
+
+    vals[~has_next] = prev_vals[~has_next]
+    vals[~has_prev] = next_vals[~has_prev]
+    vals[~(has_prev | has_next)] = 0
+
+    out[is_missing] = vals
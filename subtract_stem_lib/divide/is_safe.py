@@ -14,7 +14,7 @@ class GenerateIsSafes:
         intermediate=None,  # numpy.float32
         out=None
     ):
-        self.a = san("a", "array_1d_complex")
+        self.a = san("a", "array_1d_or_2d_complex")
         self.max_abs_result = san("max_abs_result")
         self.intermediate, self.out \
             = self._sanitise_intermediate_and_out(intermediate, out)
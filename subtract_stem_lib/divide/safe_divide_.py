@@ -5,18 +5,32 @@ from .._sanitisation import sanitise_arg as san
 from .._sanitise_unique_arrays_of_shape import sanitise_unique_arrays_of_shape
 from .unsafe_divide import UnsafeDivider
 from .is_safe import GenerateIsSafes
-from .interpolate_missing import InterpolateMissing
-
-
+from .interpolate_missing import (
+    InterpolateMissing, interpolate_missing_along_last_axis
+)
+from ._sanitise_a_b_out import sanitise_a_b_out
+from ._safe_divide_engines import get_safe_divide_kernel
+
+
+# With an 'engine' other than "chained", the division, the finding of
+# unsafe results and the counting of them are done in one pass by a kernel
+# (see _safe_divide_engines.py), 'num_of_unsafe' is updated each iteration,
+# and interpolation is skipped when it's 0. The default, "auto", is the
+# first available of "numba", "numexpr" and "numpy". "chained" runs
+# UnsafeDivider, GenerateIsSafes and InterpolateMissing one after another,
+# as separate passes, and leaves 'num_of_unsafe' as None.
 class SafeDivider:
     __slots__ = [
         "_unsafe_divider", "_generate_is_safes", "_interpolate_missing",
-        "a", "b", "max_abs_result", "intermediate_a", "intermediate_b", "out"
+        "_kernel",
+        "a", "b", "max_abs_result", "engine", "num_of_unsafe",
+        "intermediate_a", "intermediate_b", "out"
     ]
 
     def __init__(
         self, a, b, *,
         max_abs_result=MAX_ABS_RESULT,
+        engine="auto",
         intermediate_a=None,  # numpy.float32
         intermediate_b=None,  # bool
         out=None
@@ -25,6 +39,7 @@ class SafeDivider:
 
         self.a, self.b = a, b
         self.out = self._unsafe_divider.out
+        engine = san("engine", "safe_divide_engine")
 
         self.intermediate_a, self.intermediate_b \
             = self._sanitise_intermediates(intermediate_a, intermediate_b)
@@ -42,41 +57,97 @@ class SafeDivider:
             self.out, is_safe=self.intermediate_b, out=self.out
         )
 
-    def __iter__(self):
-        def get_iterator(
-            iter_=zip(
-                self._unsafe_divider,
-                self._generate_is_safes,
-                self._interpolate_missing
-            )
-        ):
-            while True:
-                next(iter_)
+        if engine == "chained":
+            self.engine, self._kernel = engine, None
+        else:
+            self.engine, self._kernel = get_safe_divide_kernel(engine)
 
-                yield
+        self.num_of_unsafe = None
+
+    def __iter__(self):
+        if self._kernel is None:
+            def get_iterator(
+                iter_=zip(
+                    self._unsafe_divider,
+                    self._generate_is_safes,
+                    self._interpolate_missing
+                )
+            ):
+                while True:
+                    next(iter_)
+
+                    yield
+        else:
+            def get_iterator(
+                self=self,
+                kernel=self._kernel,
+                kernel_args=self._get_kernel_args(),
+                interpolate_missing=self._interpolate_missing._routine
+            ):
+                while True:
+                    num_of_unsafe = kernel(*kernel_args)
+                    self.num_of_unsafe = num_of_unsafe
+
+                    if num_of_unsafe:
+                        interpolate_missing()
+
+                    yield
 
         return get_iterator()
 
+    # Arrays that are all contiguous and of the same shape are passed as a
+    # single row. Otherwise, each row of 'out' is a row, and a 1-D 'a' or
+    # 'b' is broadcast (read-only) against them. Unlike GenerateIsSafes, the
+    # kernels write the scratch while 'a' and 'b' are still to be read, so
+    # 'intermediate_a' is only the scratch if it doesn't overlap them.
+    def _get_kernel_args(self):
+        if np.may_share_memory(self.intermediate_a, self.a) \
+                or np.may_share_memory(self.intermediate_a, self.b):
+            scratch = np.empty(self.out.shape, dtype=np.float32)
+        else:
+            scratch = self.intermediate_a
+
+        arrs = self.a, self.b, self.out, self.intermediate_b, scratch
+
+        if all(
+            arr.shape == self.out.shape and arr.flags.c_contiguous
+            for arr in arrs
+        ):
+            a, b, out, is_safe, scratch \
+                = (arr.reshape(1, -1) for arr in arrs)
+        else:
+            a, b, out, is_safe, scratch = (
+                np.broadcast_to(arr, self.out.shape).reshape(
+                    -1, self.out.shape[-1]
+                )
+                if i < 2 else arr.reshape(-1, self.out.shape[-1])
+                for i, arr in enumerate(arrs)
+            )
+
+        return a, b, np.float32(self.max_abs_result), out, is_safe, scratch
+
     def _sanitise_intermediates(self, intermediate_a, intermediate_b):
         return sanitise_unique_arrays_of_shape(
             array_infos=[
                 (intermediate_a, "intermediate_a", "float"),
                 (intermediate_b, "intermediate_b", "bool")
             ],
-            reference_shape=self.a.shape,
-            reference_name="'a' and 'b'"
+            reference_shape=self.out.shape,
+            reference_name="'out'"
         )
 
 
 def safe_divide(
     a, b, *,
     max_abs_result=MAX_ABS_RESULT,
+    engine="auto",
     intermediate_a=None, intermediate_b=None,
     out=None
 ):
     safe_divider = SafeDivider(
         a, b,
         max_abs_result=max_abs_result,
+        engine=engine,
         intermediate_a=intermediate_a,
         intermediate_b=intermediate_b,
         out=out
@@ -85,3 +156,38 @@ def safe_divide(
     next(iter(safe_divider))
 
     return safe_divider.out
+
+
+# For offline use on whole (frames, bins) matrices, such as the output of a
+# batched STFT: the same as safe_divide() on each 1-D slice along 'axis',
+# in one call with temporaries shared between the slices and without
+# building a SafeDivider.
+def safe_divide_batch(
+    a, b, *,
+    axis=-1, max_abs_result=MAX_ABS_RESULT,
+    out=None
+):
+    a, b, out = sanitise_a_b_out(a, b, out)
+    max_abs_result = san("max_abs_result")
+    axis = san("axis")
+
+    if not -out.ndim <= axis < out.ndim:
+        raise ValueError(f"'axis' is out of range for {out.ndim}-D arrays")
+
+    np.divide(a, b, out=out)
+    is_safe = np.abs(out) <= max_abs_result
+
+    if not is_safe.all():
+        out_view = np.moveaxis(out, axis, -1)
+        is_safe_view = np.moveaxis(is_safe, axis, -1)
+
+        interpolate_missing_along_last_axis(
+            out_view, is_safe_view,
+            indices=np.broadcast_to(
+                np.arange(out_view.shape[-1]), out_view.shape
+            ),
+            prev_safe_indices=np.empty(out_view.shape, dtype=np.int64),
+            next_safe_indices=np.empty(out_view.shape, dtype=np.int64)
+        )
+
+    return out
@@ -0,0 +1,314 @@
+import numpy as np
+
+from .defaults import EQ_NUM_OF_BANDS
+from ._sanitisation import sanitise as san
+from ._sanitise_eq_bands import sanitise_eq_band_coefficients
+
+
+# the ERB-rate scale of Glasberg and Moore, for frequencies in Hz
+def _get_erb_rates(freqs):
+    return 21.4 * np.log10(1 + 0.00437 * freqs)
+
+
+# A compact representation of EQ profiles as coefficients of 'num_of_bands'
+# bands rather than of every bin. Profiles are expanded from the
+# coefficients by linear interpolation between the bands' centre frequencies,
+# on a linear, log ('octave') or ERB-rate ('erb') frequency scale, and bins
+# beyond the first or last centre take that band's coefficient.
+#
+# With representation="complex", the coefficients of profiles of shape
+# (..., bins) are complex64 of shape (..., num_of_bands). With
+# representation="magnitude_and_phase", they're float32 of shape
+# (..., 2, num_of_bands): the magnitudes and then the unwrapped phases. Phase
+# is interpolated better than the real and imaginary parts where it turns
+# quickly, like with a delay, but expanding it is slower. Either way a
+# coefficient is 8 bytes, like a bin.
+#
+# For full spectra, negative frequencies share the bands of positive ones,
+# and take the conjugate of their expansion, as profiles of real audio are
+# symmetric that way.
+class EqBands:
+    __slots__ = [
+        "_expansion_matrix", "_projection_matrix", "_imag_pooling_matrix",
+        "_signs",
+        "grain_len", "half_spectrum", "num_of_bands", "spacing",
+        "representation", "sample_rate", "spectrum_len", "centre_freqs"
+    ]
+
+    def __init__(
+        self, grain_len, *,
+        num_of_bands=EQ_NUM_OF_BANDS, spacing="octave",
+        representation="complex", half_spectrum=False, sample_rate=None
+    ):
+        self.grain_len, self.num_of_bands, self.spacing, self.representation \
+            = san("grain_len, num_of_bands, spacing, representation")
+        self.half_spectrum = san("half_spectrum")
+
+        if sample_rate is not None:
+            sample_rate = san("sample_rate")
+        elif spacing == "erb":
+            raise ValueError("'sample_rate' is needed for spacing='erb'")
+
+        self.sample_rate = sample_rate
+
+        if half_spectrum:
+            freqs = np.fft.rfftfreq(grain_len)
+            self._signs = None
+        else:
+            freqs = np.fft.fftfreq(grain_len)
+            self._signs = np.where(freqs < 0, -1, 1).astype(np.float32)
+
+        self.spectrum_len = len(freqs)
+
+        # any more and the coefficients would be no smaller than the profile
+        if self.num_of_bands > grain_len // 2:
+            raise ValueError(
+                "'num_of_bands' should be less than the number of "
+                "non-negative frequency bins, 'grain_len' // 2 + 1"
+            )
+
+        scale = self._get_scale()
+        min_scaled, max_scaled = scale(self._get_min_centre_freq()), scale(0.5)
+        scaled_centre_freqs = np.linspace(
+            min_scaled, max_scaled, self.num_of_bands
+        )
+
+        # as fractions of the sample rate
+        self.centre_freqs = self._get_unscaled(scaled_centre_freqs)
+
+        # the (fractional) index of the band at each bin
+        band_is = (scale(np.abs(freqs)) - min_scaled) \
+            * ((self.num_of_bands - 1) / (max_scaled - min_scaled))
+        np.clip(band_is, 0, self.num_of_bands - 1, out=band_is)
+
+        expansion_matrix = self._get_expansion_matrix(band_is)
+
+        # the coefficients that expand to the least-squares fit of a profile.
+        # Low log-spaced bands can be closer together than bins, so singular
+        # values that small are cut rather than giving huge coefficients.
+        projection_matrix = np.linalg.pinv(expansion_matrix, rcond=1e-4)
+
+        with np.errstate(under="ignore"):
+            self._projection_matrix = projection_matrix.T.astype(np.float32)
+            self._expansion_matrix = expansion_matrix.T.astype(np.float32)
+
+        if self._signs is None:
+            self._imag_pooling_matrix = self._expansion_matrix.T
+        else:
+            self._imag_pooling_matrix \
+                = self._expansion_matrix.T * self._signs[:, None]
+
+    # the lowest frequency above DC, for a log scale
+    def _get_min_centre_freq(self):
+        return 1 / self.grain_len if self.spacing == "octave" else 0.0
+
+    def _get_scale(self):
+        if self.spacing == "linear":
+            return np.asarray
+        elif self.spacing == "octave":
+            min_freq = self._get_min_centre_freq()
+
+            return lambda freqs: np.log2(np.maximum(freqs, min_freq))
+        else:
+            sample_rate = float(self.sample_rate)
+
+            return lambda freqs: _get_erb_rates(
+                np.multiply(freqs, sample_rate)
+            )
+
+    def _get_unscaled(self, scaled_freqs):
+        if self.spacing == "linear":
+            return scaled_freqs
+        elif self.spacing == "octave":
+            return 2 ** scaled_freqs
+        else:
+            return (10 ** (scaled_freqs / 21.4) - 1) \
+                / (0.00437 * float(self.sample_rate))
+
+    # of shape (bins, bands), with at most 2 non-zero weights per bin
+    def _get_expansion_matrix(self, band_is):
+        lower_band_is = np.minimum(
+            band_is.astype(np.int64), self.num_of_bands - 2
+        )
+        upper_weights = band_is - lower_band_is
+
+        expansion_matrix = np.zeros((len(band_is), self.num_of_bands))
+        bin_is = np.arange(len(band_is))
+        expansion_matrix[bin_is, lower_band_is] = 1 - upper_weights
+        expansion_matrix[bin_is, lower_band_is + 1] = upper_weights
+
+        return expansion_matrix
+
+    @property
+    def coefficients_dtype(self):
+        if self.representation == "complex":
+            return np.dtype(np.complex64)
+        else:
+            return np.dtype(np.float32)
+
+    def get_coefficients_shape(self, eq_profile_shape):
+        if eq_profile_shape[-1:] != (self.spectrum_len,):
+            raise ValueError(
+                "EQ profiles should have a length of the 'EqBands' instance's "
+                "'spectrum_len'"
+            )
+
+        if self.representation == "complex":
+            return *eq_profile_shape[:-1], self.num_of_bands
+        else:
+            return *eq_profile_shape[:-1], 2, self.num_of_bands
+
+    def get_eq_profile_shape(self, coefficients_shape):
+        if self.representation == "complex":
+            band_shape = self.num_of_bands,
+        else:
+            band_shape = 2, self.num_of_bands
+
+        if coefficients_shape[-len(band_shape):] != band_shape:
+            raise ValueError(
+                f"coefficients should end with a shape of {band_shape}"
+            )
+
+        return *coefficients_shape[:-len(band_shape)], self.spectrum_len
+
+    # Gives the coefficients whose expansion is the least-squares fit of
+    # 'eq_profiles', of shape (..., bins). For magnitude_and_phase, their
+    # phases are unwrapped along the bins first.
+    def project(self, eq_profiles, *, out=None):
+        eq_profiles = san("eq_profiles", "array")
+
+        if eq_profiles.dtype != np.complex64:
+            raise TypeError("'eq_profiles' should have dtype complex64")
+
+        out = sanitise_eq_band_coefficients(
+            out, name="out", eq_bands=self, eq_profile_shape=eq_profiles.shape
+        )
+        projection_matrix = self._projection_matrix
+        signs = self._signs
+
+        # tiny parts of profiles times small weights can underflow
+        with np.errstate(under="ignore"):
+            if self.representation == "complex":
+                np.matmul(eq_profiles.real, projection_matrix, out=out.real)
+                imag = eq_profiles.imag if signs is None \
+                    else eq_profiles.imag * signs
+                np.matmul(imag, projection_matrix, out=out.imag)
+            else:
+                np.matmul(
+                    np.abs(eq_profiles), projection_matrix,
+                    out=out[..., 0, :]
+                )
+                np.matmul(
+                    self._get_unwrapped_phases(eq_profiles),
+                    projection_matrix,
+                    out=out[..., 1, :]
+                )
+
+        return out
+
+    # with the signs of those of negative frequencies flipped, so that they
+    # follow on from those of the positive ones in order of absolute frequency
+    def _get_unwrapped_phases(self, eq_profiles):
+        phases = np.angle(eq_profiles).astype(np.float32)
+
+        if self._signs is None:
+            return np.unwrap(phases, axis=-1)
+
+        phases *= self._signs
+        order = np.argsort(
+            np.abs(np.fft.fftfreq(self.grain_len)), kind="stable"
+        )
+        phases[..., order] = np.unwrap(phases[..., order], axis=-1)
+
+        return phases
+
+    # Writes sums of 'spectra', of shape (..., bins), over each band into
+    # 'out', of shape (..., num_of_bands), with each bin weighted as it is in
+    # expansions. The ratio of two of these is a profile estimated at band
+    # resolution, as for spectra_to_eq_profiles(eq_bands=...).
+    def pool(self, spectra, *, out):
+        pooling_matrix = self._expansion_matrix.T
+
+        with np.errstate(under="ignore"):
+            if np.iscomplexobj(spectra):
+                np.matmul(spectra.real, pooling_matrix, out=out.real)
+                np.matmul(
+                    spectra.imag, self._imag_pooling_matrix, out=out.imag
+                )
+            else:
+                np.matmul(spectra, pooling_matrix, out=out)
+
+    # Returns a routine that writes the expansion of 'coefficients' into
+    # 'out', with their current contents each time it's called, so that
+    # 'coefficients' can be updated in place between calls.
+    def get_expander(self, coefficients, *, out):
+        if self.representation == "complex":
+            def expand(
+                errstate=np.errstate,
+                matmul=np.matmul,
+                multiply=np.multiply,
+                expansion_matrix=self._expansion_matrix,
+                signs=self._signs,
+                real=coefficients.real,
+                imag=coefficients.imag,
+                out_real=out.real,
+                out_imag=out.imag
+            ):
+                with errstate(under="ignore"):
+                    matmul(real, expansion_matrix, out=out_real)
+                    matmul(imag, expansion_matrix, out=out_imag)
+
+                    if signs is not None:
+                        multiply(out_imag, signs, out=out_imag)
+        else:
+            def expand(
+                errstate=np.errstate,
+                matmul=np.matmul,
+                multiply=np.multiply,
+                cos=np.cos,
+                sin=np.sin,
+                expansion_matrix=self._expansion_matrix,
+                signs=self._signs,
+                magnitudes=coefficients[..., 0, :],
+                phases=coefficients[..., 1, :],
+                expanded_magnitudes=np.empty(out.shape, dtype=np.float32),
+                expanded_phases=np.empty(out.shape, dtype=np.float32),
+                out=out,
+                out_real=out.real,
+                out_imag=out.imag
+            ):
+                with errstate(under="ignore"):
+                    matmul(phases, expansion_matrix, out=expanded_phases)
+
+                    if signs is not None:
+                        multiply(expanded_phases, signs, out=expanded_phases)
+
+                    cos(expanded_phases, out=out_real)
+                    sin(expanded_phases, out=out_imag)
+                    matmul(
+                        magnitudes, expansion_matrix, out=expanded_magnitudes
+                    )
+                    multiply(out, expanded_magnitudes, out=out)
+
+        return expand
+
+    def expand(self, coefficients, *, out=None):
+        coefficients = sanitise_eq_band_coefficients(
+            coefficients, name="coefficients", eq_bands=self
+        )
+        eq_profile_shape = self.get_eq_profile_shape(coefficients.shape)
+
+        if out is None:
+            out = np.empty(eq_profile_shape, dtype=np.complex64)
+        else:
+            out = san("out", "array", val=out)
+
+            if out.shape != eq_profile_shape or out.dtype != np.complex64:
+                raise ValueError(
+                    "if provided, 'out' should be complex64 of the shape of "
+                    "the expansion of 'coefficients'"
+                )
+
+        self.get_expander(coefficients, out=out)()
+
+        return out
@@ -1,6 +1,7 @@
+from math import exp
 import numpy as np
 
-from .defaults import MAX_ABS_RESULT
+from .defaults import MAX_ABS_RESULT, EQ_PROFILES_BLOCK_LEN
 from .buffer import Buffer
 from ._sanitisation import sanitise_arg as san
 from ._sanitise_spectra_buffer import (
@@ -8,148 +9,157 @@ from ._sanitise_spectra_buffer import (
 )
 from ._sanitise_unique_arrays_of_shape import sanitise_unique_arrays_of_shape
 from .divide import SafeDivider, Ataabtrnfatbaa
+from .divide.interpolate_missing import interpolate_missing_along_last_axis
+from .divide.ataabtrnfatbaa_ import _rotate_fused
+from ._sanitise_eq_bands import (
+    sanitise_eq_bands, sanitise_eq_band_coefficients
+)
 
 
-def _rotator_for_cumsum_slot_from_args(
+# The moving sums are of windows of 'lookbehind + lookahead + 1' spectra,
+# kept in a cycle of that many slots. The window ending at a slot is the sum
+# of the cycle's spectra up to and including it (the prefix sum) plus the sum
+# of the previous cycle's spectra after it (its suffix sum), and the last slot
+# of each cycle turns the cycle's spectra into suffix sums for the next one.
+# Unlike differences of cumulative sums, these are sums of spectra in the
+# window only, so a loud spectrum leaves no round-off behind when it leaves,
+# and float32 stays accurate however long the spectra go on for.
+def _rotator_for_slot_from_args(
     *,
     stem_spectra_buffer, mix_spectra_buffer,
-    abs_stem_spectra_cumsum, rotated_mix_spectra_cumsum, cumsum_i
+    abs_stem_spectra, rotated_mix_spectra, slot_i
 ):
     return Ataabtrnfatbaa(
         stem_spectra_buffer, mix_spectra_buffer,
-        out_a=abs_stem_spectra_cumsum[cumsum_i],
-        out_b=rotated_mix_spectra_cumsum[cumsum_i]
+        out_a=abs_stem_spectra[slot_i],
+        out_b=rotated_mix_spectra[slot_i]
     )
 
 
-class _CompleteCumsumEntryForCumsumSlot:
-    __slots__ = ["prev_cumsum_entry", "curr_cumsum_entry", "is_dummy"]
+class _AddToPrefixSumForSlot:
+    __slots__ = ["spectrum", "prefix_sum", "is_first"]
+
+    def __init__(self, *, spectrum, prefix_sum, is_first):
+        self.spectrum = spectrum
+        self.prefix_sum = prefix_sum
+
+        self.is_first = is_first
+
+    def __iter__(self):
+        if self.is_first:
+            def get_iterator(
+                copyto=np.copyto,
+                spectrum=self.spectrum,
+                prefix_sum=self.prefix_sum
+            ):
+                while True:
+                    copyto(prefix_sum, spectrum)
+
+                    yield
+        else:
+            def get_iterator(
+                add=np.add,
+                spectrum=self.spectrum,
+                prefix_sum=self.prefix_sum
+            ):
+                while True:
+                    add(prefix_sum, spectrum, out=prefix_sum)
+
+                    yield
+
+        return get_iterator()
 
-    def __init__(self, *, prev_cumsum_entry, curr_cumsum_entry):
-        self.prev_cumsum_entry = prev_cumsum_entry
-        self.curr_cumsum_entry = curr_cumsum_entry
+    @classmethod
+    def from_args(cls, *, spectra, prefix_sum, slot_i):
+        return cls(
+            spectrum=spectra[slot_i],
+            prefix_sum=prefix_sum,
+            is_first=slot_i == 0
+        )
+
+
+class _GetMovingSumForSlot:
+    __slots__ = ["prefix_sum", "suffix_sum", "out", "is_dummy"]
 
-        self.is_dummy = prev_cumsum_entry is None
+    def __init__(self, *, prefix_sum, suffix_sum, out):
+        self.prefix_sum = prefix_sum
+        self.suffix_sum = suffix_sum
+        self.out = out
+
+        self.is_dummy = suffix_sum is None
 
     def __iter__(self):
         if self.is_dummy:
             raise RuntimeError("this part should never be reached")
 
-        def iterator(
-            prev_cumsum_entry=self.prev_cumsum_entry,
-            curr_cumsum_entry=self.curr_cumsum_entry
+        def get_iterator(
+            add=np.add,
+            prefix_sum=self.prefix_sum,
+            suffix_sum=self.suffix_sum,
+            out=self.out
         ):
             while True:
-                curr_cumsum_entry += prev_cumsum_entry
+                add(prefix_sum, suffix_sum, out=out)
 
                 yield
 
-        return iterator()
+        return get_iterator()
 
+    # at the last slot, the window is the whole cycle, so the moving sum is
+    # the prefix sum itself
     @classmethod
-    def from_args(cls, *, cumsum, cumsum_i):
-        if cumsum_i == 0:
-            prev_cumsum_entry = None
+    def from_args(cls, *, spectra, prefix_sum, slot_i, probable_out):
+        if slot_i == len(spectra) - 1:
+            suffix_sum = out = None
         else:
-            prev_cumsum_entry = cumsum[cumsum_i - 1]
+            suffix_sum = spectra[slot_i + 1]
+            out = probable_out
 
-        return cls(
-            prev_cumsum_entry=prev_cumsum_entry,
-            curr_cumsum_entry=cumsum[cumsum_i]
-        )
+        return cls(prefix_sum=prefix_sum, suffix_sum=suffix_sum, out=out)
 
 
-class _GetMovingSumForCumsumSlot:
-    __slots__ = [
-        "curr_cumsum_entry",
-        "entry_before_moving_sum_start", "last_in_prev_cumsum",
-        "out",
-        "is_dummy"
-    ]
+class _SpectraToSuffixSumsForSlot:
+    __slots__ = ["spectra", "is_dummy"]
 
-    def __init__(
-        self, *,
-        curr_cumsum_entry, entry_before_moving_sum_start, last_in_prev_cumsum,
-        out
-    ):
-        self.curr_cumsum_entry = curr_cumsum_entry
-        self.entry_before_moving_sum_start = entry_before_moving_sum_start
-        self.last_in_prev_cumsum = last_in_prev_cumsum
-        self.out = out
+    def __init__(self, *, spectra, is_dummy):
+        self.spectra = spectra
 
-        self.is_dummy = entry_before_moving_sum_start is None
+        self.is_dummy = is_dummy
 
     def __iter__(self):
         if self.is_dummy:
             raise RuntimeError("this part should never be reached")
 
-        if self.last_in_prev_cumsum is None:
-            def get_iterator(
-                subtract=np.subtract,
-                curr_cumsum_entry=self.curr_cumsum_entry,
-                entry_before_moving_sum_start
-                    =self.entry_before_moving_sum_start,
-                out=self.out
-            ):
-                while True:
-                    subtract(
-                        curr_cumsum_entry, entry_before_moving_sum_start,
-                        out=out
-                    )
-
-                    yield
-        else:
-            def get_iterator(
-                subtract=np.subtract,
-                curr_cumsum_entry=self.curr_cumsum_entry,
-                entry_before_moving_sum_start
-                    =self.entry_before_moving_sum_start,
-                last_in_prev_cumsum=self.last_in_prev_cumsum,
-                out=self.out
-            ):
-                while True:
-                    subtract(
-                        curr_cumsum_entry, entry_before_moving_sum_start,
-                        out=out
-                    )
-                    out += last_in_prev_cumsum
+        def get_iterator(
+            add=np.add,
+            spectra_and_next_suffix_sums=[
+                (self.spectra[slot_i], self.spectra[slot_i + 1])
+                for slot_i in reversed(range(len(self.spectra) - 1))
+            ]
+        ):
+            while True:
+                for spectrum, next_suffix_sum in spectra_and_next_suffix_sums:
+                    add(spectrum, next_suffix_sum, out=spectrum)
 
-                    yield
+                yield
 
         return get_iterator()
 
     @classmethod
-    def from_args(cls, *, cumsum, cumsum_i, probable_out):
-        if cumsum_i == len(cumsum) - 2:
-            entry_before_moving_sum_start = last_in_prev_cumsum = None
-            out = cumsum[-2]
-        else:
-            if cumsum_i == len(cumsum) - 1:
-                entry_before_moving_sum_start = cumsum[0]
-                last_in_prev_cumsum = None
-            else:
-                entry_before_moving_sum_start = cumsum[cumsum_i + 1]
-                last_in_prev_cumsum = cumsum[-1]
+    def from_args(cls, *, spectra, slot_i):
+        return cls(spectra=spectra, is_dummy=slot_i != len(spectra) - 1)
 
-            out = probable_out
 
-        return cls(
-            curr_cumsum_entry=cumsum[cumsum_i],
-            entry_before_moving_sum_start=entry_before_moving_sum_start,
-            last_in_prev_cumsum=last_in_prev_cumsum,
-            out=out
-        )
-
-
-def _divider_for_cumsum_slot_from_args(
+def _divider_for_slot_from_args(
     *,
-    abs_stem_spectra_cumsum, rotated_mix_spectra_cumsum, cumsum_i,
+    abs_stem_spectra_prefix_sum, rotated_mix_spectra_prefix_sum,
+    slot_i, cycle_len,
     probable_abs_stem_spectra_sum, probable_rotated_mix_spectra_sum,
     max_abs_result, ret_reciprocal_eq,
-    bool_arr
+    float_arr, bool_arr
 ):
-    if cumsum_i == len(abs_stem_spectra_cumsum) - 2:
-        a, b = rotated_mix_spectra_cumsum[-2], abs_stem_spectra_cumsum[-2]
+    if slot_i == cycle_len - 1:
+        a, b = rotated_mix_spectra_prefix_sum, abs_stem_spectra_prefix_sum
     else:
         a, b = probable_rotated_mix_spectra_sum, probable_abs_stem_spectra_sum
 
@@ -159,51 +169,56 @@ def _divider_for_cumsum_slot_from_args(
     return SafeDivider(
         a, b,
         max_abs_result=max_abs_result,
-        intermediate_a=probable_abs_stem_spectra_sum, intermediate_b=bool_arr,
+        intermediate_a=float_arr, intermediate_b=bool_arr,
         out=probable_rotated_mix_spectra_sum
     )
 
 
-class _IterableForCumsumSlot:
+class _IterableForSlot:
     __slots__ = [
         "_sub_iterables",
         "rotator",
-        "complete_abs_stem_spectra_cumsum_entry",
-        "complete_rotated_mix_spectra_cumsum_entry",
+        "add_to_abs_stem_spectra_prefix_sum",
+        "add_to_rotated_mix_spectra_prefix_sum",
         "get_abs_stem_spectra_moving_sum",
         "get_rotated_mix_spectra_moving_sum",
         "divider",
+        "abs_stem_spectra_to_suffix_sums",
+        "rotated_mix_spectra_to_suffix_sums",
         "is_initialisation"
     ]
 
     def __init__(
         self, *,
         rotator,
-        complete_abs_stem_spectra_cumsum_entry,
-        complete_rotated_mix_spectra_cumsum_entry,
+        add_to_abs_stem_spectra_prefix_sum,
+        add_to_rotated_mix_spectra_prefix_sum,
         get_abs_stem_spectra_moving_sum,
         get_rotated_mix_spectra_moving_sum,
         divider,
+        abs_stem_spectra_to_suffix_sums,
+        rotated_mix_spectra_to_suffix_sums,
         is_initialisation
     ):
         self.rotator = rotator
-        self.complete_abs_stem_spectra_cumsum_entry \
-            = complete_abs_stem_spectra_cumsum_entry
-        self.complete_rotated_mix_spectra_cumsum_entry \
-            = complete_rotated_mix_spectra_cumsum_entry
+        self.add_to_abs_stem_spectra_prefix_sum \
+            = add_to_abs_stem_spectra_prefix_sum
+        self.add_to_rotated_mix_spectra_prefix_sum \
+            = add_to_rotated_mix_spectra_prefix_sum
         self.get_abs_stem_spectra_moving_sum = get_abs_stem_spectra_moving_sum
         self.get_rotated_mix_spectra_moving_sum \
             = get_rotated_mix_spectra_moving_sum
         self.divider = divider
+        self.abs_stem_spectra_to_suffix_sums = abs_stem_spectra_to_suffix_sums
+        self.rotated_mix_spectra_to_suffix_sums \
+            = rotated_mix_spectra_to_suffix_sums
         self.is_initialisation = is_initialisation
 
         self._sub_iterables = list(self._get_subiterables())
 
     def __iter__(self):
-        if len(self._sub_iterables) == 1:
-            return iter(self.rotator)
-        else:
-            def get_iterator(iter_=zip(*self._sub_iterables)):
+        def get_iterator(iter_=zip(*self._sub_iterables)):
+            while True:
                 next(iter_)
 
                 yield
@@ -212,10 +227,8 @@ class _IterableForCumsumSlot:
 
     def _get_subiterables(self):
         yield self.rotator
-
-        if not self.complete_abs_stem_spectra_cumsum_entry.is_dummy:
-            yield self.complete_abs_stem_spectra_cumsum_entry
-            yield self.complete_rotated_mix_spectra_cumsum_entry
+        yield self.add_to_abs_stem_spectra_prefix_sum
+        yield self.add_to_rotated_mix_spectra_prefix_sum
 
         if self.is_initialisation:
             return
@@ -226,6 +239,17 @@ class _IterableForCumsumSlot:
 
         yield self.divider
 
+        if not self.abs_stem_spectra_to_suffix_sums.is_dummy:
+            yield self.abs_stem_spectra_to_suffix_sums
+            yield self.rotated_mix_spectra_to_suffix_sums
+
+
+# With a mono stem and a multi-channel mix, the EQ profile has one row per mix
+# channel but the abs stem spectra only need one, so they use the first row of
+# 'intermediate_a'.
+def _get_stem_shaped_view(arr, *, stem_spectra_buffer):
+    return arr[(0,) * (arr.ndim - stem_spectra_buffer.newest.ndim)]
+
 
 def _sanitise_intermediates_and_out(
     intermediate_a, intermediate_b, out, *, shape
@@ -268,7 +292,7 @@ class SpectraBuffersToEqProfile:
         self.intermediate_a, self.intermediate_b, self.out \
             = _sanitise_intermediates_and_out(
                   intermediate_a, intermediate_b, out,
-                  shape=self.stem_spectra_buffer.newest.shape
+                  shape=self.mix_spectra_buffer.newest.shape
               )
 
         self._abs_stem_spectra_sum, self._rotated_mix_spectra_sum \
@@ -280,7 +304,7 @@ class SpectraBuffersToEqProfile:
         def get_iterator(
             initial_rotator_iter=iter(self._initial_rotator),
             main_rotator_iter=iter(self._main_rotator),
-            abs_stem_spectrum=self.intermediate_a,
+            abs_stem_spectrum=self._main_rotator.out_a,
             rotated_mix_spectrum=self.out,
             abs_stem_spectra_sum=self._abs_stem_spectra_sum,
             rotated_mix_spectra_sum=self._rotated_mix_spectra_sum,
@@ -298,8 +322,8 @@ class SpectraBuffersToEqProfile:
         return get_iterator()
 
     def _get_sums(self):
-        for dtype in np.float32, np.complex64:
-            yield np.empty(self.out.shape, dtype=dtype)
+        yield np.empty(self.stem_spectra_buffer.newest.shape, dtype=np.float32)
+        yield np.empty(self.out.shape, dtype=np.complex64)
 
     def _get_rotators(self):
         yield Ataabtrnfatbaa(
@@ -310,7 +334,11 @@ class SpectraBuffersToEqProfile:
 
         yield Ataabtrnfatbaa(
             self.stem_spectra_buffer, self.mix_spectra_buffer,
-            out_a=self.intermediate_a, out_b=self.out
+            out_a=_get_stem_shaped_view(
+                self.intermediate_a,
+                stem_spectra_buffer=self.stem_spectra_buffer
+            ),
+            out_b=self.out
         )
 
     def _get_divider(self):
@@ -335,19 +363,21 @@ class SpectraBuffersToEqProfile:
 
 class SpectraBuffersToEqProfiles:
     __slots__ = [
-        "_abs_stem_spectra_cumsum", "_rotated_mix_spectra_cumsum",
-        "_kwargs_for_cumsum_slots",
+        "_abs_stem_spectra", "_rotated_mix_spectra",
+        "_abs_stem_spectra_prefix_sum", "_rotated_mix_spectra_prefix_sum",
+        "_kwargs_for_slots",
         "_initialisation_iterables", "_main_iterables",
         "stem_spectra_buffer", "mix_spectra_buffer",
-        "lookbehind", "max_abs_result", "ret_reciprocal_eq",
+        "lookbehind", "lookahead", "max_abs_result", "ret_reciprocal_eq",
         "intermediate_a", "intermediate_b",
         "out",
-        "cumsum_len"
+        "cycle_len"
     ]
 
     def __init__(
         self, stem_spectra_buffer, mix_spectra_buffer, *,
-        lookbehind, max_abs_result=MAX_ABS_RESULT, ret_reciprocal_eq=False,
+        lookbehind, lookahead=0,
+        max_abs_result=MAX_ABS_RESULT, ret_reciprocal_eq=False,
         intermediate_a=None,  # numpy.float32
         intermediate_b=None,  # bool
         out=None
@@ -357,21 +387,23 @@ class SpectraBuffersToEqProfiles:
                   stem_spectra_buffer, mix_spectra_buffer
               )
         self.lookbehind = san("lookbehind")
+        self.lookahead = self._sanitise_lookahead(lookahead)
         self.max_abs_result = san("max_abs_result")
         self.ret_reciprocal_eq = san("ret_reciprocal_eq")
         self.intermediate_a, self.intermediate_b, self.out \
             = _sanitise_intermediates_and_out(
                   intermediate_a, intermediate_b, out,
-                  shape=self.stem_spectra_buffer.newest.shape
+                  shape=self.mix_spectra_buffer.newest.shape
               )
 
-        self.cumsum_len = lookbehind + 2
+        self.cycle_len = lookbehind + lookahead + 1
 
-        self._abs_stem_spectra_cumsum, self._rotated_mix_spectra_cumsum \
-            = self._get_cumsums()
+        self._abs_stem_spectra, self._rotated_mix_spectra \
+            = self._get_spectra()
+        self._abs_stem_spectra_prefix_sum, \
+            self._rotated_mix_spectra_prefix_sum = self._get_prefix_sums()
 
-        self._kwargs_for_cumsum_slots \
-            = list(self._get_kwargs_for_cumsum_slots())
+        self._kwargs_for_slots = list(self._get_kwargs_for_slots())
 
         self._initialisation_iterables \
             = list(self._get_initialisation_iterables())
@@ -396,100 +428,529 @@ class SpectraBuffersToEqProfiles:
 
         return get_iterator()
 
-    def _get_cumsums(self):
-        cumsum_shape = self.cumsum_len, *self.out.shape
+    # With a 'lookahead', each profile is of the window centred on the
+    # spectra that are 'lookahead' frames older than the newest, which are
+    # the oldest of buffers with that lookbehind. So that the profile is
+    # applied to them (by ApplyEqProfilesToSpectraBufferOldest) and the mix
+    # is delayed to match, both buffers should have that lookbehind.
+    def _sanitise_lookahead(self, lookahead):
+        lookahead = san("lookahead")
+
+        if lookahead:
+            for name in "stem_spectra_buffer", "mix_spectra_buffer":
+                if getattr(self, name).lookbehind != lookahead:
+                    raise ValueError(
+                        f"with a 'lookahead', {name!r} should have a "
+                        "lookbehind of 'lookahead', so that its oldest "
+                        "spectra are at the centre of the window"
+                    )
 
-        for dtype in np.float32, np.complex64:
-            yield np.empty(cumsum_shape, dtype=dtype)
+        return lookahead
 
-    def _get_kwargs_for_cumsum_slots(self):
-        for cumsum_i in range(self.cumsum_len):
+    def _get_spectra(self):
+        yield np.empty(
+            (self.cycle_len, *self.stem_spectra_buffer.newest.shape),
+            dtype=np.float32
+        )
+        yield np.empty(
+            (self.cycle_len, *self.out.shape), dtype=np.complex64
+        )
+
+    def _get_prefix_sums(self):
+        yield np.empty(self.stem_spectra_buffer.newest.shape, dtype=np.float32)
+        yield np.empty(self.out.shape, dtype=np.complex64)
+
+    def _get_kwargs_for_slots(self):
+        abs_stem_spectra_sum = _get_stem_shaped_view(
+            self.intermediate_a, stem_spectra_buffer=self.stem_spectra_buffer
+        )
+
+        for slot_i in range(self.cycle_len):
             yield {
-                "rotator": _rotator_for_cumsum_slot_from_args(
+                "rotator": _rotator_for_slot_from_args(
                     stem_spectra_buffer=self.stem_spectra_buffer,
                     mix_spectra_buffer=self.mix_spectra_buffer,
-                    abs_stem_spectra_cumsum=self._abs_stem_spectra_cumsum,
-                    rotated_mix_spectra_cumsum
-                        =self._rotated_mix_spectra_cumsum,
-                    cumsum_i=cumsum_i
+                    abs_stem_spectra=self._abs_stem_spectra,
+                    rotated_mix_spectra=self._rotated_mix_spectra,
+                    slot_i=slot_i
                 ),
-                "complete_abs_stem_spectra_cumsum_entry":
-                    _CompleteCumsumEntryForCumsumSlot.from_args(
-                        cumsum=self._abs_stem_spectra_cumsum,
-                        cumsum_i=cumsum_i
+                "add_to_abs_stem_spectra_prefix_sum":
+                    _AddToPrefixSumForSlot.from_args(
+                        spectra=self._abs_stem_spectra,
+                        prefix_sum=self._abs_stem_spectra_prefix_sum,
+                        slot_i=slot_i
                     ),
-                "complete_rotated_mix_spectra_cumsum_entry":
-                    _CompleteCumsumEntryForCumsumSlot.from_args(
-                        cumsum=self._rotated_mix_spectra_cumsum,
-                        cumsum_i=cumsum_i
+                "add_to_rotated_mix_spectra_prefix_sum":
+                    _AddToPrefixSumForSlot.from_args(
+                        spectra=self._rotated_mix_spectra,
+                        prefix_sum=self._rotated_mix_spectra_prefix_sum,
+                        slot_i=slot_i
                     ),
                 "get_abs_stem_spectra_moving_sum":
-                    _GetMovingSumForCumsumSlot.from_args(
-                        cumsum=self._abs_stem_spectra_cumsum,
-                        cumsum_i=cumsum_i,
-                        probable_out=self.intermediate_a
+                    _GetMovingSumForSlot.from_args(
+                        spectra=self._abs_stem_spectra,
+                        prefix_sum=self._abs_stem_spectra_prefix_sum,
+                        slot_i=slot_i,
+                        probable_out=abs_stem_spectra_sum
                     ),
                 "get_rotated_mix_spectra_moving_sum":
-                    _GetMovingSumForCumsumSlot.from_args(
-                        cumsum=self._rotated_mix_spectra_cumsum,
-                        cumsum_i=cumsum_i,
+                    _GetMovingSumForSlot.from_args(
+                        spectra=self._rotated_mix_spectra,
+                        prefix_sum=self._rotated_mix_spectra_prefix_sum,
+                        slot_i=slot_i,
                         probable_out=self.out
                     ),
-                "divider": _divider_for_cumsum_slot_from_args(
-                    abs_stem_spectra_cumsum=self._abs_stem_spectra_cumsum,
-                    rotated_mix_spectra_cumsum
-                        =self._rotated_mix_spectra_cumsum,
-                    cumsum_i=cumsum_i,
-                    probable_abs_stem_spectra_sum=self.intermediate_a,
+                "divider": _divider_for_slot_from_args(
+                    abs_stem_spectra_prefix_sum
+                        =self._abs_stem_spectra_prefix_sum,
+                    rotated_mix_spectra_prefix_sum
+                        =self._rotated_mix_spectra_prefix_sum,
+                    slot_i=slot_i,
+                    cycle_len=self.cycle_len,
+                    probable_abs_stem_spectra_sum=abs_stem_spectra_sum,
                     probable_rotated_mix_spectra_sum=self.out,
                     max_abs_result=self.max_abs_result,
                     ret_reciprocal_eq=self.ret_reciprocal_eq,
+                    float_arr=self.intermediate_a,
                     bool_arr=self.intermediate_b
-                )
+                ),
+                "abs_stem_spectra_to_suffix_sums":
+                    _SpectraToSuffixSumsForSlot.from_args(
+                        spectra=self._abs_stem_spectra, slot_i=slot_i
+                    ),
+                "rotated_mix_spectra_to_suffix_sums":
+                    _SpectraToSuffixSumsForSlot.from_args(
+                        spectra=self._rotated_mix_spectra, slot_i=slot_i
+                    )
             }
 
     def _get_initialisation_iterables(self):
-        for cumsum_i in range(self.lookbehind):
-            yield _IterableForCumsumSlot(
-                **self._kwargs_for_cumsum_slots[cumsum_i],
+        for slot_i in range(self.cycle_len - 1):
+            yield _IterableForSlot(
+                **self._kwargs_for_slots[slot_i],
                 is_initialisation=True
             )
 
     def _get_main_iterables(self):
-        for subsequent_cumsum_i in range(self.cumsum_len):
-            cumsum_i \
-                = (subsequent_cumsum_i + self.lookbehind) % self.cumsum_len
+        for subsequent_slot_i in range(self.cycle_len):
+            slot_i = (subsequent_slot_i - 1) % self.cycle_len
 
-            yield _IterableForCumsumSlot(
-                **self._kwargs_for_cumsum_slots[cumsum_i],
+            yield _IterableForSlot(
+                **self._kwargs_for_slots[slot_i],
                 is_initialisation=False
             )
 
 
+# Rather than over a window, the sums are exponentially weighted: each
+# frame, they're decayed by a factor of e ** (-1 / time_constant) before the
+# newest spectra are added. Nothing but the sums is kept, so memory and
+# per-frame cost don't depend on 'time_constant', which may be as long as a
+# whole track. A 'time_constant' of about (lookbehind + 1) / 2 frames gives
+# the mean age of a SpectraBuffersToEqProfiles window. There's no
+# initialisation: the first profile is of the first frame alone.
+class SpectraBuffersToExponentialEqProfiles:
+    __slots__ = [
+        "_abs_stem_spectra_sum", "_rotated_mix_spectra_sum",
+        "_rotator", "_divider",
+        "stem_spectra_buffer", "mix_spectra_buffer",
+        "time_constant", "max_abs_result", "ret_reciprocal_eq",
+        "intermediate_a", "intermediate_b",
+        "out",
+        "decay"
+    ]
+
+    def __init__(
+        self, stem_spectra_buffer, mix_spectra_buffer, *,
+        time_constant, max_abs_result=MAX_ABS_RESULT, ret_reciprocal_eq=False,
+        intermediate_a=None,  # numpy.float32
+        intermediate_b=None,  # bool
+        out=None
+    ):
+        self.stem_spectra_buffer, self.mix_spectra_buffer \
+            = sanitise_stem_mix_spectra_buffers(
+                  stem_spectra_buffer, mix_spectra_buffer
+              )
+        self.time_constant = san("time_constant")
+        self.max_abs_result = san("max_abs_result")
+        self.ret_reciprocal_eq = san("ret_reciprocal_eq")
+        self.intermediate_a, self.intermediate_b, self.out \
+            = _sanitise_intermediates_and_out(
+                  intermediate_a, intermediate_b, out,
+                  shape=self.mix_spectra_buffer.newest.shape
+              )
+
+        self.decay = np.float32(exp(-1 / self.time_constant))
+
+        self._abs_stem_spectra_sum, self._rotated_mix_spectra_sum \
+            = self._get_sums()
+        self._rotator = self._get_rotator()
+        self._divider = self._get_divider()
+
+    def __iter__(self):
+        def get_iterator(
+            errstate=np.errstate, multiply=np.multiply, add=np.add,
+            rotator_iter=iter(self._rotator),
+            divider_iter=iter(self._divider),
+            decay=self.decay,
+            abs_stem_spectrum=self._rotator.out_a,
+            rotated_mix_spectrum=self._rotator.out_b,
+            abs_stem_spectra_sum=self._abs_stem_spectra_sum,
+            rotated_mix_spectra_sum=self._rotated_mix_spectra_sum
+        ):
+            while True:
+                next(rotator_iter)
+
+                # After a long silence, the sums decay through the subnormal
+                # range to 0, and dividing one by the other can overflow
+                # where the profile would be unsafe anyway.
+                with errstate(under="ignore", over="ignore"):
+                    multiply(
+                        abs_stem_spectra_sum, decay, out=abs_stem_spectra_sum
+                    )
+                    multiply(
+                        rotated_mix_spectra_sum, decay,
+                        out=rotated_mix_spectra_sum
+                    )
+                    add(
+                        abs_stem_spectra_sum, abs_stem_spectrum,
+                        out=abs_stem_spectra_sum
+                    )
+                    add(
+                        rotated_mix_spectra_sum, rotated_mix_spectrum,
+                        out=rotated_mix_spectra_sum
+                    )
+
+                    next(divider_iter)
+
+                yield
+
+        return get_iterator()
+
+    def _get_sums(self):
+        yield np.zeros(self.stem_spectra_buffer.newest.shape, dtype=np.float32)
+        yield np.zeros(self.out.shape, dtype=np.complex64)
+
+    # the newest spectra are rotated into the arrays that the profile is
+    # calculated into afterwards
+    def _get_rotator(self):
+        return Ataabtrnfatbaa(
+            self.stem_spectra_buffer, self.mix_spectra_buffer,
+            out_a=_get_stem_shaped_view(
+                self.intermediate_a,
+                stem_spectra_buffer=self.stem_spectra_buffer
+            ),
+            out_b=self.out
+        )
+
+    def _get_divider(self):
+        a, b = self._rotated_mix_spectra_sum, self._abs_stem_spectra_sum
+
+        if self.ret_reciprocal_eq:
+            a, b = b, a
+
+        return SafeDivider(
+            a, b,
+            max_abs_result=self.max_abs_result,
+            intermediate_a=self.intermediate_a,
+            intermediate_b=self.intermediate_b,
+            out=self.out
+        )
+
+
+def _sanitise_spectra_and_out(
+    stem_spectra, mix_spectra, out, *, window_len, eq_bands
+):
+    stem_spectra = san("stem_spectra")
+    mix_spectra = san("mix_spectra")
+
+    # as with the buffers, a mono stem can be compared to a multi-channel mix
+    if len(stem_spectra) != len(mix_spectra) or stem_spectra.shape[1:] \
+            not in (mix_spectra.shape[1:], mix_spectra.shape[-1:]):
+        raise ValueError(
+            "'stem_spectra' and 'mix_spectra' should have the same shape, or "
+            "the same number of frames and spectrum length if only "
+            "'mix_spectra' is 3-D"
+        )
+
+    if len(mix_spectra) < window_len:
+        raise ValueError(
+            "'stem_spectra' and 'mix_spectra' should have more frames than "
+            "'lookbehind' and 'lookahead' together"
+        )
+
+    eq_profiles_shape \
+        = len(mix_spectra) - window_len + 1, *mix_spectra.shape[1:]
+
+    if eq_bands is None:
+        out, = sanitise_unique_arrays_of_shape(
+            array_infos=[(out, "out", "complex")],
+            reference_shape=eq_profiles_shape,
+            reference_name="'mix_spectra' without its first 'lookbehind' and "
+                "last 'lookahead' frames"
+        )
+    else:
+        out = sanitise_eq_band_coefficients(
+            out, name="out", eq_bands=eq_bands,
+            eq_profile_shape=eq_profiles_shape
+        )
+
+    return stem_spectra, mix_spectra, out
+
+
+# For offline use on whole (frames, bins) or (frames, channels, bins)
+# spectra: row i of the result is the profile that SpectraBuffersToEqProfiles
+# gives once it's been passed frame i + lookbehind + lookahead, which is
+# centred on frame i + lookbehind, so there are 'lookbehind' + 'lookahead'
+# fewer rows than frames. It makes the same adds in the same order, but each
+# is of a slot of every cycle in a block rather than of one, and the rotation
+# and divide are of the whole block. 'block_len' is rounded down to whole
+# cycles, and the temporaries are of one block, so 'out' may be a
+# numpy.memmap.
+#
+# With 'eq_bands', the profiles are estimated at band resolution instead:
+# the block's absolute and rotated spectra are pooled into bands before the
+# moving sums, so those and the divide are of bands rather than bins, and
+# 'out' is of the EqBands' coefficients.
+def spectra_to_eq_profiles(
+    stem_spectra, mix_spectra, *,
+    lookbehind, lookahead=0,
+    max_abs_result=MAX_ABS_RESULT, ret_reciprocal_eq=False,
+    block_len=EQ_PROFILES_BLOCK_LEN, eq_bands=None,
+    out=None
+):
+    lookbehind = san("lookbehind")
+    lookahead = san("lookahead")
+    max_abs_result = san("max_abs_result")
+    ret_reciprocal_eq = san("ret_reciprocal_eq")
+    block_len = san("block_len")
+    eq_bands = sanitise_eq_bands(eq_bands)
+
+    cycle_len = lookbehind + lookahead + 1
+    stem_spectra, mix_spectra, out = _sanitise_spectra_and_out(
+        stem_spectra, mix_spectra, out,
+        window_len=cycle_len, eq_bands=eq_bands
+    )
+
+    # each channel is done as 2-D (frames, bins) arrays
+    if mix_spectra.ndim == 2:
+        stem_spectra, mix_spectra, channels_out \
+            = stem_spectra[:, None], mix_spectra[:, None], out[:, None]
+    else:
+        if stem_spectra.ndim == 2:
+            stem_spectra = stem_spectra[:, None]
+
+        channels_out = out
+
+    num_of_cycles_per_block = min(
+        max(block_len // cycle_len, 1), -(-len(mix_spectra) // cycle_len)
+    )
+    block_len = num_of_cycles_per_block * cycle_len
+    spectrum_len = mix_spectra.shape[-1]
+    band_len = spectrum_len if eq_bands is None else eq_bands.num_of_bands
+
+    # the first cycle of each is the previous block's last one, as suffix
+    # sums, and it starts as zeros so that it's harmless before the first
+    spectra_shape = num_of_cycles_per_block + 1, cycle_len, band_len
+    abs_stem_spectra = np.zeros(spectra_shape, dtype=np.float32)
+    rotated_mix_spectra = np.zeros(spectra_shape, dtype=np.complex64)
+
+    # once they've had the suffix sums added, these are the moving sums
+    prefix_sums_shape = num_of_cycles_per_block, cycle_len, band_len
+    abs_stem_spectra_prefix_sums \
+        = np.empty(prefix_sums_shape, dtype=np.float32)
+    rotated_mix_spectra_prefix_sums \
+        = np.empty(prefix_sums_shape, dtype=np.complex64)
+
+    frames_shape = block_len, spectrum_len
+    is_zero = np.empty(frames_shape, dtype=bool)
+    rotation = np.empty(frames_shape, dtype=np.complex64)
+
+    bands_shape = block_len, band_len
+    abs_results = np.empty(bands_shape, dtype=np.float32)
+    is_safe = np.empty(bands_shape, dtype=bool)
+    indices = np.broadcast_to(np.arange(band_len), bands_shape)
+    prev_safe_indices = np.empty(bands_shape, dtype=np.int64)
+    next_safe_indices = np.empty(bands_shape, dtype=np.int64)
+
+    if eq_bands is None:
+        abs_stem_bins = rotated_mix_bins = None
+    else:
+        # the spectra before they're pooled, and the profiles before they're
+        # split into magnitudes and phases if they are
+        abs_stem_bins = np.empty(frames_shape, dtype=np.float32)
+        rotated_mix_bins = np.empty(frames_shape, dtype=np.complex64)
+        band_eq_profiles = np.empty(bands_shape, dtype=np.complex64)
+
+    for channel_i in range(mix_spectra.shape[1]):
+        stem_channel_i = channel_i if stem_spectra.shape[1] > 1 else 0
+        stem_channel = stem_spectra[:, stem_channel_i]
+        mix_channel = mix_spectra[:, channel_i]
+
+        for start_i in range(0, len(mix_spectra), block_len):
+            frames_len = min(block_len, len(mix_spectra) - start_i)
+            num_of_cycles = -(-frames_len // cycle_len)
+            num_of_whole_cycles = frames_len // cycle_len
+
+            abs_stem_block \
+                = abs_stem_spectra[1:].reshape(bands_shape)[:frames_len]
+            rotated_mix_block \
+                = rotated_mix_spectra[1:].reshape(bands_shape)[:frames_len]
+
+            _rotate_fused(
+                stem_channel[start_i:start_i + frames_len],
+                mix_channel[start_i:start_i + frames_len],
+                is_zero=is_zero[:frames_len],
+                intermediate=rotation[:frames_len],
+                out_a=abs_stem_block if eq_bands is None
+                    else abs_stem_bins[:frames_len],
+                out_b=rotated_mix_block if eq_bands is None
+                    else rotated_mix_bins[:frames_len]
+            )
+
+            if eq_bands is not None:
+                eq_bands.pool(abs_stem_bins[:frames_len], out=abs_stem_block)
+                eq_bands.pool(
+                    rotated_mix_bins[:frames_len], out=rotated_mix_block
+                )
+
+            # the same adds as the slots of SpectraBuffersToEqProfiles, but
+            # for every cycle in the block at once. Only the last cycle of the
+            # last block can be partial, and its suffix sums are never needed.
+            for spectra, prefix_sums in (
+                (abs_stem_spectra, abs_stem_spectra_prefix_sums),
+                (rotated_mix_spectra, rotated_mix_spectra_prefix_sums)
+            ):
+                cycles = spectra[1:num_of_cycles + 1]
+                prefix_sums = prefix_sums[:num_of_cycles]
+                whole_cycles = spectra[1:num_of_whole_cycles + 1]
+
+                np.copyto(prefix_sums[:, 0], cycles[:, 0])
+
+                for slot_i in range(1, cycle_len):
+                    np.add(
+                        prefix_sums[:, slot_i - 1], cycles[:, slot_i],
+                        out=prefix_sums[:, slot_i]
+                    )
+
+                for slot_i in reversed(range(cycle_len - 1)):
+                    np.add(
+                        whole_cycles[:, slot_i], whole_cycles[:, slot_i + 1],
+                        out=whole_cycles[:, slot_i]
+                    )
+
+                np.add(
+                    prefix_sums[:, :-1], spectra[:num_of_cycles, 1:],
+                    out=prefix_sums[:, :-1]
+                )
+
+                spectra[0] = spectra[num_of_whole_cycles]
+
+            # the moving sums before the first whole window are incomplete
+            sums_start_i = max(cycle_len - 1 - start_i, 0)
+            sums = slice(sums_start_i, frames_len)
+            sums_len = frames_len - sums_start_i
+
+            a = rotated_mix_spectra_prefix_sums.reshape(bands_shape)[sums]
+            b = abs_stem_spectra_prefix_sums.reshape(bands_shape)[sums]
+
+            if ret_reciprocal_eq:
+                a, b = b, a
+
+            # the same as SafeDivider
+            out_start_i = start_i + sums_start_i - (cycle_len - 1)
+            channel_out = channels_out[
+                out_start_i:out_start_i + sums_len, channel_i
+            ]
+
+            if eq_bands is None or eq_bands.representation == "complex":
+                block_out = channel_out
+            else:
+                block_out = band_eq_profiles[:sums_len]
+
+            np.divide(a, b, out=block_out)
+            np.abs(block_out, out=abs_results[:sums_len])
+            np.less_equal(
+                abs_results[:sums_len], max_abs_result, out=is_safe[:sums_len]
+            )
+
+            if not is_safe[:sums_len].all():
+                interpolate_missing_along_last_axis(
+                    block_out, is_safe[:sums_len],
+                    indices=indices[:sums_len],
+                    prev_safe_indices=prev_safe_indices[:sums_len],
+                    next_safe_indices=next_safe_indices[:sums_len]
+                )
+
+            if block_out is not channel_out:
+                np.abs(block_out, out=channel_out[:, 0])
+                channel_out[:, 1] = np.unwrap(np.angle(block_out), axis=-1)
+
+    return out
+
+
+# With 'eq_bands', 'eq_profile' is of the EqBands' coefficients, which are
+# expanded into 'expanded_eq_profile' before each multiply, so that they can
+# be updated in place like a full profile.
 class ApplyEqProfilesToSpectraBufferOldest:
-    __slots__ = ["eq_profile", "spectra_buffer", "out"]
+    __slots__ = [
+        "eq_profile", "spectra_buffer", "eq_bands", "expanded_eq_profile",
+        "out"
+    ]
+
+    def __init__(self, eq_profile, spectra_buffer, *, eq_bands=None, out=None):
+        self.eq_bands = sanitise_eq_bands(eq_bands)
+
+        if eq_bands is None:
+            self.eq_profile = san("eq_profile")
+            self.expanded_eq_profile = eq_profile
+        else:
+            self.eq_profile = sanitise_eq_band_coefficients(
+                eq_profile, name="eq_profile", eq_bands=eq_bands
+            )
+            self.expanded_eq_profile = np.empty(
+                eq_bands.get_eq_profile_shape(eq_profile.shape),
+                dtype=np.complex64
+            )
 
-    def __init__(self, eq_profile, spectra_buffer, *, out=None):
-        self.eq_profile = san("eq_profile")
         self.spectra_buffer = sanitise_spectra_buffer(
-            spectra_buffer, name="spectra_buffer",
-            reference_shape=eq_profile.shape,
-            reference_name_quoted="'eq_profile'"
+            spectra_buffer, name="spectra_buffer"
         )
+        eq_profile_shape = self.expanded_eq_profile.shape
+
+        # a mono stem can be EQ'd by a multi-channel profile
+        if self.spectra_buffer.newest.shape not in (
+            eq_profile_shape, eq_profile_shape[-1:]
+        ):
+            raise ValueError(
+                "'spectra_buffer' arrays should have the same shape as "
+                "'eq_profile', or its length if only 'eq_profile' is 2-D"
+            )
+
         self.out = sanitise_spectra_buffer(
             out, name="out",
-            reference_shape=eq_profile.shape,
+            reference_shape=eq_profile_shape,
             reference_name_quoted="'eq_profile' and 'spectra_buffer' arrays"
         )
 
     def __iter__(self):
+        if self.eq_bands is None:
+            expand = None
+        else:
+            expand = self.eq_bands.get_expander(
+                self.eq_profile, out=self.expanded_eq_profile
+            )
+
         def get_iterator(
             multiply=np.multiply,
+            expand=expand,
             spectra_buffer=self.spectra_buffer,
-            eq_profile=self.eq_profile,
+            eq_profile=self.expanded_eq_profile,
             out=self.out
         ):
             while True:
+                if expand is not None:
+                    expand()
+
                 multiply(spectra_buffer.oldest, eq_profile, out=out.oldest)
 
                 yield
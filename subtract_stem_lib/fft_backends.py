@@ -0,0 +1,311 @@
+import os
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+_KINDS = "fft", "ifft", "rfft", "irfft"
+
+
+class FftBackend(ABC):
+    __slots__ = ["_plans"]
+
+    name = None
+
+    def __init__(self):
+        self._plans = {}
+
+    # A plan is a callable of (in_, out) that writes the transform of 'in_'
+    # along its last axis into 'out'. 'grain_len' is the length of the real
+    # or complex grain side of the transform, and 'batch' is None for a
+    # single grain, or the number of grains in a block, or the shape in
+    # front of the last axis, e.g. (num_of_grains, channels).
+    def get_plan(self, kind, *, grain_len, dtype=np.complex64, batch=None):
+        if kind not in _KINDS:
+            raise ValueError(f"'kind' should be one of {_KINDS}")
+
+        if batch is not None:
+            batch = (batch,) if isinstance(batch, int) else tuple(batch)
+
+        key = kind, grain_len, np.dtype(dtype), batch
+
+        if key not in self._plans:
+            self._plans[key] = self._make_plan(
+                kind, grain_len=grain_len, dtype=np.dtype(dtype), batch=batch
+            )
+
+        return self._plans[key]
+
+    @abstractmethod
+    def _make_plan(self, kind, *, grain_len, dtype, batch):
+        ...
+
+    # the smallest 5-smooth length that is at least 'n'
+    def next_fast_len(self, n, *, half_spectrum=False):
+        best = 1 << (n - 1).bit_length()
+
+        power_of_5 = 1
+        while power_of_5 < best:
+            power_of_3_and_5 = power_of_5
+            while power_of_3_and_5 < best:
+                candidate = power_of_3_and_5
+                while candidate < n:
+                    candidate *= 2
+
+                best = min(best, candidate)
+                power_of_3_and_5 *= 3
+
+            power_of_5 *= 5
+
+        return best
+
+
+class NumpyFftBackend(FftBackend):
+    __slots__ = []
+
+    name = "numpy"
+
+    def _make_plan(self, kind, *, grain_len, dtype, batch):
+        if kind == "irfft":
+            def plan(in_, out, irfft=np.fft.irfft, n=grain_len):
+                irfft(in_, n=n, axis=-1, out=out)
+        else:
+            def plan(in_, out, transform=getattr(np.fft, kind)):
+                transform(in_, axis=-1, out=out)
+
+        return plan
+
+
+# scipy.fft's functions allocate their results, whereas the pocketfft
+# functions underneath them write into an 'out'. Those are private, so
+# they're only used if they take the arguments that the plans pass and give
+# the same results as scipy.fft. Otherwise this gives None.
+def _get_checked_pocketfft(scipy_fft):
+    grain = np.arange(5, dtype=np.float32)
+    half_spectrum = np.empty(3, dtype=np.complex64)
+    spectrum = np.empty(5, dtype=np.complex64)
+    real_grain = np.empty(5, dtype=np.float32)
+    complex_grain = np.empty(5, dtype=np.complex64)
+
+    try:
+        from scipy.fft._pocketfft import pypocketfft
+
+        pypocketfft.r2c(grain, (-1,), True, 0, half_spectrum, 1)
+        pypocketfft.c2c(
+            grain.astype(np.complex64), (-1,), True, 0, spectrum, 1
+        )
+        pypocketfft.c2r(half_spectrum, (-1,), 5, False, 2, real_grain, 1)
+        pypocketfft.c2c(spectrum, (-1,), False, 2, complex_grain, 1)
+    except Exception:
+        return None
+
+    expected_spectrum = scipy_fft.fft(grain)
+
+    if all(
+        np.allclose(result, expected, atol=0.000_1)
+        for result, expected in (
+            (half_spectrum, expected_spectrum[:3]),
+            (spectrum, expected_spectrum),
+            (real_grain, grain),
+            (complex_grain, grain)
+        )
+    ):
+        return pypocketfft
+    else:
+        return None
+
+
+class ScipyFftBackend(FftBackend):
+    __slots__ = ["_scipy_fft", "_pocketfft", "workers"]
+
+    name = "scipy"
+
+    # scipy is slow to import, so it's only imported once it's needed
+    def __init__(self, *, workers=None):
+        try:
+            import scipy.fft
+        except ImportError:
+            raise ImportError("the 'scipy' FFT backend requires scipy")
+
+        super().__init__()
+
+        self._scipy_fft = scipy.fft
+        self._pocketfft = _get_checked_pocketfft(scipy.fft)
+        self.workers = os.cpu_count() if workers is None else workers
+
+    def next_fast_len(self, n, *, half_spectrum=False):
+        return self._scipy_fft.next_fast_len(n, real=half_spectrum)
+
+    # The plans write into 'out' through pocketfft where they can, where an
+    # 'inorm' of 2 divides by the grain length, as for inverses. Single
+    # grains are too small to be worth splitting between threads.
+    def _make_plan(self, kind, *, grain_len, dtype, batch):
+        pocketfft = self._pocketfft
+        nthreads = 1 if batch is None else self.workers
+
+        if pocketfft is None:
+            return self._make_public_api_plan(
+                kind, grain_len=grain_len, workers=nthreads
+            )
+
+        if kind == "rfft":
+            def plan(in_, out, r2c=pocketfft.r2c, nthreads=nthreads):
+                r2c(in_, (-1,), True, 0, out, nthreads)
+        elif kind == "irfft":
+            def plan(
+                in_, out,
+                c2r=pocketfft.c2r, n=grain_len, nthreads=nthreads
+            ):
+                c2r(in_, (-1,), n, False, 2, out, nthreads)
+        else:
+            def plan(
+                in_, out,
+                c2c=pocketfft.c2c,
+                forward=kind == "fft", inorm=0 if kind == "fft" else 2,
+                nthreads=nthreads
+            ):
+                c2c(in_, (-1,), forward, inorm, out, nthreads)
+
+        return plan
+
+    def _make_public_api_plan(self, kind, *, grain_len, workers):
+        scipy_fft = self._scipy_fft
+
+        if kind == "irfft":
+            def plan(
+                in_, out,
+                irfft=scipy_fft.irfft, n=grain_len, workers=workers
+            ):
+                out[...] = irfft(in_, n=n, axis=-1, workers=workers)
+        else:
+            def plan(
+                in_, out,
+                transform=getattr(scipy_fft, kind), workers=workers
+            ):
+                out[...] = transform(in_, axis=-1, workers=workers)
+
+        return plan
+
+
+class PyfftwFftBackend(FftBackend):
+    __slots__ = ["_pyfftw", "workers", "planner_effort"]
+
+    name = "pyfftw"
+
+    def __init__(self, *, workers=None, planner_effort="FFTW_MEASURE"):
+        try:
+            import pyfftw
+        except ImportError:
+            raise ImportError("the 'pyfftw' FFT backend requires pyFFTW")
+
+        super().__init__()
+
+        self._pyfftw = pyfftw
+        self.workers = os.cpu_count() if workers is None else workers
+        self.planner_effort = planner_effort
+
+    def next_fast_len(self, n, *, half_spectrum=False):
+        return self._pyfftw.next_fast_len(n)
+
+    def _make_plan(self, kind, *, grain_len, dtype, batch):
+        pyfftw = self._pyfftw
+        real_dtype = np.finfo(dtype).dtype
+        spectrum_len = grain_len // 2 + 1 if kind in ("rfft", "irfft") \
+            else grain_len
+        shape_start = () if batch is None else batch
+
+        if kind in ("fft", "ifft"):
+            in_dtype = out_dtype = dtype
+            in_len = out_len = grain_len
+        elif kind == "rfft":
+            in_dtype, out_dtype = real_dtype, dtype
+            in_len, out_len = grain_len, spectrum_len
+        else:
+            in_dtype, out_dtype = dtype, real_dtype
+            in_len, out_len = spectrum_len, grain_len
+
+        # Planned as unaligned so that it can run on the caller's arrays
+        # directly. These are only used for callers' arrays of another
+        # dtype or layout, as otherwise FFTW would copy those into whichever
+        # caller's arrays it last ran on.
+        plan_in = pyfftw.empty_aligned((*shape_start, in_len), dtype=in_dtype)
+        plan_out \
+            = pyfftw.empty_aligned((*shape_start, out_len), dtype=out_dtype)
+
+        fftw = pyfftw.FFTW(
+            plan_in, plan_out,
+            axes=(-1,),
+            direction="FFTW_BACKWARD" if kind in ("ifft", "irfft")
+                else "FFTW_FORWARD",
+            flags=(self.planner_effort, "FFTW_UNALIGNED"),
+            threads=1 if batch is None else self.workers
+        )
+
+        def plan(in_, out, fftw=fftw, plan_in=plan_in, plan_out=plan_out):
+            if in_.dtype != plan_in.dtype or in_.strides != plan_in.strides:
+                plan_in[...] = in_
+                in_ = plan_in
+
+            if out.strides == plan_out.strides:
+                fftw(in_, out)
+            else:
+                fftw(in_, plan_out)
+                out[...] = plan_out
+
+        return plan
+
+
+_backend_classes_for_names = {
+    backend_class.name: backend_class
+    for backend_class in (NumpyFftBackend, ScipyFftBackend, PyfftwFftBackend)
+}
+_shared_backends_for_names = {}
+_default_fft_backend = NumpyFftBackend()
+
+
+def fft_backend_from_name(name, **kwargs):
+    if name not in _backend_classes_for_names:
+        raise ValueError(
+            f"'name' should be one of {tuple(_backend_classes_for_names)}"
+        )
+
+    return _backend_classes_for_names[name](**kwargs)
+
+
+# backends named by str are shared so that their plans are too
+def _get_shared_fft_backend(name):
+    if name not in _shared_backends_for_names:
+        _shared_backends_for_names[name] = fft_backend_from_name(name)
+
+    return _shared_backends_for_names[name]
+
+
+def get_default_fft_backend():
+    return _default_fft_backend
+
+
+def set_default_fft_backend(fft_backend):
+    global _default_fft_backend
+
+    if type(fft_backend) is str:
+        fft_backend = _get_shared_fft_backend(fft_backend)
+    elif not isinstance(fft_backend, FftBackend):
+        raise TypeError(
+            "'fft_backend' should be a subtract_stem_lib.FftBackend subclass "
+            "instance or a str"
+        )
+
+    _default_fft_backend = fft_backend
+
+
+def sanitise_fft_backend(fft_backend, *, name="fft_backend"):
+    if fft_backend is None:
+        return _default_fft_backend
+    elif type(fft_backend) is str:
+        return _get_shared_fft_backend(fft_backend)
+    elif isinstance(fft_backend, FftBackend):
+        return fft_backend
+    else:
+        raise TypeError(
+            f"if provided, {name!r} should be a subtract_stem_lib.FftBackend "
+            "subclass instance or a str"
+        )
@@ -1,22 +1,37 @@
+import numpy as np
+
 from .defaults import (
     MAX_ABS_RESULT,
-    FIND_DELAY_STEM_SAMPLES_VAL_ADD, FIND_DELAY_STEM_SAMPLES_MIN_DIFF,
-    FIND_DELAY_STEM_SECONDS_VAL_ADD, FIND_DELAY_STEM_SECONDS_MIN_DIFF
+    FIND_DELAY_STEM_SAMPLES_VAL_ADD, FIND_DELAY_STEM_SAMPLES_MIN_DIFF
 )
 from ._sanitisation import sanitise_arg_or_args as san
 from ._sanitise_unique_arrays_of_shape import sanitise_unique_arrays_of_shape
-from .audio_grains import InnerGrainInfo
+from ._sanitise_spectra_buffer import get_spectrum_shape
+from .fft_backends import sanitise_fft_backend
+from .pad_lens import sanitise_pad_lens_or_auto
+from .hone_in import hone_in
+from .audio_grains import InnerGrainInfo, AudioToHannGrainBlocks
+from .transforms import GrainBlocksToSpectraBlocks
+from .fractional_delay import (
+    split_delay_samples, get_fractional_delay_phase_ramp
+)
+from .eq_profiles import SpectraBuffersToEqProfile
+from .audio_pair_to_eq_profile import AudioPairToEqProfile
 
 
 class FindDelayStemSamples:
     __slots__ = [
+        "_mix_spectra_block", "_stem_spectra_block",
+        "_stem_spectra_block_delay_samples",
         "stem_audio", "mix_audio",
         "start_i", "num_of_iterations_per_guess",
         "inner_grain_len", "interval_len", "overlap",
+        "left_pad_len", "right_pad_len", "grain_len",
+        "half_spectrum", "fft_backend", "fractional_delay_mode",
         "first_guess", "first_guess_add", "min_guess_diff",
         "max_abs_eq_profile",
         "intermediate_a", "intermediate_b", "intermediate_c",
-        "intermediate_d", "intermediate_e",
+        "intermediate_d", "intermediate_e", "intermediate_f",
         "logger",
         "results"
     ]
@@ -26,22 +41,42 @@ class FindDelayStemSamples:
         stem_audio, mix_audio,
         start_i, num_of_iterations_per_guess,
         inner_grain_len=None, interval_len=None, overlap=None,
+        pad_len=None, left_pad_len=None, right_pad_len=None,
+        half_spectrum=False, fft_backend=None,
+        fractional_delay_mode="window",
         first_guess=0.0, first_guess_add=FIND_DELAY_STEM_SAMPLES_VAL_ADD,
         min_guess_diff=FIND_DELAY_STEM_SAMPLES_MIN_DIFF,
         max_abs_eq_profile=MAX_ABS_RESULT,
-        intermediate_a=None,  # numpy.float32 of size grain_len???NEED TO UPDATE THIS BIT
-        intermediate_b=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_c=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_d=None,  # bool of size grain_len
-        intermediate_e=None,  # numpy.complex64 Buffer of size grain_len
+        intermediate_a=None,  # numpy.float32 of size grain_len
+        intermediate_b=None,  # numpy.complex64 Buffer of size spectrum_len
+        intermediate_c=None,  # numpy.complex64 Buffer of size spectrum_len
+        intermediate_d=None,  # bool of size spectrum_len
+        intermediate_e=None,  # numpy.complex64 Buffer of size spectrum_len
+        intermediate_f=None,  # numpy.float32 of size spectrum_len
         logger=None
     ):
         self.stem_audio, self.mix_audio = san("stem_audio"), san("mix_audio")
         self.start_i = san("start_i")
-        self.inner_grain_len, self.interval_len \
-            = sanitise_hann_inner_grain_len_interval_len(
-                  inner_grain_len, interval_len
-              )
+
+        inner_grain_info = InnerGrainInfo(
+            inner_grain_len=inner_grain_len,
+            interval_len=interval_len, overlap=overlap
+        )
+        self.inner_grain_len = inner_grain_info.inner_grain_len
+        self.interval_len = inner_grain_info.interval_len
+        self.overlap = inner_grain_info.overlap
+
+        self.half_spectrum = san("half_spectrum")
+        self.fft_backend = sanitise_fft_backend(fft_backend)
+        self.left_pad_len, self.right_pad_len = sanitise_pad_lens_or_auto(
+            pad_len, left_pad_len, right_pad_len,
+            inner_grain_len=self.inner_grain_len,
+            half_spectrum=self.half_spectrum, fft_backend=self.fft_backend
+        )
+        self.grain_len \
+            = self.left_pad_len + self.inner_grain_len + self.right_pad_len
+
+        self.fractional_delay_mode = san("fractional_delay_mode")
         self.num_of_iterations_per_guess = san("num_of_iterations_per_guess")
         self.first_guess = san("first_guess")
         self.first_guess_add = san("first_guess_add")
@@ -49,15 +84,18 @@ class FindDelayStemSamples:
         self.max_abs_eq_profile = san("max_abs_eq_profile")
         (
             self.intermediate_a, self.intermediate_b, self.intermediate_c,
-            self.intermediate_d, self.intermediate_e
+            self.intermediate_d, self.intermediate_e, self.intermediate_f
         ) = self._sanitise_intermediates(
             intermediate_a, intermediate_b, intermediate_c, intermediate_d,
-            intermediate_e
+            intermediate_e, intermediate_f
         )
-        self.logger = san("logger")
+        self.logger = None if logger is None else san("logger")
 
         self.results = None
 
+        self._mix_spectra_block = self._stem_spectra_block = None
+        self._stem_spectra_block_delay_samples = None
+
     def __iter__(self):
         for results in hone_in(
             self._get_sum_abs_eq_profile,
@@ -72,34 +110,50 @@ class FindDelayStemSamples:
     def _sanitise_intermediates(
         self,
         intermediate_a, intermediate_b, intermediate_c, intermediate_d,
-        intermediate_e
+        intermediate_e, intermediate_f
     ):
-        return sanitise_unique_arrays_of_shape(
+        intermediate_a, = sanitise_unique_arrays_of_shape(
+            array_infos=[(intermediate_a, "intermediate_a", "float")],
+            reference_shape=(self.grain_len,),
+            reference_name="'grain_len'"
+        )
+
+        return intermediate_a, *sanitise_unique_arrays_of_shape(
             array_infos=[
-                (intermediate_a, "intermediate_a", "float"),
                 (intermediate_b, "intermediate_b", "complex"),
                 (intermediate_c, "intermediate_c", "complex"),
                 (intermediate_d, "intermediate_d", "bool"),
-                (intermediate_e, "intermediate_e", "complex")
+                (intermediate_e, "intermediate_e", "complex"),
+                (intermediate_f, "intermediate_f", "float")
             ],
-            reference_shape=(self.grain_len,),
-            reference_name="'grain_len'"
+            reference_shape=get_spectrum_shape(
+                (self.grain_len,), half_spectrum=self.half_spectrum
+            ),
+            reference_name="the spectra of 'grain_len'"
         )
 
     def _get_sum_abs_eq_profile(self, delay_stem_samples):
+        if self.fractional_delay_mode == "phase_ramp":
+            return self._get_sum_abs_eq_profile_from_spectra_blocks(
+                delay_stem_samples
+            )
+
         logger = self.logger
 
         audio_pair_to_eq_profile = AudioPairToEqProfile(
             self.stem_audio, self.mix_audio,
             start_i=self.start_i, interval_len=self.interval_len,
             num_of_iterations=self.num_of_iterations_per_guess,
-            grain_len=self.grain_len,
+            inner_grain_len=self.inner_grain_len,
+            left_pad_len=self.left_pad_len, right_pad_len=self.right_pad_len,
+            half_spectrum=self.half_spectrum, fft_backend=self.fft_backend,
             delay_stem_samples=delay_stem_samples,
             max_abs_result=self.max_abs_eq_profile,
             intermediate_a=self.intermediate_a,
             intermediate_b=self.intermediate_b,
             intermediate_c=self.intermediate_c,
             intermediate_d=self.intermediate_d,
+            intermediate_e=self.intermediate_f,
             out=self.intermediate_e
         )
 
@@ -115,6 +169,79 @@ class FindDelayStemSamples:
 
         return abs(eq_profile).sum()
 
+    def _get_spectra_block(self, audio, *, delay_audio_samples):
+        audio_to_grain_blocks = AudioToHannGrainBlocks(
+            audio,
+            start_i=self.start_i,
+            num_of_iterations=self.num_of_iterations_per_guess,
+            inner_grain_len=self.inner_grain_len,
+            interval_len=self.interval_len,
+            left_pad_len=self.left_pad_len, right_pad_len=self.right_pad_len,
+            delay_audio_samples=delay_audio_samples
+        )
+        grain_blocks_to_spectra_blocks = GrainBlocksToSpectraBlocks(
+            audio_to_grain_blocks.out,
+            half_spectrum=self.half_spectrum, fft_backend=self.fft_backend
+        )
+
+        next(zip(audio_to_grain_blocks, grain_blocks_to_spectra_blocks))
+
+        return grain_blocks_to_spectra_blocks.out
+
+    # the mix spectra never change, and the stem spectra only change when
+    # the whole part of the guess does, so between guesses each stem
+    # spectrum only needs multiplying by a phase ramp
+    def _get_sum_abs_eq_profile_from_spectra_blocks(self, delay_stem_samples):
+        logger = self.logger
+
+        delay_stem_samples_whole, delay_stem_samples_remainder \
+            = split_delay_samples(delay_stem_samples)
+
+        if self._mix_spectra_block is None:
+            self._mix_spectra_block = self._get_spectra_block(
+                self.mix_audio, delay_audio_samples=0
+            )
+
+        if self._stem_spectra_block_delay_samples \
+                != delay_stem_samples_whole:
+            self._stem_spectra_block = self._get_spectra_block(
+                self.stem_audio, delay_audio_samples=delay_stem_samples_whole
+            )
+            self._stem_spectra_block_delay_samples = delay_stem_samples_whole
+
+        phase_ramp = get_fractional_delay_phase_ramp(
+            self.grain_len, delay_stem_samples_remainder,
+            half_spectrum=self.half_spectrum
+        )
+
+        stem_spectrum, mix_spectrum = self.intermediate_b, self.intermediate_c
+        spectra_buffers_to_eq_profile = SpectraBuffersToEqProfile(
+            stem_spectrum, mix_spectrum,
+            max_abs_result=self.max_abs_eq_profile,
+            intermediate_a=self.intermediate_f,
+            intermediate_b=self.intermediate_d,
+            out=self.intermediate_e
+        )
+        spectra_buffers_to_eq_profile_iter \
+            = iter(spectra_buffers_to_eq_profile)
+
+        if logger is not None:
+            logger(delay_stem_samples, 0)
+
+        for i, (stem_block_spectrum, mix_block_spectrum) in enumerate(
+            zip(self._stem_spectra_block, self._mix_spectra_block), 1
+        ):
+            np.multiply(stem_block_spectrum, phase_ramp, out=stem_spectrum)
+            mix_spectrum[:] = mix_block_spectrum
+            next(spectra_buffers_to_eq_profile_iter)
+
+            if logger is not None:
+                logger(delay_stem_samples, i)
+
+        eq_profile = spectra_buffers_to_eq_profile.calculate_eq_profile()
+
+        return abs(eq_profile).sum()
+
 
 class FindDelayStemSeconds:
     __slots__ = ["find_delay_stem_samples", "sample_rate", "results"]
@@ -133,39 +260,3 @@ class FindDelayStemSeconds:
             }
 
             yield
-
-    @classmethod
-    def from_best_fit_args(
-        cls, *,
-        stem_audio, mix_audio,
-        start_ts=Timestamp.from_total_seconds(0),
-        stop_ts=Timestamp.from_total_seconds(0, reference_point="MIX_END"),
-        interval_len, num_of_iterations_per_guess,
-        inner_grain_len,
-        first_guess=0.0, first_guess_add=FIND_DELAY_STEM_SECONDS_VAL_ADD,
-        min_guess_diff=FIND_DELAY_STEM_SECONDS_MIN_DIFF,
-        max_abs_eq_profile=MAX_ABS_RESULT,
-        intermediate_a=None,  # numpy.float32 of size grain_len???NEED TO UPDATE THIS BIT
-        intermediate_b=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_c=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_d=None,  # bool of size grain_len
-        intermediate_e=None,  # numpy.complex64 Buffer of size grain_len
-        logger=None
-    ):
-        +...
-
-
-
-        self, *,
-        stem_audio, mix_audio,
-        start_i, interval_len, num_of_iterations_per_guess,
-        inner_grain_len,
-        first_guess=0.0, first_guess_add=FIND_DELAY_STEM_SAMPLES_VAL_ADD,
-        min_guess_diff=FIND_DELAY_STEM_SAMPLES_MIN_DIFF,
-        max_abs_eq_profile=MAX_ABS_RESULT,
-        intermediate_a=None,  # numpy.float32 of size grain_len???NEED TO UPDATE THIS BIT
-        intermediate_b=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_c=None,  # numpy.complex64 Buffer of size grain_len
-        intermediate_d=None,  # bool of size grain_len
-        intermediate_e=None,  # numpy.complex64 Buffer of size grain_len
-        logger=None
\ No newline at end of file
@@ -0,0 +1,78 @@
+from math import tau
+import numpy as np
+
+from ._sanitisation import sanitise as san
+from ._sanitise_spectra_buffer import sanitise_spectra_buffer
+
+
+def split_delay_samples(delay_samples):
+    # the whole part is applied by shifting 'start_i', so keeping the
+    # remainder within ±0.5 keeps the phase ramp as short a shift as possible
+    delay_samples_whole = round(delay_samples)
+
+    return delay_samples_whole, delay_samples - delay_samples_whole
+
+
+# multiplying a spectrum by this (circularly) delays its grain by
+# 'delay_samples', which is only a good approximation for small delays
+def get_fractional_delay_phase_ramp(
+    grain_len, delay_samples, *, half_spectrum=False
+):
+    grain_len = san("grain_len")
+    delay_samples = san("delay_samples", "delay_audio_samples")
+    half_spectrum = san("half_spectrum")
+
+    if half_spectrum:
+        freqs = np.fft.rfftfreq(grain_len)
+    else:
+        freqs = np.fft.fftfreq(grain_len)
+
+    phases = freqs * (-tau * float(delay_samples))
+
+    phase_ramp = np.empty(len(phases), dtype=np.complex64)
+    phase_ramp.real = np.cos(phases)
+    phase_ramp.imag = np.sin(phases)
+
+    return phase_ramp
+
+
+class ApplyPhaseRampToSpectraBufferNewest:
+    __slots__ = ["spectra_buffer", "phase_ramp"]
+
+    def __init__(self, spectra_buffer, *, phase_ramp):
+        self.phase_ramp = san("phase_ramp", "array_1d_complex")
+        self.spectra_buffer = sanitise_spectra_buffer(
+            spectra_buffer, name="spectra_buffer"
+        )
+
+        # multi-channel spectra share the same ramp
+        if self.spectra_buffer.newest.shape[-1:] != phase_ramp.shape:
+            raise ValueError(
+                "'spectra_buffer' arrays should have the same length as "
+                "'phase_ramp'"
+            )
+
+    def __iter__(self):
+        def get_iterator(
+            multiply=np.multiply,
+            spectra_buffer=self.spectra_buffer,
+            phase_ramp=self.phase_ramp
+        ):
+            while True:
+                spectrum = spectra_buffer.newest
+                multiply(spectrum, phase_ramp, out=spectrum)
+
+                yield
+
+        return get_iterator()
+
+    @classmethod
+    def from_delay_samples(
+        cls, spectra_buffer, *, grain_len, delay_samples, half_spectrum=False
+    ):
+        return cls(
+            spectra_buffer,
+            phase_ramp=get_fractional_delay_phase_ramp(
+                grain_len, delay_samples, half_spectrum=half_spectrum
+            )
+        )
@@ -82,8 +82,8 @@ def hone_in(
     scoring_function, *,
     first_val=0.0, val_add=1.0, highest_wins=False, min_diff=0.0
 ):
-    _, first_val, val_add, _, min_diff = sanitise_args(
-        "scoring_function", "first_val", "val_add", "highest_wins", "min_diff"
+    _, first_val, val_add, _, min_diff = san(
+        "scoring_function, first_val, val_add, highest_wins, min_diff"
     )
 
     results = _Results(
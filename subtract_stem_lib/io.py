@@ -1,16 +1,176 @@
-import librosa
-import soundfile
+import struct
+import numpy as np
 
 from ._sanitisation import sanitise_arg as san, sanitise_args
+from .audio_cache import AudioCache
 
 
-def load_audio(path, *, sample_rate=None, error_if_not_mono=True):
-    path, error_if_not_mono = sanitise_args("path", "error_if_not_mono")
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _get_float32_wav_info(path):
+    with open(path, "rb") as f:
+        riff_id, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+
+        if riff_id != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"audio at {path} is not a WAV file")
+
+        sample_rate = num_of_channels = None
+
+        while True:
+            chunk_header = f.read(8)
+
+            if len(chunk_header) < 8:
+                raise ValueError(f"audio at {path} has no 'data' chunk")
+
+            chunk_id, chunk_len = struct.unpack("<4sI", chunk_header)
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_len + chunk_len % 2)
+                format_tag, num_of_channels, sample_rate, _, _, bit_depth \
+                    = struct.unpack("<HHIIHH", fmt[:16])
+
+                # the sub-format GUID starts with the format tag
+                if format_tag == _WAVE_FORMAT_EXTENSIBLE:
+                    format_tag, = struct.unpack("<H", fmt[24:26])
+
+                if format_tag != _WAVE_FORMAT_IEEE_FLOAT or bit_depth != 32:
+                    raise ValueError(
+                        f"audio at {path} is not float32, so can't be "
+                        "memory-mapped"
+                    )
+            elif chunk_id == b"data":
+                if sample_rate is None:
+                    raise ValueError(
+                        f"audio at {path} has no 'fmt ' chunk before its "
+                        "'data' chunk"
+                    )
+
+                return sample_rate, num_of_channels, f.tell(), chunk_len
+            else:
+                f.seek(chunk_len + chunk_len % 2, 1)
+
+
+# Uncompressed float32 WAV files, and headerless little-endian float32 '.raw'
+# files, can be mapped straight into memory without decoding.
+def _load_audio_mmap(path, *, sample_rate, error_if_not_mono):
+    if path.suffix.lower() == ".raw":
+        if sample_rate is None:
+            raise TypeError(
+                "'sample_rate' should be provided for '.raw' audio"
+            )
+
+        file_sample_rate, num_of_channels = sample_rate, 1
+        offset, data_len = 0, path.stat().st_size
+    else:
+        file_sample_rate, num_of_channels, offset, data_len \
+            = _get_float32_wav_info(path)
+
+        if sample_rate is not None and sample_rate != file_sample_rate:
+            raise ValueError(
+                f"audio at {path} has a sample rate of {file_sample_rate}, "
+                "and memory-mapped audio can't be resampled"
+            )
+
+    if error_if_not_mono and num_of_channels != 1:
+        raise ValueError(f"audio at {path} is not mono")
+
+    num_of_samples = data_len // (4 * num_of_channels)
+
+    if num_of_samples == 0:
+        raise ValueError(f"audio at {path} is empty")
+
+    if num_of_channels == 1:
+        audio = np.memmap(
+            path, dtype=np.float32, mode="r",
+            offset=offset, shape=(num_of_samples,)
+        )
+    else:
+        # the same (channels, samples) layout as librosa.load()
+        audio = np.memmap(
+            path, dtype=np.float32, mode="r",
+            offset=offset, shape=(num_of_samples, num_of_channels)
+        ).T
+
+    return audio, file_sample_rate
+
+
+# soundfile and librosa are slow to import, so they're only imported once
+# they're needed, and librosa only for resampling or formats that soundfile
+# can't read
+def _read_audio(path, *, sample_rate):
+    import soundfile
+
+    try:
+        audio, file_sample_rate = soundfile.read(path, dtype="float32")
+    except soundfile.LibsndfileError:
+        import librosa
+
+        return librosa.load(path, sr=sample_rate, mono=False)
+
+    # the same (channels, samples) layout as librosa.load()
+    audio = np.ascontiguousarray(audio.T)
+
+    if sample_rate is None or sample_rate == file_sample_rate:
+        return audio, file_sample_rate
+
+    import librosa
+
+    return librosa.resample(
+        audio, orig_sr=file_sample_rate, target_sr=sample_rate
+    ), sample_rate
+
+
+def _decode_audio(path, *, sample_rate, cache):
+    if cache is None:
+        return _read_audio(path, sample_rate=sample_rate)
+
+    cached = cache.get(path, sample_rate=sample_rate)
+
+    if cached is not None:
+        return cached
+
+    audio, decoded_sample_rate = _read_audio(path, sample_rate=sample_rate)
+    cache.put(
+        path, audio,
+        sample_rate=sample_rate, decoded_sample_rate=decoded_sample_rate
+    )
+
+    return audio, decoded_sample_rate
+
+
+def load_audio(
+    path, *,
+    sample_rate=None, error_if_not_mono=True, mmap=False, cache=None
+):
+    path, error_if_not_mono, mmap = sanitise_args(
+        "path", "error_if_not_mono", "mmap"
+    )
 
     if sample_rate is not None:
         sample_rate = san("sample_rate")
 
-    audio, sample_rate = librosa.load(path, sr=sample_rate, mono=False)
+    if cache is not None and not isinstance(cache, AudioCache):
+        raise TypeError(
+            "if provided, 'cache' should be a subtract_stem_lib.AudioCache"
+        )
+
+    # mmap maps the file itself, so there'd be nothing for a cache to hold
+    if mmap and cache is not None:
+        raise ValueError("'mmap' and 'cache' can't be used together")
+
+    if mmap:
+        audio, sample_rate = _load_audio_mmap(
+            path,
+            sample_rate=sample_rate, error_if_not_mono=error_if_not_mono
+        )
+
+        return audio, san("sample_rate")
+
+    audio, sample_rate = _decode_audio(
+        path, sample_rate=sample_rate, cache=cache
+    )
 
     if error_if_not_mono and len(audio.shape) != 1:
         raise ValueError(f"audio at {path} is not mono")
@@ -22,5 +182,7 @@ def load_audio(path, *, sample_rate=None, error_if_not_mono=True):
 
 
 def save_audio(audio, path, *, sample_rate):
+    import soundfile
+
     _, path, sample_rate = sanitise_args("audio", "path", "sample_rate")
     soundfile.write(path, audio, samplerate=sample_rate, subtype="FLOAT")
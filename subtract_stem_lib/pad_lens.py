@@ -0,0 +1,119 @@
+from time import perf_counter
+import numpy as np
+
+from ._sanitisation import sanitise as san
+from .audio_grains import sanitise_pad_lens
+from .fft_backends import sanitise_fft_backend
+
+
+_BENCHMARK_BATCH = 64
+_BENCHMARK_REPEATS = 3
+_BENCHMARK_MAX_CANDIDATES = 8
+
+_benchmarked_grain_lens = {}
+
+
+def _get_7_smooth_lens(start, stop):
+    for n in range(start, stop + 1):
+        remainder = n
+
+        for prime in 2, 3, 5, 7:
+            while remainder % prime == 0:
+                remainder //= prime
+
+        if remainder == 1:
+            yield n
+
+
+def _time_plan(plan, grain_len, *, half_spectrum):
+    if half_spectrum:
+        in_ = np.zeros((_BENCHMARK_BATCH, grain_len), dtype=np.float32)
+        out = np.empty(
+            (_BENCHMARK_BATCH, grain_len // 2 + 1), dtype=np.complex64
+        )
+    else:
+        in_ = np.zeros((_BENCHMARK_BATCH, grain_len), dtype=np.complex64)
+        out = np.empty_like(in_)
+
+    plan(in_, out)
+
+    best = float("inf")
+    for _ in range(_BENCHMARK_REPEATS):
+        start = perf_counter()
+        plan(in_, out)
+        best = min(best, perf_counter() - start)
+
+    return best
+
+
+def _get_benchmarked_grain_len(min_grain_len, *, half_spectrum, fft_backend):
+    key = min_grain_len, half_spectrum, fft_backend
+
+    if key not in _benchmarked_grain_lens:
+        candidates = list(
+            _get_7_smooth_lens(min_grain_len, 1 << min_grain_len.bit_length())
+        )[:_BENCHMARK_MAX_CANDIDATES]
+
+        _benchmarked_grain_lens[key] = min(
+            candidates,
+            key=lambda grain_len: _time_plan(
+                fft_backend.get_plan(
+                    "rfft" if half_spectrum else "fft",
+                    grain_len=grain_len, batch=_BENCHMARK_BATCH
+                ),
+                grain_len,
+                half_spectrum=half_spectrum
+            )
+        )
+
+    return _benchmarked_grain_lens[key]
+
+
+def plan_pad_lens(
+    inner_grain_len, *,
+    min_pad_len=0, half_spectrum=False, fft_backend=None, method="smooth"
+):
+    inner_grain_len, min_pad_len, half_spectrum \
+        = san("inner_grain_len, min_pad_len, half_spectrum")
+    fft_backend = sanitise_fft_backend(fft_backend)
+
+    min_grain_len = inner_grain_len + 2 * min_pad_len
+
+    if method == "smooth":
+        grain_len = fft_backend.next_fast_len(
+            min_grain_len, half_spectrum=half_spectrum
+        )
+    elif method == "benchmark":
+        grain_len = _get_benchmarked_grain_len(
+            min_grain_len, half_spectrum=half_spectrum, fft_backend=fft_backend
+        )
+    else:
+        raise ValueError("'method' should be 'smooth' or 'benchmark'")
+
+    extra_pad_len = grain_len - min_grain_len
+    left_pad_len = min_pad_len + extra_pad_len // 2
+    right_pad_len = grain_len - inner_grain_len - left_pad_len
+
+    return left_pad_len, right_pad_len
+
+
+def sanitise_pad_lens_or_auto(
+    pad_len, left_pad_len, right_pad_len, *,
+    inner_grain_len, half_spectrum, fft_backend
+):
+    if type(pad_len) is str:
+        if pad_len != "auto":
+            raise ValueError("if 'pad_len' is a str, it should be 'auto'")
+
+        if left_pad_len is not None or right_pad_len is not None:
+            raise TypeError(
+                "if 'pad_len' is provided, neither 'left_pad_len' nor "
+                "'right_pad_len' should be provided"
+            )
+
+        return plan_pad_lens(
+            inner_grain_len,
+            half_spectrum=half_spectrum, fft_backend=fft_backend
+        )
+    else:
+        return tuple(sanitise_pad_lens(pad_len, left_pad_len, right_pad_len))
@@ -0,0 +1,138 @@
+import numpy as np
+
+from .buffer import RealBuffer, sanitise_num_of_items_or_lookbehind
+from ._sanitisation import sanitise as san
+
+
+_MAX_NDIM = 8
+_HEADER_DTYPE = np.dtype([
+    ("curr_i", np.int64),
+    ("num_of_items", np.int64),
+    ("ndim", np.int64),
+    ("shape", np.int64, (_MAX_NDIM,)),
+    ("dtype", "S16")
+])
+# the items start at a cache line boundary after the header
+_DATA_OFFSET = -(-_HEADER_DTYPE.itemsize // 64) * 64
+
+
+def _attach_shared_memory(name):
+    from multiprocessing import shared_memory
+
+    # Before Python 3.13, every process that attaches registers the block
+    # with its resource tracker, which unlinks it when that process's
+    # tracker exits. That's harmless for processes started by the creator's
+    # multiprocessing, as they share its tracker.
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name)
+
+
+# A RealBuffer whose items and cursor are in a
+# multiprocessing.shared_memory block, so that other processes can attach
+# to it by name (see attach_shared_buffer()) and read the items without
+# anything being pickled or copied. Pickling one only pickles its name.
+#
+# The cursor is a single aligned int64, so it's never read half-written,
+# but as increment_and_get_newest() moves it before the newest item is
+# filled, a consumer should only read the newest item once the producer has
+# signalled that it's complete (e.g. with a multiprocessing.Barrier).
+class SharedRealBuffer(RealBuffer):
+    __slots__ = ["_shared_memory", "_shared_curr_i", "name", "is_owner"]
+
+    def __init__(self, *, _shared_memory, _is_owner):
+        buf = _shared_memory.buf
+        header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=buf)
+        shape = tuple(int(x) for x in header["shape"][:header["ndim"]])
+
+        self._shared_memory = _shared_memory
+        self._shared_curr_i = np.ndarray((1,), dtype=np.int64, buffer=buf)
+        self._data = list(np.ndarray(
+            (int(header["num_of_items"]), *shape),
+            dtype=np.dtype(header["dtype"].item().decode()),
+            buffer=buf, offset=_DATA_OFFSET
+        ))
+
+        self.num_of_items = len(self._data)
+        self.lookbehind = self.num_of_items - 1
+        self.name = _shared_memory.name
+        self.is_owner = _is_owner
+
+    # shadows RealBuffer's slot, so that RealBuffer's methods use the cursor
+    # in shared memory
+    @property
+    def _curr_i(self):
+        return int(self._shared_curr_i[0])
+
+    @_curr_i.setter
+    def _curr_i(self, val):
+        self._shared_curr_i[0] = val
+
+    def __reduce__(self):
+        return attach_shared_buffer, (self.name,)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+        if self.is_owner:
+            self.unlink()
+
+    # any views of the items still held elsewhere prevent this
+    def close(self):
+        self._data = []
+        self._shared_curr_i = None
+        self._shared_memory.close()
+
+    # only the creating process should do this, once every process is done
+    def unlink(self):
+        self._shared_memory.unlink()
+
+
+def shared_buffer_from_array_args(
+    shape, *, dtype, num_of_items=None, lookbehind=None, name=None
+):
+    from multiprocessing import shared_memory
+
+    num_of_items = sanitise_num_of_items_or_lookbehind(
+        num_of_items, lookbehind
+    )
+    item = np.empty(shape, dtype=dtype)  # for the normalised shape and dtype
+
+    if item.ndim > _MAX_NDIM:
+        raise ValueError(
+            f"'shape' should have no more than {_MAX_NDIM} dimensions"
+        )
+
+    if item.dtype.hasobject or item.dtype.names is not None:
+        raise TypeError("'dtype' should be a plain numeric or bool dtype")
+
+    if name is not None:
+        name = san("name", "s")
+
+    shared_memory_ = shared_memory.SharedMemory(
+        name=name,
+        create=True,
+        size=_DATA_OFFSET + item.nbytes * num_of_items
+    )
+
+    header = np.ndarray((), dtype=_HEADER_DTYPE, buffer=shared_memory_.buf)
+    header["curr_i"] = 0
+    header["num_of_items"] = num_of_items
+    header["ndim"] = item.ndim
+    header["shape"][:item.ndim] = item.shape
+    header["dtype"] = item.dtype.str.encode()
+    del header
+
+    return SharedRealBuffer(_shared_memory=shared_memory_, _is_owner=True)
+
+
+def attach_shared_buffer(name):
+    name = san("name", "s")
+
+    return SharedRealBuffer(
+        _shared_memory=_attach_shared_memory(name), _is_owner=False
+    )
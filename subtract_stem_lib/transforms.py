@@ -2,67 +2,145 @@ import numpy as np
 
 from .buffer import Buffer, buffer_from_array_args
 from ._sanitisation import sanitise_arg as san
-from ._sanitise_spectra_buffer import sanitise_spectra_buffer
+from ._sanitise_spectra_buffer import (
+    get_spectrum_shape, sanitise_grain_len_for_spectrum_len,
+    sanitise_spectra_buffer
+)
+from ._sanitise_unique_arrays_of_shape import sanitise_unique_arrays_of_shape
+from .fft_backends import sanitise_fft_backend
+
+
+# multi-channel grains and spectra have their channels along the first axis,
+# and are transformed as a batch
+def _get_batch(arr):
+    return None if arr.ndim == 1 else len(arr)
 
 
 class GrainsToSpectraBuffer:
-    __slots__ = ["grain", "out"]
+    __slots__ = ["grain", "half_spectrum", "fft_backend", "out"]
 
-    def __init__(self, grain, *, out=None):
+    def __init__(
+        self, grain, *, half_spectrum=False, fft_backend=None, out=None
+    ):
         self.grain = san("grain")
+        self.half_spectrum = san("half_spectrum")
+        self.fft_backend = sanitise_fft_backend(fft_backend)
         self.out = sanitise_spectra_buffer(
             out, name="out",
-            reference_shape=grain.shape, reference_name_quoted="'grain'"
+            reference_shape=get_spectrum_shape(
+                grain.shape, half_spectrum=self.half_spectrum
+            ),
+            reference_name_quoted="'grain'"
         )
 
     def __iter__(self):
+        fft = self.fft_backend.get_plan(
+            "rfft" if self.half_spectrum else "fft",
+            grain_len=self.grain.shape[-1], batch=_get_batch(self.grain)
+        )
+
         if self.out.num_of_items == 1:
             def get_iterator(
-                fft=np.fft.fft,
+                fft=fft,
                 grain=self.grain, out=self.out.newest
             ):
                 while True:
-                    fft(grain, out=out)
+                    fft(grain, out)
 
                     yield
         else:
             def get_iterator(
-                fft=np.fft.fft,
+                fft=fft,
                 grain=self.grain, out=self.out
             ):
                 while True:
-                    fft(grain, out=out.increment_and_get_newest())
+                    fft(grain, out.increment_and_get_newest())
 
                     yield
 
         return get_iterator()
 
 
+# blocks of multi-channel grains are of shape
+# (num_of_grains, channels, grain_len)
+class GrainBlocksToSpectraBlocks:
+    __slots__ = ["grain_block", "half_spectrum", "fft_backend", "out"]
+
+    def __init__(
+        self, grain_block, *, half_spectrum=False, fft_backend=None, out=None
+    ):
+        self.grain_block = san("grain_block")
+        self.half_spectrum = san("half_spectrum")
+        self.fft_backend = sanitise_fft_backend(fft_backend)
+        self.out = self._sanitise_out(out)
+
+    def __iter__(self):
+        def get_iterator(
+            fft=self.fft_backend.get_plan(
+                "rfft" if self.half_spectrum else "fft",
+                grain_len=self.grain_block.shape[-1],
+                batch=self.grain_block.shape[:-1]
+            ),
+            grain_block=self.grain_block, out=self.out
+        ):
+            while True:
+                fft(grain_block, out)
+
+                yield
+
+        return get_iterator()
+
+    def _sanitise_out(self, out):
+        shape = get_spectrum_shape(
+            self.grain_block.shape, half_spectrum=self.half_spectrum
+        )
+
+        if out is None:
+            out = np.empty(shape, dtype=np.complex64)
+        else:
+            out = san("out", "spectra_block")
+
+            if out.shape != shape:
+                raise ValueError(
+                    "'out' should have same shape as the spectra of "
+                    "'grain_block'"
+                )
+
+        return out
+
+
 class SpectraBufferOldestToComplexGrains:
-    __slots__ = ["spectra_buffer", "out"]
+    __slots__ = ["spectra_buffer", "fft_backend", "out"]
 
-    def __init__(self, spectra_buffer, *, out=None):
+    def __init__(self, spectra_buffer, *, fft_backend=None, out=None):
         self.spectra_buffer \
             = sanitise_spectra_buffer(spectra_buffer, name="spectra_buffer")
+        self.fft_backend = sanitise_fft_backend(fft_backend)
         self.out = self._sanitise_out(out)
 
     def __iter__(self):
+        ifft = self.fft_backend.get_plan(
+            "ifft",
+            grain_len=self.spectra_buffer.newest.shape[-1],
+            batch=_get_batch(self.spectra_buffer.newest)
+        )
+
         if self.spectra_buffer.num_of_items == 1:
             def get_iterator(
-                ifft=np.fft.ifft,
+                ifft=ifft,
                 spectrum=self.spectra_buffer.oldest, out=self.out
             ):
                 while True:
-                    ifft(spectrum, out=out)
+                    ifft(spectrum, out)
 
                     yield
         else:
             def get_iterator(
-                ifft=np.ftt.ifft,
+                ifft=ifft,
                 spectra_buffer=self.spectra_buffer, out=self.out
             ):
                 while True:
-                    ifft(spectra_buffer.oldest, out=out)
+                    ifft(spectra_buffer.oldest, out)
 
                     yield
 
@@ -74,7 +152,9 @@ class SpectraBufferOldestToComplexGrains:
                 self.spectra_buffer.newest.shape, dtype=np.complex64
             )
         else:
-            out = san("out", "array_1d_complex")
+            out = san(
+                "out", f"array_{self.spectra_buffer.newest.ndim}d_complex"
+            )
 
             if out.shape != self.spectra_buffer.newest.shape:
                 raise ValueError(
@@ -82,3 +162,211 @@ class SpectraBufferOldestToComplexGrains:
                 )
 
         return out
+
+
+# The inverse of GrainsToSpectraBuffer, writing straight into a float32
+# grain for AddGrainsToAudio. Full spectra keep only the real part of their
+# inverse, which is taken in the same pass as applying 'window', the
+# optional synthesis window.
+class SpectraBufferOldestToRealGrains:
+    __slots__ = [
+        "spectra_buffer", "grain_len", "half_spectrum", "window",
+        "fft_backend",
+        "intermediate", "out"
+    ]
+
+    def __init__(
+        self, spectra_buffer, *,
+        grain_len=None, half_spectrum=False, window=None, fft_backend=None,
+        intermediate=None,  # numpy.complex64, unused if 'half_spectrum'
+        out=None
+    ):
+        self.spectra_buffer \
+            = sanitise_spectra_buffer(spectra_buffer, name="spectra_buffer")
+        self.half_spectrum = san("half_spectrum")
+        self.grain_len = sanitise_grain_len_for_spectrum_len(
+            grain_len, self.spectra_buffer.newest.shape[-1],
+            half_spectrum=self.half_spectrum
+        )
+        self.window = self._sanitise_window(window)
+        self.fft_backend = sanitise_fft_backend(fft_backend)
+        self.intermediate, self.out \
+            = self._sanitise_intermediate_and_out(intermediate, out)
+
+    def __iter__(self):
+        ifft = self.fft_backend.get_plan(
+            "irfft" if self.half_spectrum else "ifft",
+            grain_len=self.grain_len,
+            batch=_get_batch(self.spectra_buffer.newest)
+        )
+
+        if self.spectra_buffer.num_of_items == 1:
+            def get_iterator(
+                transform=self._get_transform(ifft),
+                spectrum=self.spectra_buffer.oldest
+            ):
+                while True:
+                    transform(spectrum)
+
+                    yield
+        else:
+            def get_iterator(
+                transform=self._get_transform(ifft),
+                spectra_buffer=self.spectra_buffer
+            ):
+                while True:
+                    transform(spectra_buffer.oldest)
+
+                    yield
+
+        return get_iterator()
+
+    def _get_transform(self, ifft):
+        if self.half_spectrum:
+            if self.window is None:
+                def transform(spectrum, irfft=ifft, out=self.out):
+                    irfft(spectrum, out)
+            else:
+                def transform(
+                    spectrum,
+                    irfft=ifft, multiply=np.multiply,
+                    window=self.window, out=self.out
+                ):
+                    irfft(spectrum, out)
+                    multiply(out, window, out=out)
+        else:
+            if self.window is None:
+                def transform(
+                    spectrum,
+                    ifft=ifft, copyto=np.copyto,
+                    intermediate=self.intermediate, out=self.out
+                ):
+                    ifft(spectrum, intermediate)
+                    copyto(out, intermediate.real)
+            else:
+                def transform(
+                    spectrum,
+                    ifft=ifft, multiply=np.multiply,
+                    window=self.window,
+                    intermediate=self.intermediate, out=self.out
+                ):
+                    ifft(spectrum, intermediate)
+                    multiply(intermediate.real, window, out=out)
+
+        return transform
+
+    def _sanitise_window(self, window):
+        if window is None:
+            return None
+
+        window = san("window")
+
+        if window.shape != (self.grain_len,):
+            raise ValueError("if provided, 'window' should be of 'grain_len'")
+
+        return window
+
+    def _sanitise_intermediate_and_out(self, intermediate, out):
+        shape = *self.spectra_buffer.newest.shape[:-1], self.grain_len
+
+        if self.half_spectrum:
+            if intermediate is not None:
+                raise TypeError(
+                    "'intermediate' should not be provided if "
+                    "'half_spectrum' is True"
+                )
+
+            out, = sanitise_unique_arrays_of_shape(
+                array_infos=[(out, "out", "float")],
+                reference_shape=shape,
+                reference_name="the grains of 'spectra_buffer'"
+            )
+
+            return None, out
+        else:
+            return sanitise_unique_arrays_of_shape(
+                array_infos=[
+                    (intermediate, "intermediate", "complex"),
+                    (out, "out", "float")
+                ],
+                reference_shape=shape,
+                reference_name="the grains of 'spectra_buffer'"
+            )
+
+
+class SpectraBlocksToGrainBlocks:
+    __slots__ = [
+        "spectra_block", "grain_len", "half_spectrum", "fft_backend",
+        "intermediate", "out"
+    ]
+
+    def __init__(
+        self, spectra_block, *,
+        grain_len=None, half_spectrum=False, fft_backend=None,
+        intermediate=None,  # numpy.complex64, unused if 'half_spectrum'
+        out=None
+    ):
+        self.spectra_block = san("spectra_block")
+        self.half_spectrum = san("half_spectrum")
+        self.grain_len = sanitise_grain_len_for_spectrum_len(
+            grain_len, self.spectra_block.shape[-1],
+            half_spectrum=self.half_spectrum
+        )
+        self.fft_backend = sanitise_fft_backend(fft_backend)
+        self.intermediate, self.out \
+            = self._sanitise_intermediate_and_out(intermediate, out)
+
+    def __iter__(self):
+        ifft = self.fft_backend.get_plan(
+            "irfft" if self.half_spectrum else "ifft",
+            grain_len=self.grain_len, batch=self.spectra_block.shape[:-1]
+        )
+
+        if self.half_spectrum:
+            def get_iterator(
+                irfft=ifft, spectra_block=self.spectra_block, out=self.out
+            ):
+                while True:
+                    irfft(spectra_block, out)
+
+                    yield
+        else:
+            def get_iterator(
+                ifft=ifft, copyto=np.copyto,
+                spectra_block=self.spectra_block,
+                intermediate=self.intermediate, out=self.out
+            ):
+                while True:
+                    ifft(spectra_block, intermediate)
+                    copyto(out, intermediate.real)
+
+                    yield
+
+        return get_iterator()
+
+    def _sanitise_intermediate_and_out(self, intermediate, out):
+        grain_block_shape = *self.spectra_block.shape[:-1], self.grain_len
+
+        if self.half_spectrum:
+            if intermediate is not None:
+                raise TypeError(
+                    "'intermediate' should not be provided if "
+                    "'half_spectrum' is True"
+                )
+
+            out, = sanitise_unique_arrays_of_shape(
+                array_infos=[(out, "out", "float")],
+                reference_shape=grain_block_shape,
+                reference_name="(*spectra_block.shape[:-1], grain_len)"
+            )
+
+            return None, out
+        else:
+            return sanitise_unique_arrays_of_shape(
+                array_infos=[
+                    (intermediate, "intermediate", "complex"),
+                    (out, "out", "float")
+                ],
+                reference_shape=grain_block_shape,
+                reference_name="'spectra_block'"
+            )
@@ -6,4 +6,6 @@ from tests_ import all_tests
 
 sys.path.insert(0, Path(__file__).parent)
 
-all_tests()
+# spawned processes import this as their __main__
+if __name__ == "__main__":
+    all_tests()
@@ -1,23 +1,53 @@
 from .timestamp import test_timestamp
-from .buffer import test_buffer
+from .buffer import (
+    test_buffer, test_buffer_window, test_shared_buffer,
+    test_shared_buffer_across_processes
+)
 from .hone_in import test_hone_in
 from .divide import all_divide
-from .io import test_io
-from .audio_grains import test_audio_grains
-from .transforms import test_transforms
+from .io import test_io, test_io_mmap, test_io_cache
+from .audio_grains import (
+    test_audio_grains, test_multi_channel_audio_grains,
+    test_audio_grain_blocks, test_add_grain_blocks_to_audio,
+    test_hann_window_cache, test_audio_stream_to_grains,
+    test_add_grains_to_audio_stream_writer
+)
+from .transforms import (
+    test_transforms, test_block_transforms, test_half_spectrum_transforms,
+    test_real_grain_transforms, test_fft_backends
+)
+from .pad_lens import test_pad_lens
 from .eq_profiles import all_eq_profiles
+from .eq_bands import all_eq_bands
 from .audio_pair_to_eq_profile import all_audio_pair_to_eq_profile
 
 
 def all_tests():
     test_timestamp()
     test_buffer()
+    test_buffer_window()
+    test_shared_buffer()
+    test_shared_buffer_across_processes()
     test_hone_in()
     all_divide()
     test_io()
+    test_io_mmap()
+    test_io_cache()
     test_audio_grains()
+    test_multi_channel_audio_grains()
+    test_audio_grain_blocks()
+    test_add_grain_blocks_to_audio()
+    test_hann_window_cache()
+    test_audio_stream_to_grains()
+    test_add_grains_to_audio_stream_writer()
     test_transforms()
+    test_block_transforms()
+    test_half_spectrum_transforms()
+    test_real_grain_transforms()
+    test_fft_backends()
+    test_pad_lens()
     all_eq_profiles()
+    all_eq_bands()
     all_audio_pair_to_eq_profile()
 
     print("tests succeeded")
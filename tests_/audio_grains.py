@@ -1,13 +1,17 @@
+from pathlib import Path
+from fractions import Fraction
 import numpy as np
 
 import subtract_stem_lib as ssl
+from subtract_stem_lib.audio_grains import InnerGrainInfo
+from subtract_stem_lib.defaults import HANN_WINDOW_CACHE_SIZE
 
 
 def _test_audio_grains(
     *,
     audio_len=10_000,
     start_i=-3000, interval_len=111, num_of_iterations=150,
-    grain_len=999,
+    inner_grain_len=999,
     delay_audio_samples=0.0
 ):
     rng = np.random.default_rng(0)
@@ -19,7 +23,7 @@ def _test_audio_grains(
         start_i=start_i,
         interval_len=interval_len,
         num_of_iterations=num_of_iterations,
-        grain_len=grain_len,
+        inner_grain_len=inner_grain_len,
         delay_audio_samples=delay_audio_samples
     )
 
@@ -48,13 +52,384 @@ def test_audio_grains():
     for audio_len in 25, 10_000:
         for start_i in -3000, -2500:
             for interval_len, num_of_iterations in ((111, 150), (7, 2500)):
-                for grain_len in 777, 2331:
+                for inner_grain_len in 777, 2331:
                     for delay_audio_samples in 0.0, 3.7, -10.4:
                         _test_audio_grains(
                             audio_len=audio_len,
                             start_i=start_i,
                             interval_len=interval_len,
                             num_of_iterations=num_of_iterations,
-                            grain_len=grain_len,
+                            inner_grain_len=inner_grain_len,
                             delay_audio_samples=delay_audio_samples
                         )
+
+
+# Mix audio of shape (channels, samples) is split into grains and added back
+# with its channels kept apart, and a mono stem, EQ'd per channel, is
+# subtracted from it
+def test_multi_channel_audio_grains():
+    rng = np.random.default_rng(0)
+
+    stem_audio = rng.random(10_000, dtype=np.float32) * 2 - 1
+    gains = np.array([2.0, -0.5], dtype=np.float32)
+    mix_audio = gains[:, None] * stem_audio
+    mix_audio[1] += rng.random(10_000, dtype=np.float32) * 0.1
+
+    kwargs = {
+        "start_i": -3000, "interval_len": 111, "num_of_iterations": 150
+    }
+
+    mix_audio_to_hann_grains = ssl.AudioToHannGrains(
+        mix_audio, **kwargs, inner_grain_len=777
+    )
+    grain_len = mix_audio_to_hann_grains.out.shape[-1]
+
+    if mix_audio_to_hann_grains.out.shape != (2, grain_len):
+        raise Exception("test failed")
+
+    mix_grains_to_spectra_buffer = ssl.GrainsToSpectraBuffer(
+        mix_audio_to_hann_grains.out, half_spectrum=True
+    )
+    mix_spectra_buffer_oldest_to_real_grains \
+        = ssl.SpectraBufferOldestToRealGrains(
+              mix_grains_to_spectra_buffer.out,
+              grain_len=grain_len, half_spectrum=True
+          )
+    result_audio = mix_audio.copy()
+    add_mix_grains_to_audio = ssl.AddGrainsToAudio(
+        mix_spectra_buffer_oldest_to_real_grains.out,
+        **kwargs, subtract=True, audio=result_audio
+    )
+
+    for _ in zip(
+        mix_audio_to_hann_grains,
+        mix_grains_to_spectra_buffer,
+        mix_spectra_buffer_oldest_to_real_grains,
+        add_mix_grains_to_audio
+    ):
+        pass
+
+    if np.abs(result_audio).max() > 0.000_01:
+        raise Exception("test failed")
+
+    stem_audio_to_hann_grains = ssl.AudioToHannGrains(
+        stem_audio, **kwargs, inner_grain_len=777
+    )
+    stem_grains_to_spectra_buffer = ssl.GrainsToSpectraBuffer(
+        stem_audio_to_hann_grains.out, half_spectrum=True
+    )
+    eq_profile = np.empty(
+        (2, stem_grains_to_spectra_buffer.out.newest.shape[-1]),
+        dtype=np.complex64
+    )
+    eq_profile[...] = gains[:, None]
+    apply_eq_profiles_to_spectra_buffer_oldest \
+        = ssl.ApplyEqProfilesToSpectraBufferOldest(
+              eq_profile, stem_grains_to_spectra_buffer.out
+          )
+    stem_spectra_buffer_oldest_to_real_grains \
+        = ssl.SpectraBufferOldestToRealGrains(
+              apply_eq_profiles_to_spectra_buffer_oldest.out,
+              grain_len=grain_len, half_spectrum=True
+          )
+    result_audio = mix_audio.copy()
+    add_stem_grains_to_audio = ssl.AddGrainsToAudio(
+        stem_spectra_buffer_oldest_to_real_grains.out,
+        **kwargs, subtract=True, audio=result_audio
+    )
+
+    for _ in zip(
+        stem_audio_to_hann_grains,
+        stem_grains_to_spectra_buffer,
+        apply_eq_profiles_to_spectra_buffer_oldest,
+        stem_spectra_buffer_oldest_to_real_grains,
+        add_stem_grains_to_audio
+    ):
+        pass
+
+    # only the noise added to the second channel is left
+    if np.abs(result_audio[0]).max() > 0.000_01:
+        raise Exception("test failed")
+
+    if np.abs(
+        result_audio[1] - (mix_audio[1] - gains[1] * stem_audio)
+    ).max() > 0.000_01:
+        raise Exception("test failed")
+
+    # a mono grain is subtracted from every channel
+    result_audio = np.stack([stem_audio, stem_audio])
+    add_mono_grains_to_audio = ssl.AddGrainsToAudio(
+        stem_audio_to_hann_grains.out,
+        **kwargs, subtract=True, audio=result_audio
+    )
+
+    for _ in zip(stem_audio_to_hann_grains, add_mono_grains_to_audio):
+        pass
+
+    if np.abs(result_audio).max() > 0.000_01:
+        raise Exception("test failed")
+
+
+def test_audio_grain_blocks():
+    rng = np.random.default_rng(0)
+
+    for channels_shape in (), (2,):
+        for audio_len in 25, 10_000:
+            for start_i in -3000, 5:
+                for num_of_grains_per_block in None, 7, 64:
+                    audio = rng.random(
+                        (*channels_shape, audio_len), dtype=np.float32
+                    )
+
+                    kwargs = {
+                        "start_i": start_i,
+                        "interval_len": 111,
+                        "num_of_iterations": 150,
+                        "inner_grain_len": 777,
+                        "pad_len": 4,
+                        "delay_audio_samples": 3.7
+                    }
+
+                    audio_to_hann_grains = ssl.AudioToHannGrains(
+                        audio, **kwargs
+                    )
+                    grains = np.array([
+                        audio_to_hann_grains.out.copy()
+                        for _ in audio_to_hann_grains
+                    ])
+
+                    audio_to_hann_grain_blocks = ssl.AudioToHannGrainBlocks(
+                        audio,
+                        **kwargs,
+                        num_of_grains_per_block=num_of_grains_per_block
+                    )
+                    grain_blocks = np.concatenate([
+                        audio_to_hann_grain_blocks.out.copy()
+                        for _ in audio_to_hann_grain_blocks
+                    ])
+
+                    if (grain_blocks[:150] != grains).any():
+                        raise Exception("test failed")
+
+                    if (grain_blocks[150:] != 0).any():
+                        raise Exception("test failed")
+
+
+def test_add_grain_blocks_to_audio():
+    rng = np.random.default_rng(0)
+
+    for channels_shape in (), (2,):
+        for audio_len in 25, 10_000:
+            for start_i in -3000, 5:
+                for grain_len in 777, 800:
+                    for num_of_grains_per_block in 7, 150:
+                        grains = rng.random(
+                            (150, *channels_shape, grain_len),
+                            dtype=np.float32
+                        )
+                        audio = rng.random(
+                            (*channels_shape, audio_len), dtype=np.float32
+                        )
+                        block_audio = audio.copy()
+
+                        kwargs = {
+                            "start_i": start_i,
+                            "interval_len": 111,
+                            "num_of_iterations": 150,
+                            "subtract": True
+                        }
+
+                        grain = np.empty(grains.shape[1:], dtype=np.float32)
+                        add_grains_to_audio_iter = iter(
+                            ssl.AddGrainsToAudio(grain, **kwargs, audio=audio)
+                        )
+
+                        for grain[...] in grains:
+                            next(add_grains_to_audio_iter)
+
+                        grain_block = np.empty(
+                            (num_of_grains_per_block, *grains.shape[1:]),
+                            dtype=np.float32
+                        )
+                        add_grain_blocks_to_audio_iter = iter(
+                            ssl.AddGrainBlocksToAudio(
+                                grain_block, **kwargs, audio=block_audio
+                            )
+                        )
+
+                        for block_start in range(
+                            0, 150, num_of_grains_per_block
+                        ):
+                            grain_rows = grains[
+                                block_start
+                                :block_start + num_of_grains_per_block
+                            ]
+                            grain_block[:len(grain_rows)] = grain_rows
+                            next(add_grain_blocks_to_audio_iter)
+
+                        if np.abs(audio - block_audio).max() > 0.000_1:
+                            raise Exception("test failed")
+
+
+def test_hann_window_cache():
+    ssl.clear_hann_window_cache()
+    inner_grain_info = InnerGrainInfo(inner_grain_len=1350, overlap=2)
+
+    window_a = inner_grain_info.get_hann_window(pad_len=100)
+    window_b = inner_grain_info.get_hann_window(pad_len=100)
+    window_c = inner_grain_info.get_hann_window(
+        pad_len=100, delay_audio_samples=Fraction(1, 3)
+    )
+
+    if window_a is not window_b or window_a is window_c:
+        raise Exception("test failed")
+
+    if window_a.flags.writeable:
+        raise Exception("test failed")
+
+    info = ssl.get_hann_window_cache_info()
+    if (info["hits"], info["misses"], info["size"]) != (1, 2, 2):
+        raise Exception("test failed")
+
+    ssl.set_hann_window_cache_size(1)
+    if ssl.get_hann_window_cache_info()["size"] != 1:
+        raise Exception("test failed")
+
+    ssl.set_hann_window_cache_size(0)
+    window_d = inner_grain_info.get_hann_window(pad_len=100)
+    if window_d is window_a or not np.array_equal(window_d, window_a):
+        raise Exception("test failed")
+
+    ssl.set_hann_window_cache_size(HANN_WINDOW_CACHE_SIZE)
+    ssl.clear_hann_window_cache()
+
+
+def test_audio_stream_to_grains():
+    rng = np.random.default_rng(0)
+
+    tmp_test_path = Path("_tmp_test_path.wav")
+
+    try:
+        for channels_shape in (), (2,):
+            audio = rng.random((*channels_shape, 10_000), dtype=np.float32)
+
+            with ssl.AudioStreamWriter(
+                tmp_test_path,
+                sample_rate=48_000,
+                channels=2 if channels_shape else 1
+            ) as audio_stream_writer:
+                audio_stream_writer.write(audio)
+
+            if channels_shape:
+                try:
+                    ssl.AudioStream(tmp_test_path)
+                except ValueError:
+                    pass
+                else:
+                    raise Exception("test failed")
+
+            with ssl.AudioStream(
+                tmp_test_path, error_if_not_mono=False
+            ) as audio_stream:
+                if audio_stream.shape != audio.shape:
+                    raise Exception("test failed")
+
+                for start_i in -3000, -100, 0, 5, 9000:
+                    for num_of_iterations in 1, 30, 200:
+                        for pad_len in 0, 50:
+                            kwargs = {
+                                "start_i": start_i,
+                                "num_of_iterations": num_of_iterations,
+                                "inner_grain_len": 700, "overlap": 2,
+                                "pad_len": pad_len
+                            }
+
+                            audio_to_hann_grains = ssl.AudioToHannGrains(
+                                audio, **kwargs
+                            )
+                            stream_to_hann_grains = ssl.AudioToHannGrains(
+                                audio_stream, **kwargs
+                            )
+
+                            iter_a = iter(audio_to_hann_grains)
+                            iter_b = iter(stream_to_hann_grains)
+
+                            for _ in range(num_of_iterations):
+                                next(iter_a)
+                                next(iter_b)
+
+                                if not np.array_equal(
+                                    audio_to_hann_grains.out,
+                                    stream_to_hann_grains.out
+                                ):
+                                    raise Exception("test failed")
+    finally:
+        try:
+            tmp_test_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def test_add_grains_to_audio_stream_writer():
+    rng = np.random.default_rng(0)
+
+    tmp_test_path = Path("_tmp_test_path.wav")
+
+    try:
+        for channels_shape in (), (2,):
+            audio = rng.random((*channels_shape, 2000), dtype=np.float32)
+            grains = rng.random(
+                (60, *channels_shape, 150), dtype=np.float32
+            )
+
+            for start_i, interval_len in (-500, 40), (30, 200), (1900, 1):
+                for subtract in False, True:
+                    grain = np.empty(grains.shape[1:], dtype=np.float32)
+                    expected_audio = audio.copy()
+
+                    add_grains_to_audio = ssl.AddGrainsToAudio(
+                        grain,
+                        start_i=start_i, interval_len=interval_len,
+                        num_of_iterations=len(grains),
+                        subtract=subtract,
+                        audio=expected_audio
+                    )
+
+                    with ssl.AudioStreamWriter(
+                        tmp_test_path,
+                        sample_rate=48_000,
+                        channels=2 if channels_shape else 1
+                    ) as audio_stream_writer:
+                        add_grains_to_audio_stream_writer \
+                            = ssl.AddGrainsToAudioStreamWriter(
+                                  grain,
+                                  start_i=start_i, interval_len=interval_len,
+                                  num_of_iterations=len(grains),
+                                  subtract=subtract,
+                                  audio=audio,
+                                  audio_stream_writer=audio_stream_writer
+                              )
+
+                        iter_a = iter(add_grains_to_audio)
+                        iter_b = iter(add_grains_to_audio_stream_writer)
+
+                        for grain[...] in grains:
+                            next(iter_a)
+                            next(iter_b)
+
+                    result_audio, _ = ssl.load_audio(
+                        tmp_test_path, error_if_not_mono=False
+                    )
+
+                    if result_audio.shape != expected_audio.shape:
+                        raise Exception("test failed")
+
+                    # the grains are summed before 'audio' is added, so
+                    # rounding differs slightly
+                    if abs(result_audio - expected_audio).max() > 0.000_1:
+                        raise Exception("test failed")
+    finally:
+        try:
+            tmp_test_path.unlink()
+        except FileNotFoundError:
+            pass
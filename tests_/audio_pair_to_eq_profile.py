@@ -45,7 +45,7 @@ def test_freq_and_noise():
     audio_pair_to_eq_profile = ssl.AudioPairToEqProfile(
         stem_audio, mix_audio,
         start_i=100, interval_len=10, num_of_iterations=900,
-        grain_len=20,
+        inner_grain_len=20,
         delay_stem_samples=-3
     )
 
@@ -80,7 +80,7 @@ def test_random():
     audio_pair_to_eq_profile = ssl.AudioPairToEqProfile(
         stem_audio, mix_audio,
         start_i=100, interval_len=10, num_of_iterations=900,
-        grain_len=20,
+        inner_grain_len=20,
         delay_stem_samples=-3
     )
 
@@ -113,7 +113,7 @@ def test_fractional_delay():
         audio_pair_to_eq_profile = ssl.AudioPairToEqProfile(
             stem_audio, mix_audio,
             start_i=333, interval_len=111, num_of_iterations=28,
-            grain_len=333,
+            inner_grain_len=333,
             delay_stem_samples=delay_stem_samples
         )
 
@@ -129,7 +129,163 @@ def test_fractional_delay():
             raise Exception("test failed")
 
 
+def test_phase_ramp_fractional_delay():
+    rng = np.random.default_rng(0)
+
+    stem_block = rng.random(333, dtype=np.float32)
+    mix_block = _delay_block(stem_block, 3.5)
+
+    stem_audio = np.empty(9990, dtype=np.float32)
+    mix_audio = np.empty(9990, dtype=np.float32)
+    for i in range(0, 9990, 333):
+        stem_audio[i:i+333] = stem_block
+        mix_audio[i:i+333] = mix_block
+
+    means = []
+
+    for i in range(11):
+        delay_stem_samples = 3 + i/10
+
+        audio_pair_to_eq_profile = ssl.AudioPairToEqProfile(
+            stem_audio, mix_audio,
+            start_i=333, interval_len=111, num_of_iterations=28,
+            inner_grain_len=333,
+            delay_stem_samples=delay_stem_samples,
+            fractional_delay_mode="phase_ramp"
+        )
+
+        for _ in audio_pair_to_eq_profile:
+            pass
+
+        result = audio_pair_to_eq_profile.calculate_eq_profile()
+
+        # the phase is corrected too, so the EQ profile should be close to 1
+        means.append(abs(1 - result).mean())
+
+    for mean in means:
+        if means[5] > mean:
+            raise Exception("test failed")
+
+    if means[5] > 0.01:
+        raise Exception("test failed")
+
+
+def test_half_spectrum():
+    rng = np.random.default_rng(0)
+
+    stem_audio = rng.random(10000, dtype=np.float32) * 2 - 1
+    mix_audio = np.zeros(10000, dtype=np.float32)
+    mix_audio[3:] = stem_audio[:-3] * 5
+
+    results = []
+
+    for half_spectrum in False, True:
+        audio_pair_to_eq_profile = ssl.AudioPairToEqProfile(
+            stem_audio, mix_audio,
+            start_i=100, interval_len=10, num_of_iterations=900,
+            inner_grain_len=20,
+            half_spectrum=half_spectrum,
+            delay_stem_samples=3
+        )
+
+        for _ in audio_pair_to_eq_profile:
+            pass
+
+        results.append(audio_pair_to_eq_profile.calculate_eq_profile())
+
+    full_result, half_result = results
+
+    if half_result.shape != (11,):
+        raise Exception("test failed")
+
+    if abs(full_result[:11] - half_result).max() > 0.001:
+        raise Exception("test failed")
+
+
+def test_multi_channel():
+    rng = np.random.default_rng(0)
+
+    stem_audio = rng.random(10000, dtype=np.float32) * 2 - 1
+    mix_audio = np.zeros((2, 10000), dtype=np.float32)
+    mix_audio[0, 3:] = stem_audio[:-3] * 5
+    mix_audio[1, 3:] = stem_audio[:-3] * -2
+    mix_audio[1] += rng.random(10000, dtype=np.float32) * 0.1
+
+    def get_result(mix_audio):
+        audio_pair_to_eq_profile = ssl.AudioPairToEqProfile(
+            stem_audio, mix_audio,
+            start_i=100, interval_len=10, num_of_iterations=900,
+            inner_grain_len=20,
+            half_spectrum=True,
+            delay_stem_samples=3
+        )
+
+        for _ in audio_pair_to_eq_profile:
+            pass
+
+        return audio_pair_to_eq_profile.calculate_eq_profile()
+
+    multi_channel_result = get_result(mix_audio)
+
+    if multi_channel_result.shape != (2, 11):
+        raise Exception("test failed")
+
+    for channel_result, channel_mix_audio in zip(
+        multi_channel_result, mix_audio
+    ):
+        if abs(channel_result - get_result(channel_mix_audio)).max() > 0.001:
+            raise Exception("test failed")
+
+
+# padded grains over many iterations, as the padding has to stay zeroed
+def test_padded_grains():
+    rng = np.random.default_rng(0)
+
+    stem_audio = rng.random(48000, dtype=np.float32) * 2 - 1
+    mix_audio = rng.random(48000, dtype=np.float32) * 0.2 - 0.1
+    mix_audio[7:] += stem_audio[:-7] * 5
+
+    for pad_kwargs in (
+        {"left_pad_len": 5, "right_pad_len": 5},
+        {"pad_len": "auto", "half_spectrum": True}
+    ):
+        audio_pair_to_eq_profile = ssl.AudioPairToEqProfile(
+            stem_audio, mix_audio,
+            start_i=0, interval_len=451, num_of_iterations=100,
+            inner_grain_len=1353,
+            delay_stem_samples=7,
+            **pad_kwargs
+        )
+
+        for _ in audio_pair_to_eq_profile:
+            pass
+
+        result = audio_pair_to_eq_profile.calculate_eq_profile()
+
+        if abs(abs(result) - 5).max() > 0.1:
+            raise Exception("test failed")
+
+    for fractional_delay_mode in "window", "phase_ramp":
+        find_delay_stem_samples = ssl.FindDelayStemSamples(
+            stem_audio=stem_audio, mix_audio=mix_audio,
+            start_i=0, num_of_iterations_per_guess=100,
+            inner_grain_len=1353, interval_len=451,
+            pad_len="auto", half_spectrum=True,
+            fractional_delay_mode=fractional_delay_mode
+        )
+
+        for _ in find_delay_stem_samples:
+            pass
+
+        if abs(find_delay_stem_samples.results["winning"]["val"] - 7) > 1:
+            raise Exception("test failed")
+
+
 def all_audio_pair_to_eq_profile():
     test_freq_and_noise()
     test_random()
     test_fractional_delay()
+    test_phase_ramp_fractional_delay()
+    test_half_spectrum()
+    test_multi_channel()
+    test_padded_grains()
@@ -1,3 +1,5 @@
+import multiprocessing
+import pickle
 import numpy as np
 
 import subtract_stem_lib as ssl
@@ -16,3 +18,124 @@ def test_buffer():
 
         if (buffer.oldest[:] != 13).any():
             raise Exception("test failed")
+
+
+def test_buffer_window():
+    rng = np.random.default_rng(0)
+
+    for num_of_items in 1, 2, 5:
+        buffer = ssl.buffer_from_array_args(
+            (3, 4), dtype=np.float32, num_of_items=num_of_items,
+            mirrored=True
+        )
+        items = []
+
+        for num_of_new_items in 1, 3, 1, 7, 2, 1, 1:
+            new_items = rng.random((num_of_new_items, 3, 4), dtype=np.float32)
+
+            if num_of_new_items == 1:
+                buffer.increment_and_get_newest()[...] = new_items[0]
+            else:
+                buffer.push_many(new_items)
+
+            items.extend(new_items)
+
+            window = buffer.window()
+
+            if window.shape != (num_of_items, 3, 4):
+                raise Exception("test failed")
+
+            if not np.array_equal(
+                window[-len(items):], items[-num_of_items:]
+            ):
+                raise Exception("test failed")
+
+            if not np.array_equal(window[-1], buffer.newest):
+                raise Exception("test failed")
+
+            # before the buffer is full, its oldest items are uninitialised
+            if len(items) < num_of_items:
+                continue
+
+            if not np.array_equal(window[0], buffer.oldest):
+                raise Exception("test failed")
+
+            # as ApplyEqProfilesToSpectraBufferOldest does
+            buffer.oldest[...] = rng.random((3, 4), dtype=np.float32)
+            items[-num_of_items] = buffer.oldest.copy()
+
+            if not np.array_equal(buffer.window()[0], buffer.oldest):
+                raise Exception("test failed")
+
+
+def test_shared_buffer():
+    rng = np.random.default_rng(0)
+
+    with ssl.shared_buffer_from_array_args(
+        (2, 10), dtype=np.complex64, lookbehind=3
+    ) as buffer:
+        attached_buffer = ssl.attach_shared_buffer(buffer.name)
+        unpickled_buffer = pickle.loads(pickle.dumps(buffer))
+
+        for _ in range(6):
+            buffer.increment_and_get_newest()[...] = rng.random((2, 10))
+
+            for other_buffer in attached_buffer, unpickled_buffer:
+                if other_buffer.is_owner \
+                        or other_buffer.num_of_items != 4 \
+                        or not np.array_equal(
+                            other_buffer.newest, buffer.newest
+                        ) \
+                        or not np.array_equal(
+                            other_buffer.oldest, buffer.oldest
+                        ):
+                    raise Exception("test failed")
+
+        attached_buffer.close()
+        unpickled_buffer.close()
+
+
+# run in a spawned process, which gets 'buffer' by pickling, so by name
+def _check_and_write_shared_buffer(buffer, expected_newest, new_newest):
+    if buffer.is_owner \
+            or not np.array_equal(buffer.newest, expected_newest):
+        buffer.close()
+        raise Exception("test failed")
+
+    buffer.increment_and_get_newest()[...] = new_newest
+    buffer.close()
+
+
+def test_shared_buffer_across_processes():
+    rng = np.random.default_rng(0)
+    spawn_context = multiprocessing.get_context("spawn")
+
+    with ssl.shared_buffer_from_array_args(
+        (2, 10), dtype=np.complex64, lookbehind=3
+    ) as buffer:
+        name = buffer.name
+
+        for _ in range(6):
+            expected_newest = rng.random((2, 10)).astype(np.complex64)
+            new_newest = rng.random((2, 10)).astype(np.complex64)
+            buffer.increment_and_get_newest()[...] = expected_newest
+
+            process = spawn_context.Process(
+                target=_check_and_write_shared_buffer,
+                args=(buffer, expected_newest, new_newest)
+            )
+            process.start()
+            process.join()
+
+            if process.exitcode != 0:
+                raise Exception("test failed")
+
+            if not np.array_equal(buffer.newest, new_newest):
+                raise Exception("test failed")
+
+    try:
+        ssl.attach_shared_buffer(name)
+    except FileNotFoundError:
+        pass
+    else:
+        raise Exception("test failed")
@@ -22,25 +22,173 @@ def safe_divide():
         raise Exception("test failed")
 
 
+def safe_divide_engines():
+    rng = np.random.default_rng(0)
+
+    for shape in (100,), (3, 100):
+        a = rng.random((*shape, 2), dtype=np.float32).view(np.complex64)[
+            ..., 0
+        ]
+        b = rng.random(100, dtype=np.float32)
+        b[::9] = 0
+
+        expected = ssl.safe_divide(
+            a, b, max_abs_result=10.0, engine="chained"
+        )
+        num_of_unsafe = (np.abs(a / b) > 10.0).sum()
+
+        for engine in "chained", "auto", "numba", "numexpr", "numpy":
+            # only the engines of optional dependencies are skipped
+            try:
+                safe_divider = ssl.SafeDivider(
+                    a, b, max_abs_result=10.0, engine=engine
+                )
+            except ImportError:
+                if engine not in ("numba", "numexpr"):
+                    raise
+
+                print(
+                    f"skipped the {engine!r} safe_divide engine, as {engine} "
+                    "isn't installed"
+                )
+
+                continue
+
+            next(iter(safe_divider))
+
+            if safe_divider.num_of_unsafe \
+                    != (None if engine == "chained" else num_of_unsafe):
+                raise Exception("test failed")
+
+            if np.abs(safe_divider.out - expected).max() > 0.000_001:
+                raise Exception("test failed")
+
+            # as in spectra_to_eq_profiles(), 'b' may be in 'intermediate_a'
+            intermediate_a = np.empty(shape, dtype=np.float32)
+            aliased_b = intermediate_a.reshape(-1)[:100]
+            aliased_b[...] = b
+
+            next(iter(ssl.SafeDivider(
+                a, aliased_b,
+                max_abs_result=10.0, engine=engine,
+                intermediate_a=intermediate_a, out=safe_divider.out
+            )))
+
+            if np.abs(safe_divider.out - expected).max() > 0.000_001:
+                raise Exception("test failed")
+
+
+def batch():
+    rng = np.random.default_rng(0)
+
+    a = rng.random((20, 100, 2), dtype=np.float32).view(np.complex64)[
+        ..., 0
+    ]
+    b = rng.random((20, 100), dtype=np.float32)
+    b[:, ::9] = 0
+    b[3] = 0
+
+    # the slices along 'axis' are indexed along the other axis
+    for axis, other_axis in (-1, 0), (0, 1):
+        result = ssl.safe_divide_batch(a, b, axis=axis, max_abs_result=10.0)
+
+        for i in range(a.shape[other_axis]):
+            expected = ssl.safe_divide(
+                np.take(a, i, axis=other_axis).copy(),
+                np.take(b, i, axis=other_axis).copy(),
+                max_abs_result=10.0
+            )
+
+            if not np.array_equal(
+                np.take(result, i, axis=other_axis), expected
+            ):
+                raise Exception("test failed")
+
+    b = b.astype(np.complex64)
+    abs_a, rotated_b = ssl.ataabtrnfatbaa_batch(a, b)
+
+    for a_row, b_row, abs_a_row, rotated_b_row in zip(
+        a, b, abs_a, rotated_b
+    ):
+        expected_abs_a, expected_rotated_b \
+            = ssl.ataabtrnfatbaa(a_row.copy(), b_row)
+
+        if not np.array_equal(abs_a_row, expected_abs_a) \
+                or not np.array_equal(rotated_b_row, expected_rotated_b):
+            raise Exception("test failed")
+
+
 def ataabtrnfatbaa():
     rng = np.random.default_rng(0)
 
     a = rng.random(200, dtype=np.float32).view(np.complex64)
     b = rng.random(200, dtype=np.float32).view(np.complex64)
 
-    abs_a, rotated_b = ssl.ataabtrnfatbaa(a, b)
+    for rotation_mode in "fused", "power":
+        abs_a, rotated_b = ssl.ataabtrnfatbaa(
+            a, b, rotation_mode=rotation_mode
+        )
 
-    if (np.abs(a) != abs_a).any():
-        raise Exception("test failed")
+        if (np.abs(a) != abs_a).any():
+            raise Exception("test failed")
+
+        for a_factor, b_factor in zip(a / abs_a, b / rotated_b):
+            if not 0.999_999 < abs(a_factor) < 1.000_001:
+                raise Exception("test failed")
+
+            if abs(b_factor - a_factor) > 0.000_001:
+                raise Exception("test failed")
+
+        # 'b' isn't rotated where 'a' is 0
+        zero_a = np.zeros(3, dtype=np.complex64)
+        abs_a, rotated_b = ssl.ataabtrnfatbaa(
+            zero_a, b[:3], rotation_mode=rotation_mode
+        )
+
+        if (abs_a != 0).any() or (rotated_b != b[:3]).any():
+            raise Exception("test failed")
 
-    for a_factor, b_factor in zip(a / abs_a, b / rotated_b):
-        if not 0.999_999 < abs(a_factor) < 1.000_001:
+
+def interpolate_missing():
+    rng = np.random.default_rng(0)
+
+    a = np.array([9, 1, 9, 9, 4, 5, 9, 9], dtype=np.complex64)
+    is_safe = np.array([0, 1, 0, 0, 1, 1, 0, 0], dtype=bool)
+    expected = np.array([1, 1, 2, 3, 4, 5, 5, 5], dtype=np.complex64)
+
+    for vectorised in False, True:
+        out = ssl.InterpolateMissing(
+            a, is_safe=is_safe, vectorised=vectorised
+        )
+        next(iter(out))
+
+        if not np.array_equal(out.out, expected):
             raise Exception("test failed")
 
-        if abs(b_factor - a_factor) > 0.000_001:
+    for shape in (300,), (5, 300):
+        a = rng.random((*shape, 2), dtype=np.float32).view(np.complex64)[
+            ..., 0
+        ]
+        is_safe = rng.random(shape) < 0.3
+        is_safe[0] = False
+
+        results = []
+
+        for vectorised in False, True:
+            interpolate_missing = ssl.InterpolateMissing(
+                a, is_safe=is_safe, vectorised=vectorised
+            )
+            next(iter(interpolate_missing))
+
+            results.append(interpolate_missing.out)
+
+        if not np.array_equal(*results):
             raise Exception("test failed")
 
 
 def all_divide():
     safe_divide()
+    safe_divide_engines()
     ataabtrnfatbaa()
+    interpolate_missing()
+    batch()
@@ -0,0 +1,155 @@
+import numpy as np
+
+import subtract_stem_lib as ssl
+from .eq_profiles import _test_is_small
+
+
+# smooth in magnitude, with the phase of a delay of 2 samples
+def _get_smooth_eq_profile(grain_len, *, half_spectrum):
+    if half_spectrum:
+        freqs = np.fft.rfftfreq(grain_len)
+    else:
+        freqs = np.fft.fftfreq(grain_len)
+
+    return (
+        (1.5 + np.cos(np.abs(freqs) * 6)) * np.exp(freqs * -4j * np.pi)
+    ).astype(np.complex64)
+
+
+def test_project_and_expand():
+    for spacing in "linear", "octave", "erb":
+        for representation in "complex", "magnitude_and_phase":
+            for half_spectrum in True, False:
+                eq_bands = ssl.EqBands(
+                    1350,
+                    spacing=spacing,
+                    representation=representation,
+                    half_spectrum=half_spectrum,
+                    sample_rate=48000
+                )
+                eq_profile = _get_smooth_eq_profile(
+                    1350, half_spectrum=half_spectrum
+                )
+                eq_profiles = np.stack([eq_profile, eq_profile / 2])
+
+                coefficients = eq_bands.project(eq_profiles)
+
+                if eq_profiles.nbytes < coefficients.nbytes * 10:
+                    raise Exception("test failed")
+
+                _test_is_small(
+                    eq_bands.expand(coefficients) - eq_profiles, max_abs=0.05
+                )
+
+
+def test_offline_bands():
+    rng = np.random.default_rng(0)
+
+    eq_profile = _get_smooth_eq_profile(1350, half_spectrum=True)
+    eq_profiles = np.stack([eq_profile, eq_profile / 2])
+
+    stem_spectra = rng.standard_normal(
+        (40, 676, 2), dtype=np.float32
+    ).view(np.complex64)[..., 0]
+    mix_spectra = stem_spectra[:, None] * eq_profiles
+
+    eq_bands = ssl.EqBands(
+        1350, spacing="erb", half_spectrum=True, sample_rate=48000
+    )
+
+    # the ratios of the pooled moving sums, 9 frames at a time
+    expected = np.empty((32, 2, eq_bands.num_of_bands), dtype=np.complex64)
+    pooled_abs_stem_spectra \
+        = np.empty((40, eq_bands.num_of_bands), dtype=np.float32)
+    pooled_rotated_mix_spectra \
+        = np.empty((40, eq_bands.num_of_bands), dtype=np.complex64)
+
+    for channel_i in range(2):
+        abs_stem_spectra, rotated_mix_spectra = ssl.ataabtrnfatbaa_batch(
+            stem_spectra, mix_spectra[:, channel_i].copy()
+        )
+        eq_bands.pool(abs_stem_spectra, out=pooled_abs_stem_spectra)
+        eq_bands.pool(rotated_mix_spectra, out=pooled_rotated_mix_spectra)
+
+        for i in range(32):
+            expected[i, channel_i] \
+                = pooled_rotated_mix_spectra[i:i + 9].sum(axis=0) \
+                / pooled_abs_stem_spectra[i:i + 9].sum(axis=0)
+
+    for representation in "complex", "magnitude_and_phase":
+        eq_bands = ssl.EqBands(
+            1350,
+            spacing="erb",
+            representation=representation,
+            half_spectrum=True,
+            sample_rate=48000
+        )
+
+        result = ssl.spectra_to_eq_profiles(
+            stem_spectra, mix_spectra,
+            lookbehind=4, lookahead=4, block_len=16, eq_bands=eq_bands
+        )
+
+        if representation == "complex":
+            _test_is_small(result - expected, max_abs=0.000_01)
+        else:
+            _test_is_small(
+                result[:, :, 0] * np.exp(1j * result[:, :, 1]) - expected,
+                max_abs=0.000_01
+            )
+
+        # pooling near the edges is of bins on one side only, so it's only
+        # roughly the profile there
+        _test_is_small(eq_bands.expand(result) - eq_profiles, max_abs=0.2)
+
+
+def test_apply_bands():
+    rng = np.random.default_rng(0)
+
+    for representation in "complex", "magnitude_and_phase":
+        eq_bands = ssl.EqBands(
+            200, num_of_bands=12, representation=representation,
+            half_spectrum=False
+        )
+        coefficients = eq_bands.project(
+            rng.random((2, 200, 2), dtype=np.float32).view(np.complex64)[
+                ..., 0
+            ]
+        )
+        spectrum = rng.random(400, dtype=np.float32).view(np.complex64)
+
+        apply_eq_profiles_to_spectra_buffer_oldest \
+            = ssl.ApplyEqProfilesToSpectraBufferOldest(
+                  coefficients, spectrum, eq_bands=eq_bands
+              )
+        apply_eq_profiles_to_spectra_buffer_oldest_iter \
+            = iter(apply_eq_profiles_to_spectra_buffer_oldest)
+
+        # updated in place, like a running profile
+        for _ in range(2):
+            coefficients *= 2
+            next(apply_eq_profiles_to_spectra_buffer_oldest_iter)
+
+            _test_is_small(
+                apply_eq_profiles_to_spectra_buffer_oldest.out.oldest
+                - eq_bands.expand(coefficients) * spectrum
+            )
+
+
+def test_too_many_bands():
+    for half_spectrum in True, False:
+        try:
+            ssl.EqBands(64, num_of_bands=33, half_spectrum=half_spectrum)
+        except ValueError:
+            pass
+        else:
+            raise Exception("test failed")
+
+    ssl.EqBands(64, num_of_bands=32)
+
+
+def all_eq_bands():
+    test_project_and_expand()
+    test_offline_bands()
+    test_apply_bands()
+    test_too_many_bands()
@@ -3,8 +3,8 @@ import numpy as np
 import subtract_stem_lib as ssl
 
 
-def _test_is_small(arr):
-    if abs(arr).max() > 0.000_001:
+def _test_is_small(arr, *, max_abs=0.000_001):
+    if abs(arr).max() > max_abs:
         raise Exception("test failed")
 
 
@@ -73,6 +73,164 @@ def test_running():
     _test_is_small(spectra_buffers_to_eq_profiles.out - eq_profile_b)
 
 
+# a loud stretch shouldn't leave round-off in the profiles of a quiet one
+def test_running_after_loud():
+    rng = np.random.default_rng(0)
+
+    eq_profile = rng.random(200, dtype=np.float32).view(np.complex64)
+    stem_spectra = rng.random((40, 200), dtype=np.float32).view(np.complex64)
+    stem_spectra[:20] *= 10_000
+    mix_spectra = stem_spectra * eq_profile
+
+    stem_spectrum = np.empty(100, dtype=np.complex64)
+    mix_spectrum = np.empty(100, dtype=np.complex64)
+
+    spectra_buffers_to_eq_profiles = ssl.SpectraBuffersToEqProfiles(
+        stem_spectrum, mix_spectrum, lookbehind=4
+    )
+    spectra_buffers_to_eq_profiles_iter = iter(spectra_buffers_to_eq_profiles)
+
+    for i in range(len(stem_spectra)):
+        stem_spectrum[:] = stem_spectra[i]
+        mix_spectrum[:] = mix_spectra[i]
+        next(spectra_buffers_to_eq_profiles_iter)
+
+        # from when the last loud spectrum has left the window
+        if i >= 24:
+            _test_is_small(spectra_buffers_to_eq_profiles.out - eq_profile)
+
+
+def test_centred():
+    rng = np.random.default_rng(0)
+
+    stem_spectra_buffer, mix_spectra_buffer = (
+        ssl.buffer_from_array_args((100,), dtype=np.complex64, lookbehind=3)
+        for _ in range(2)
+    )
+
+    spectra_buffers_to_eq_profiles = ssl.SpectraBuffersToEqProfiles(
+        stem_spectra_buffer, mix_spectra_buffer, lookbehind=2, lookahead=3
+    )
+    apply_eq_profiles_to_spectra_buffer_oldest \
+        = ssl.ApplyEqProfilesToSpectraBufferOldest(
+              spectra_buffers_to_eq_profiles.out, stem_spectra_buffer
+          )
+
+    spectra_buffers_to_eq_profiles_iter = iter(spectra_buffers_to_eq_profiles)
+    apply_eq_profiles_to_spectra_buffer_oldest_iter \
+        = iter(apply_eq_profiles_to_spectra_buffer_oldest)
+
+    eq_profile_a = rng.random(200, dtype=np.float32).view(np.complex64)
+    eq_profile_b = rng.random(200, dtype=np.float32).view(np.complex64)
+
+    stem_spectra = rng.random((30, 200), dtype=np.float32).view(np.complex64)
+    mix_spectra = stem_spectra * eq_profile_a
+    mix_spectra[15:] = stem_spectra[15:] * eq_profile_b
+
+    for i in range(len(stem_spectra)):
+        stem_spectra_buffer.increment_and_get_newest()[:] = stem_spectra[i]
+        mix_spectra_buffer.increment_and_get_newest()[:] = mix_spectra[i]
+        next(spectra_buffers_to_eq_profiles_iter)
+
+        if i < 5:
+            continue
+
+        next(apply_eq_profiles_to_spectra_buffer_oldest_iter)
+
+        # the window of frames i - 5 to i is centred on i - 3, the oldest
+        if i in (14, 20):
+            _test_is_small(
+                apply_eq_profiles_to_spectra_buffer_oldest.out.oldest
+                - stem_spectra[i - 3]
+                * (eq_profile_a if i == 14 else eq_profile_b)
+            )
+
+    result = ssl.spectra_to_eq_profiles(
+        stem_spectra, mix_spectra, lookbehind=2, lookahead=3
+    )
+
+    _test_is_small(result[-1] - spectra_buffers_to_eq_profiles.out)
+
+
+def test_exponential():
+    rng = np.random.default_rng(0)
+
+    stem_spectrum = np.empty(100, dtype=np.complex64)
+    mix_spectrum = np.empty(100, dtype=np.complex64)
+
+    spectra_buffers_to_eq_profiles = ssl.SpectraBuffersToExponentialEqProfiles(
+        stem_spectrum, mix_spectrum, time_constant=2
+    )
+    spectra_buffers_to_eq_profiles_iter = iter(spectra_buffers_to_eq_profiles)
+
+    eq_profile_a = rng.random(200, dtype=np.float32).view(np.complex64)
+    eq_profile_b = rng.random(200, dtype=np.float32).view(np.complex64)
+
+    for eq_profile in eq_profile_a, eq_profile_b:
+        for _ in range(50):
+            rng.random(dtype=np.float32, out=stem_spectrum.view(np.float32))
+            np.multiply(stem_spectrum, eq_profile, out=mix_spectrum)
+            next(spectra_buffers_to_eq_profiles_iter)
+
+        _test_is_small(spectra_buffers_to_eq_profiles.out - eq_profile)
+
+    # long enough for the sums to decay to 0 without raising
+    stem_spectrum[:] = mix_spectrum[:] = 0
+
+    for _ in range(1000):
+        next(spectra_buffers_to_eq_profiles_iter)
+
+    rng.random(dtype=np.float32, out=stem_spectrum.view(np.float32))
+    np.multiply(stem_spectrum, eq_profile_a, out=mix_spectrum)
+    next(spectra_buffers_to_eq_profiles_iter)
+
+    _test_is_small(spectra_buffers_to_eq_profiles.out - eq_profile_a)
+
+
+def test_offline_running():
+    rng = np.random.default_rng(0)
+
+    for mix_shape, stem_shape, ret_reciprocal_eq in (
+        ((100,), (100,), False),
+        ((100,), (100,), True),
+        ((2, 100), (100,), False),
+        ((2, 100), (2, 100), True)
+    ):
+        stem_spectra = rng.random(
+            (30, *stem_shape, 2), dtype=np.float32
+        ).view(np.complex64)[..., 0]
+        mix_spectra = rng.random(
+            (30, *mix_shape, 2), dtype=np.float32
+        ).view(np.complex64)[..., 0]
+
+        stem_spectrum = np.empty(stem_shape, dtype=np.complex64)
+        mix_spectrum = np.empty(mix_shape, dtype=np.complex64)
+
+        spectra_buffers_to_eq_profiles = ssl.SpectraBuffersToEqProfiles(
+            stem_spectrum, mix_spectrum,
+            lookbehind=4, ret_reciprocal_eq=ret_reciprocal_eq
+        )
+        spectra_buffers_to_eq_profiles_iter \
+            = iter(spectra_buffers_to_eq_profiles)
+
+        expected = []
+
+        for i in range(len(mix_spectra)):
+            stem_spectrum[...] = stem_spectra[i]
+            mix_spectrum[...] = mix_spectra[i]
+            next(spectra_buffers_to_eq_profiles_iter)
+
+            if i >= 4:
+                expected.append(spectra_buffers_to_eq_profiles.out.copy())
+
+        result = ssl.spectra_to_eq_profiles(
+            stem_spectra, mix_spectra,
+            lookbehind=4, ret_reciprocal_eq=ret_reciprocal_eq, block_len=7
+        )
+
+        _test_is_small((result - expected) / abs(result).max())
+
+
 def test_apply():
     rng = np.random.default_rng(0)
 
@@ -93,4 +251,8 @@ def test_apply():
 def all_eq_profiles():
     test_single()
     test_running()
+    test_running_after_loud()
+    test_centred()
+    test_exponential()
+    test_offline_running()
     test_apply()
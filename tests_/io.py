@@ -1,4 +1,5 @@
 from pathlib import Path
+from tempfile import TemporaryDirectory
 import numpy as np
 
 import subtract_stem_lib as ssl
@@ -25,3 +26,90 @@ def test_io():
             tmp_test_path.unlink()
         except FileNotFoundError:
             pass
+
+
+def test_io_mmap():
+    rng = np.random.default_rng(0)
+
+    a = rng.random(10_000, dtype=np.float32)
+
+    for tmp_test_path in (
+        Path("_tmp_test_path.wav"), Path("_tmp_test_path.raw")
+    ):
+        try:
+            if tmp_test_path.suffix == ".raw":
+                a.tofile(tmp_test_path)
+            else:
+                ssl.save_audio(a, tmp_test_path, sample_rate=123_456)
+
+            b, sample_rate = ssl.load_audio(
+                tmp_test_path, sample_rate=123_456, mmap=True
+            )
+
+            if sample_rate != 123_456:
+                raise Exception("test failed")
+
+            if type(b) is not np.memmap:
+                raise Exception("test failed")
+
+            if (a != b).any():
+                raise Exception("test failed")
+
+            audio_to_hann_grains = ssl.AudioToHannGrains(
+                b, start_i=-100, num_of_iterations=30,
+                inner_grain_len=700, overlap=2
+            )
+            for _ in zip(range(30), audio_to_hann_grains):
+                pass
+
+            del b, audio_to_hann_grains
+        finally:
+            try:
+                tmp_test_path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def test_io_cache():
+    rng = np.random.default_rng(0)
+
+    a = rng.random(10_000, dtype=np.float32)
+
+    with TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        tmp_test_path = tmp_dir / "_tmp_test_path.wav"
+        cache = ssl.AudioCache(tmp_dir / "cache")
+
+        ssl.save_audio(a, tmp_test_path, sample_rate=123_456)
+
+        for _ in range(2):
+            b, sample_rate = ssl.load_audio(tmp_test_path, cache=cache)
+
+            if sample_rate != 123_456:
+                raise Exception("test failed")
+
+            if (a != b).any():
+                raise Exception("test failed")
+
+        if type(b) is not np.memmap:
+            raise Exception("test failed")
+
+        if len(list(cache.dir_path.glob("*.npy"))) != 1:
+            raise Exception("test failed")
+
+        # a new sample rate is a new entry, and the cap evicts the old one
+        cache.max_size_bytes = 50_000
+        ssl.load_audio(tmp_test_path, sample_rate=50_000, cache=cache)
+
+        if len(list(cache.dir_path.glob("*.npy"))) != 1:
+            raise Exception("test failed")
+
+        try:
+            ssl.load_audio(tmp_test_path, mmap=True, cache=cache)
+        except ValueError:
+            pass
+        else:
+            raise Exception("test failed")
+
+        del b
+        cache.clear()
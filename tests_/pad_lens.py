@@ -0,0 +1,31 @@
+import subtract_stem_lib as ssl
+
+
+def _is_5_smooth(n):
+    for prime in 2, 3, 5:
+        while n % prime == 0:
+            n //= prime
+
+    return n == 1
+
+
+def test_pad_lens():
+    for inner_grain_len in 17, 999, 1350, 1351, 2311:
+        for min_pad_len in 0, 3:
+            for method in "smooth", "benchmark":
+                left_pad_len, right_pad_len = ssl.plan_pad_lens(
+                    inner_grain_len, min_pad_len=min_pad_len, method=method
+                )
+                grain_len = left_pad_len + inner_grain_len + right_pad_len
+
+                if min(left_pad_len, right_pad_len) < min_pad_len:
+                    raise Exception("test failed")
+
+                if abs(left_pad_len - right_pad_len) > 1:
+                    raise Exception("test failed")
+
+                if method == "smooth" and not _is_5_smooth(grain_len):
+                    raise Exception("test failed")
+
+    if ssl.plan_pad_lens(1350) != (0, 0):
+        raise Exception("test failed")
@@ -17,3 +17,164 @@ def test_transforms():
 
     if np.abs(out_grain - first_grain).max() > 0.000_001:
         raise Exception("test failed")
+
+
+def test_block_transforms():
+    rng = np.random.default_rng(0)
+
+    grain_block = rng.random((30, 100), dtype=np.float32)
+
+    forward = ssl.GrainBlocksToSpectraBlocks(grain_block)
+    next(iter(forward))
+
+    grain = np.empty(100, dtype=np.float32)
+    grains_to_spectra_buffer = ssl.GrainsToSpectraBuffer(grain)
+    grains_to_spectra_buffer_iter = iter(grains_to_spectra_buffer)
+
+    for grain_row, spectrum_row in zip(grain_block, forward.out):
+        grain[:] = grain_row
+        next(grains_to_spectra_buffer_iter)
+
+        if np.abs(grains_to_spectra_buffer.out.newest - spectrum_row).max() \
+                > 0.000_001:
+            raise Exception("test failed")
+
+    inverse = ssl.SpectraBlocksToGrainBlocks(forward.out)
+    next(iter(inverse))
+
+    if np.abs(inverse.out - grain_block).max() > 0.000_001:
+        raise Exception("test failed")
+
+
+def test_half_spectrum_transforms():
+    rng = np.random.default_rng(0)
+
+    for grain_len in 100, 101:
+        grain = rng.random(grain_len, dtype=np.float32)
+        first_grain = grain.copy()
+
+        forward = ssl.GrainsToSpectraBuffer(grain, half_spectrum=True)
+        inverse = ssl.SpectraBufferOldestToRealGrains(
+            forward.out, grain_len=grain_len, half_spectrum=True
+        )
+
+        next(zip(forward, inverse))
+
+        if forward.out.newest.shape != (grain_len // 2 + 1,):
+            raise Exception("test failed")
+
+        if np.abs(
+            forward.out.newest - np.fft.fft(first_grain)[:grain_len // 2 + 1]
+        ).max() > 0.000_1:
+            raise Exception("test failed")
+
+        if np.abs(inverse.out - first_grain).max() > 0.000_001:
+            raise Exception("test failed")
+
+        grain_block = rng.random((30, grain_len), dtype=np.float32)
+
+        forward = ssl.GrainBlocksToSpectraBlocks(
+            grain_block, half_spectrum=True
+        )
+        inverse = ssl.SpectraBlocksToGrainBlocks(
+            forward.out, grain_len=grain_len, half_spectrum=True
+        )
+
+        next(zip(forward, inverse))
+
+        if np.abs(inverse.out - grain_block).max() > 0.000_001:
+            raise Exception("test failed")
+
+
+def test_real_grain_transforms():
+    rng = np.random.default_rng(0)
+
+    window = np.hanning(101).astype(np.float32)
+
+    for grain_shape in (101,), (2, 101):
+        for half_spectrum in False, True:
+            grain = rng.random(grain_shape, dtype=np.float32)
+            first_grain = grain.copy()
+
+            forward = ssl.GrainsToSpectraBuffer(
+                grain, half_spectrum=half_spectrum
+            )
+            inverse = ssl.SpectraBufferOldestToRealGrains(
+                forward.out,
+                grain_len=101, half_spectrum=half_spectrum
+            )
+            windowed_inverse = ssl.SpectraBufferOldestToRealGrains(
+                forward.out,
+                grain_len=101, half_spectrum=half_spectrum, window=window
+            )
+
+            next(zip(forward, inverse, windowed_inverse))
+
+            if inverse.out.dtype != np.float32:
+                raise Exception("test failed")
+
+            if np.abs(inverse.out - first_grain).max() > 0.000_001:
+                raise Exception("test failed")
+
+            if np.abs(
+                windowed_inverse.out - first_grain * window
+            ).max() > 0.000_001:
+                raise Exception("test failed")
+
+
+def test_fft_backends():
+    rng = np.random.default_rng(0)
+
+    fft_backends = []
+
+    for fft_backend_name in "numpy", "scipy", "pyfftw":
+        try:
+            fft_backends.append(ssl.fft_backend_from_name(fft_backend_name))
+        except ImportError:
+            print(
+                f"skipped the {fft_backend_name!r} FFT backend, as it isn't "
+                "installed"
+            )
+
+            continue
+
+        # as if scipy's private pocketfft functions had changed, so that
+        # the plans go through scipy.fft
+        if fft_backend_name == "scipy":
+            fft_backend = ssl.fft_backend_from_name("scipy")
+            fft_backend._pocketfft = None
+            fft_backends.append(fft_backend)
+
+    for fft_backend in fft_backends:
+        for channels_shape in (), (2,):
+            grain_block = rng.random(
+                (30, *channels_shape, 101), dtype=np.float32
+            )
+
+            for half_spectrum in False, True:
+                forward = ssl.GrainBlocksToSpectraBlocks(
+                    grain_block,
+                    half_spectrum=half_spectrum, fft_backend=fft_backend
+                )
+                inverse = ssl.SpectraBlocksToGrainBlocks(
+                    forward.out,
+                    grain_len=101, half_spectrum=half_spectrum,
+                    fft_backend=fft_backend
+                )
+
+                next(zip(forward, inverse))
+
+                if half_spectrum:
+                    expected = np.fft.rfft(grain_block)
+                else:
+                    expected = np.fft.fft(grain_block)
+
+                if np.abs(forward.out - expected).max() > 0.000_1:
+                    raise Exception("test failed")
+
+                if np.abs(inverse.out - grain_block).max() > 0.000_001:
+                    raise Exception("test failed")
+
+        if fft_backend.get_plan("fft", grain_len=101, batch=30) \
+                is not fft_backend.get_plan("fft", grain_len=101, batch=30):
+            raise Exception("test failed")